@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+"""
+Benchmark judging a path list: one `matches` call per path against
+`filter_many`, in this process and across a process pool.
+
+The paths look like those of a large git index, with repeated names
+(`__init__.py`, `README.md`, ...), judged by the rule of
+`TeleportTree(special_words=["HIDDEN"], exclude_patterns=[...])`.
+
+Usage:
+    python benchmarks/bench_filter_many.py --paths 1000000 --workers 4
+"""
+
+import argparse
+import os
+import random
+import time
+
+from pyteleport.rule import RuleFactory, RuleQuery
+
+NAMES = ["__init__.py", "README.md", "setup.py", ".gitignore", "conftest.py"]
+
+
+def make_queries(count, seed):
+    rng = random.Random(seed)
+    queries = []
+    for i in range(count):
+        rel_dir = "/".join(
+            f"pkg{rng.randrange(100)}" for _ in range(rng.randrange(1, 5))
+        )
+        if rng.random() < 0.5:
+            name = rng.choice(NAMES)
+        else:
+            name = f"module{rng.randrange(5000)}.{rng.choice(['py', 'pyc', 'txt'])}"
+        queries.append(RuleQuery(name, f"{rel_dir}/{name}", False))
+    return queries
+
+
+def timed(label, fn, count):
+    start = time.perf_counter()
+    decisions = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:26} {count / elapsed:12,.0f} paths/s")
+    return decisions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--paths", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    args = parser.parse_args()
+
+    queries = make_queries(args.paths, seed=1)
+    rule = RuleFactory.simplify_create_rule(
+        exclude_patterns=["*.pyc", "build"], special_words=["HIDDEN"]
+    )
+    print(f"paths: {args.paths}, workers: {args.workers}")
+    expected = timed(
+        "matches per path", lambda: list(map(rule.matches, queries)), args.paths
+    )
+    batch = timed("filter_many", lambda: rule.filter_many(queries), args.paths)
+    pooled = timed(
+        f"filter_many, {args.workers} processes",
+        lambda: rule.filter_many(queries, args.workers, args.chunk_size),
+        args.paths,
+    )
+    assert batch == expected == pooled
+
+
+if __name__ == "__main__":
+    main()
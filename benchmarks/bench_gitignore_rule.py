@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+"""
+Benchmark `GitignoreRule` matching: `pathspec` against the compiled matcher.
+
+Queries are walker queries (relative path and real entry type) over a tree
+of `--dirs` directories, judged by a `.gitignore` of `--patterns` patterns
+of the usual shapes: literal names, `*.ext`, directory names and anchored
+or `**` globs.
+
+Usage:
+    python benchmarks/bench_gitignore_rule.py --patterns 300 --queries 50000
+"""
+
+import argparse
+import random
+import time
+
+import pathspec
+
+from pyteleport.constant import CONFUSING_DIRS
+from pyteleport.rule import GitignoreRule, RuleQuery
+from pyteleport.rule.query import query_is_dir, query_path
+
+
+class LegacyGitignoreRule(GitignoreRule):
+    """`GitignoreRule` before its patterns were compiled."""
+
+    def __init__(self, patterns):
+        super().__init__(patterns)
+        self.spec = pathspec.PathSpec.from_lines("gitwildmatch", self.patterns)
+
+    @staticmethod
+    def suffix_weak_hint(query):
+        has_extension = "." in query.split("/")[-1] and not query.endswith("/")
+        if has_extension or "*." in query or query.endswith(".*"):
+            for dir in CONFUSING_DIRS:
+                if query.endswith(dir):
+                    return True
+            return False
+        return True
+
+    def _judge_ignore_file(self, query, is_dir=None):
+        if is_dir is None:
+            is_dir = query_is_dir(query)
+        query = query_path(query)
+        if is_dir is None:
+            is_dir = self.suffix_weak_hint(query)
+        if is_dir and not query.endswith("/"):
+            query = query + "/"
+        return self.spec.match_file("./" + query)
+
+
+def make_patterns(count, seed):
+    rng = random.Random(seed)
+    patterns = []
+    for i in range(count):
+        shape = i % 5
+        if shape == 0:
+            patterns.append(f"name{rng.randrange(1000)}.cfg")
+        elif shape == 1:
+            patterns.append(f"*.ext{rng.randrange(1000)}")
+        elif shape == 2:
+            patterns.append(f"build{rng.randrange(1000)}/")
+        elif shape == 3:
+            patterns.append(f"/dir{rng.randrange(20)}/*.tmp{rng.randrange(100)}")
+        else:
+            patterns.append(f"**/cache{rng.randrange(1000)}/*.bin")
+    return patterns
+
+
+def make_queries(count, dirs, seed):
+    rng = random.Random(seed)
+    queries = []
+    for i in range(count):
+        rel_dir = "/".join(f"dir{rng.randrange(dirs)}" for _ in range(rng.randrange(4)))
+        is_dir = rng.random() < 0.2
+        if is_dir:
+            name = f"build{rng.randrange(2000)}"
+        else:
+            name = f"file{i}.{rng.choice(['py', 'txt', f'ext{rng.randrange(2000)}'])}"
+        rel_path = f"{rel_dir}/{name}" if rel_dir else name
+        queries.append(RuleQuery(name, rel_path, is_dir))
+    return queries
+
+
+def rate(rule, queries):
+    start = time.perf_counter()
+    decisions = [rule.matches(query) for query in queries]
+    elapsed = time.perf_counter() - start
+    return len(queries) / elapsed, decisions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--patterns", type=int, default=300)
+    parser.add_argument("--queries", type=int, default=50_000)
+    parser.add_argument("--dirs", type=int, default=20)
+    args = parser.parse_args()
+
+    patterns = make_patterns(args.patterns, seed=1)
+    queries = make_queries(args.queries, args.dirs, seed=2)
+
+    legacy, expected = rate(LegacyGitignoreRule(patterns), queries)
+    compiled, decisions = rate(GitignoreRule(patterns), queries)
+    assert decisions == expected
+    print(f"patterns: {args.patterns}, queries: {args.queries}")
+    print(f"pathspec {legacy:12,.0f} matches/s")
+    print(f"compiled {compiled:12,.0f} matches/s")
+    print(f"compiled is {compiled / legacy:.0f}x faster")
+
+
+if __name__ == "__main__":
+    main()
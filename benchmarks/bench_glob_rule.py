@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""
+Benchmark `GlobRule` matching: one `Path.match` per pattern against the
+compiled matcher.
+
+Queries are relative paths like the walker passes, matched against
+`--patterns` include and as many exclude patterns, half of them `*.ext`
+and half other shapes.
+
+Usage:
+    python benchmarks/bench_glob_rule.py --patterns 50 --queries 20000
+"""
+
+import argparse
+import random
+import time
+from pathlib import Path
+
+from pyteleport.rule import GlobRule
+
+
+class LegacyGlobRule(GlobRule):
+    """`GlobRule` before its patterns were compiled."""
+
+    def _judge_include_or_exclude(self, query):
+        if any(Path(query).match(pattern) for pattern in self.exclude_patterns):
+            return False
+        return any(Path(query).match(pattern) for pattern in self.include_patterns)
+
+
+def make_patterns(count, seed):
+    rng = random.Random(seed)
+    patterns = []
+    for i in range(count):
+        shape = i % 4
+        if shape in (0, 1):
+            patterns.append(f"*.ext{rng.randrange(1000)}")
+        elif shape == 2:
+            patterns.append(f"name{rng.randrange(1000)}_*.py")
+        else:
+            patterns.append(f"dir{rng.randrange(100)}/*.txt")
+    return patterns
+
+
+def make_queries(count, seed):
+    rng = random.Random(seed)
+    return [
+        "/".join(
+            [f"dir{rng.randrange(100)}" for _ in range(rng.randrange(4))]
+            + [f"file{i}.{rng.choice(['txt', 'py', f'ext{rng.randrange(1000)}'])}"]
+        )
+        for i in range(count)
+    ]
+
+
+def rate(rule, queries):
+    start = time.perf_counter()
+    decisions = [rule.matches(query) for query in queries]
+    elapsed = time.perf_counter() - start
+    return len(queries) / elapsed, decisions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--patterns", type=int, default=50)
+    parser.add_argument("--queries", type=int, default=20_000)
+    args = parser.parse_args()
+
+    include = make_patterns(args.patterns, seed=1)
+    exclude = make_patterns(args.patterns, seed=2)
+    queries = make_queries(args.queries, seed=3)
+
+    legacy, expected = rate(LegacyGlobRule(include, exclude), queries)
+    compiled, decisions = rate(GlobRule(include, exclude), queries)
+    assert decisions == expected
+    print(f"patterns: {2 * args.patterns}, queries: {args.queries}")
+    print(f"Path.match per pattern {legacy:12,.0f} matches/s")
+    print(f"compiled               {compiled:12,.0f} matches/s")
+    print(f"compiled is {compiled / legacy:.0f}x faster")
+
+
+if __name__ == "__main__":
+    main()
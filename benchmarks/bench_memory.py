@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+"""
+Compare the heap used by the dict layout and the compact tree storage.
+
+A synthetic tree is generated in a temporary directory (or `--path` is used)
+and each layout is built under `tracemalloc`; the peak and retained sizes
+are reported per node.
+
+Usage:
+    python benchmarks/bench_memory.py --depth 4 --fanout 6 --files 20
+"""
+
+import argparse
+import gc
+import tempfile
+import tracemalloc
+
+from bench_walk import make_tree
+
+from pyteleport.core.compact_tree import CompactTreeStorage
+from pyteleport.core.walker import iter_tree, scandir_walk
+
+
+def measure(name, build):
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    nodes = len(result)
+    print(
+        f"{name:8} nodes={nodes:7d} retained={retained / 2**20:8.2f} MiB "
+        f"({retained / nodes:6.1f} B/node) peak={peak / 2**20:8.2f} MiB"
+    )
+    return retained
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--path", help="measure an existing directory instead")
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--fanout", type=int, default=6)
+    parser.add_argument("--files", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = args.path
+        if root is None:
+            root = tmp
+            make_tree(root, args.depth, args.fanout, args.files)
+        dict_bytes = measure("dict", lambda: scandir_walk(root))
+        compact_bytes = measure(
+            "compact", lambda: CompactTreeStorage.from_records(root, iter_tree(root))
+        )
+        print(f"compact uses {dict_bytes / compact_bytes:.1f}x less memory")
+
+
+if __name__ == "__main__":
+    main()
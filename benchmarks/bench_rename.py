@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+"""
+Benchmark bulk renames: per-node `_update_tree` plus the recursive path
+rebuild against `TeleportTree.rename_all`.
+
+The tree is synthetic and held in memory only (`--nodes` nodes, directories
+of `--fanout` entries), so no filesystem is involved.
+
+Usage:
+    python benchmarks/bench_rename.py --nodes 1000000 --fanout 20
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import deque
+
+from pyteleport.core.algorithm import apply_asterisk_rule
+from pyteleport.core.tree import TeleportTree
+
+
+def make_tree_list(nodes, fanout):
+    """A DFS-ordered tree where every directory has `fanout` entries."""
+    tree_list = []
+
+    def add(name, parent, is_dir):
+        tree_list.append(
+            {
+                "symbol": "",
+                "name": name,
+                "path": "",
+                "parent": parent,
+                "children": [],
+                "is_dir": is_dir,
+            }
+        )
+        if parent >= 0:
+            tree_list[parent]["children"].append(len(tree_list) - 1)
+        return len(tree_list) - 1
+
+    # breadth-first, so the tree stays shallow enough for the legacy recursion
+    queue = deque([add("root", -1, True)])
+    while queue and len(tree_list) < nodes:
+        parent = queue.popleft()
+        subdirs = []
+        for i in range(fanout):
+            if len(tree_list) >= nodes:
+                break
+            is_dir = i < 2
+            idx = add(f"{'dir' if is_dir else 'file'}{i}.py", parent, is_dir)
+            if is_dir:
+                subdirs.append(idx)
+        queue.extend(subdirs)
+    # renumber the nodes in DFS order
+    return _to_dfs(tree_list)
+
+
+def _to_dfs(tree_list):
+    order = []
+    stack = [0]
+    while stack:
+        idx = stack.pop()
+        order.append(idx)
+        stack.extend(reversed(tree_list[idx]["children"]))
+    new_index = {old: new for new, old in enumerate(order)}
+    result = []
+    for old in order:
+        node = dict(tree_list[old])
+        node["parent"] = new_index.get(node["parent"], -1)
+        node["children"] = [new_index[c] for c in node["children"]]
+        result.append(node)
+    return result
+
+
+def legacy_rename(tree, rule):
+    """`all_change_name_leaf` before `rename_all`."""
+    tree_list = tree._tree_list
+    for idx, node in enumerate(tree_list):
+        if idx == 0 and node["is_dir"]:
+            continue
+        node["name"] = apply_asterisk_rule(node["name"], rule)
+
+    def update_path_recursive(idx):
+        for child_idx in tree_list[idx]["children"]:
+            tree_list[child_idx]["path"] = os.path.join(
+                tree_list[idx]["path"], tree_list[child_idx]["name"]
+            )
+            update_path_recursive(child_idx)
+
+    update_path_recursive(0)
+
+
+def bench(name, fn, tree_list):
+    tree = TeleportTree.__new__(TeleportTree)
+    tree._tree_list = [dict(node) for node in tree_list]
+    tree._tree_list[0]["path"] = "root"
+    start = time.perf_counter()
+    fn(tree, "new_*")
+    elapsed = time.perf_counter() - start
+    print(f"{name:12} {elapsed:8.2f} s")
+    return elapsed, tree._tree_list
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--nodes", type=int, default=1_000_000)
+    parser.add_argument("--fanout", type=int, default=20)
+    args = parser.parse_args()
+
+    sys.setrecursionlimit(10_000)  # the legacy walk recurses once per level
+    tree_list = make_tree_list(args.nodes, args.fanout)
+    print(f"nodes: {len(tree_list)}")
+    legacy, legacy_result = bench("legacy", legacy_rename, tree_list)
+    bulk, bulk_result = bench("rename_all", TeleportTree.rename_all, tree_list)
+    assert legacy_result == bulk_result
+    print(f"rename_all is {legacy / bulk:.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
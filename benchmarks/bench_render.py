@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+"""
+Benchmark tree rendering: one `rich.print` per node against `print_tree`.
+
+A synthetic tree is generated in a temporary directory and walked once; the
+walk result is then rendered to a terminal-like rich console and to a plain
+stream, and the time to first line of a progressive render is measured.
+
+Usage:
+    python benchmarks/bench_render.py --depth 4 --fanout 6 --files 20
+"""
+
+import argparse
+import io
+import os
+import tempfile
+import time
+
+from bench_walk import make_tree
+from rich.console import Console
+
+from pyteleport.core.render import print_tree, render_text
+from pyteleport.core.walker import iter_tree, scandir_walk
+
+
+def per_node_print(tree_list, console):
+    """How `TeleportTree.print` rendered before the buffered renderer."""
+    for node in tree_list:
+        if node["is_dir"]:
+            console.print(f"{node['symbol']}[magenta]{node['name']}[/magenta]")
+        else:
+            console.print(f"{node['symbol']}[cyan]{node['name']}[/cyan]")
+
+
+def timed(name, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{name:24} {elapsed * 1000:9.1f} ms")
+    return elapsed
+
+
+class FirstLine(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.first_write = None
+
+    def write(self, s):
+        if self.first_write is None:
+            self.first_write = time.perf_counter()
+        return super().write(s)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--path", help="render an existing directory instead")
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--fanout", type=int, default=6)
+    parser.add_argument("--files", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = args.path
+        if root is None:
+            root = tmp
+            make_tree(root, args.depth, args.fanout, args.files)
+        tree_list = scandir_walk(root)
+        print(f"nodes: {len(tree_list)}")
+
+        def terminal():
+            return Console(file=io.StringIO(), force_terminal=True, width=200)
+
+        legacy = timed(
+            "rich.print per node", lambda: per_node_print(tree_list, terminal())
+        )
+        timed(
+            "render_text (rich Text)",
+            lambda: terminal().print(render_text(tree_list), soft_wrap=True),
+        )
+        os.environ["FORCE_COLOR"] = "1"  # make print_tree see a terminal
+        buffered = timed(
+            "print_tree (terminal)", lambda: print_tree(tree_list, io.StringIO())
+        )
+        del os.environ["FORCE_COLOR"]
+        timed("print_tree (plain)", lambda: print_tree(tree_list, io.StringIO()))
+        print(f"buffered terminal render is {legacy / buffered:.1f}x faster")
+
+        out = FirstLine()
+        start = time.perf_counter()
+        print_tree(iter_tree(root), out)
+        end = time.perf_counter()
+        print(
+            f"progressive: first line after {(out.first_write - start) * 1000:.1f} ms, "
+            f"done after {(end - start) * 1000:.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
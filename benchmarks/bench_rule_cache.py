@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+"""
+Benchmark `CompositeRule.matches` with and without the decision cache.
+
+Queries are walker queries over many directories that repeat the same few
+names (`__init__.py`, `README.md`, `node_modules`, ...), judged by a hidden
+file rule and `--patterns` include and as many exclude `*.ext` patterns.
+
+Usage:
+    python benchmarks/bench_rule_cache.py --queries 200000 --cache-size 4096
+"""
+
+import argparse
+import random
+import time
+
+from pyteleport.rule import CompositeRule, GlobRule, HiddenFileRule, RuleQuery
+
+COMMON_NAMES = [
+    ("__init__.py", False),
+    ("README.md", False),
+    ("setup.py", False),
+    (".gitignore", False),
+    ("node_modules", True),
+    ("tests", True),
+    ("src", True),
+]
+
+
+def make_queries(count, seed):
+    rng = random.Random(seed)
+    queries = []
+    for i in range(count):
+        rel_dir = "/".join(f"dir{rng.randrange(50)}" for _ in range(rng.randrange(5)))
+        if rng.random() < 0.8:
+            name, is_dir = rng.choice(COMMON_NAMES)
+        else:
+            name, is_dir = f"module{rng.randrange(500)}.py", False
+        rel_path = f"{rel_dir}/{name}" if rel_dir else name
+        queries.append(RuleQuery(name, rel_path, is_dir))
+    return queries
+
+
+def make_rule(patterns, cache_size):
+    include = [f"*.ext{i}" for i in range(patterns)] + ["*.py", "*.md", "*"]
+    exclude = [f"*.bak{i}" for i in range(patterns)]
+    return CompositeRule(
+        rules=[HiddenFileRule(), GlobRule(include, exclude)], cache_size=cache_size
+    )
+
+
+def rate(rule, queries):
+    start = time.perf_counter()
+    decisions = [rule.matches(query) for query in queries]
+    elapsed = time.perf_counter() - start
+    return len(queries) / elapsed, decisions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--patterns", type=int, default=50)
+    parser.add_argument("--queries", type=int, default=200_000)
+    parser.add_argument("--cache-size", type=int, default=4096)
+    args = parser.parse_args()
+
+    queries = make_queries(args.queries, seed=1)
+    uncached, expected = rate(make_rule(args.patterns, None), queries)
+    rule = make_rule(args.patterns, args.cache_size)
+    cached, decisions = rate(rule, queries)
+    assert decisions == expected
+    print(f"queries: {args.queries}, cache: {rule.cache_info()}")
+    print(f"no cache  {uncached:12,.0f} matches/s")
+    print(f"cache     {cached:12,.0f} matches/s")
+    print(f"cache is {cached / uncached:.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
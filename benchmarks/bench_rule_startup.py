@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+"""
+Benchmark start-up with a large `.gitignore`: compiling against the cache.
+
+Each configuration is timed in a fresh interpreter, as a CLI run would be:
+loading the rule and judging one query, so the lazily compiled regexes are
+counted. Interpreter and import time are measured separately and excluded.
+
+Usage:
+    python benchmarks/bench_rule_startup.py --patterns 3000 --runs 5
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(__file__))
+from bench_gitignore_rule import make_patterns
+
+_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+from pyteleport.rule import GitignoreRule, RuleCache, RuleQuery
+imported = time.perf_counter()
+gitignore, cache_dir = sys.argv[1:]
+if cache_dir:
+    rule = RuleCache(cache_dir).load_gitignore(gitignore)
+else:
+    rule = GitignoreRule.load(gitignore)
+rule.matches(RuleQuery("main.py", "src/main.py", is_dir=False))
+print(time.perf_counter() - imported)
+"""
+
+
+def run(gitignore: str, cache_dir: str) -> float:
+    out = subprocess.run(
+        [sys.executable, "-c", _SCRIPT, gitignore, cache_dir],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return float(out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--patterns", type=int, default=3000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        gitignore = os.path.join(tmp, ".gitignore")
+        with open(gitignore, "w") as f:
+            f.write("\n".join(make_patterns(args.patterns, seed=1)) + "\n")
+        cache_dir = os.path.join(tmp, "rules")
+
+        uncached = min(run(gitignore, "") for _ in range(args.runs))
+        cold = []
+        for _ in range(args.runs):
+            cold.append(run(gitignore, cache_dir))
+            for name in os.listdir(cache_dir):
+                os.remove(os.path.join(cache_dir, name))
+        run(gitignore, cache_dir)
+        warm = min(run(gitignore, cache_dir) for _ in range(args.runs))
+
+    print(f"patterns: {args.patterns}, best of {args.runs} runs")
+    print(f"no cache   {uncached * 1e3:8.1f} ms")
+    print(f"cold cache {min(cold) * 1e3:8.1f} ms")
+    print(f"warm cache {warm * 1e3:8.1f} ms")
+    print(f"warm cache is {uncached / warm:.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+"""
+Benchmark loading a saved tree against walking the directory again.
+
+A synthetic tree is generated in a temporary directory, walked once and
+saved in both snapshot formats. The rewalk is then timed against loading
+each snapshot, and against loading and rendering the binary one (which
+reads the mapped columns without building the records).
+
+Usage:
+    python benchmarks/bench_snapshot.py --depth 4 --fanout 8 --files 40
+"""
+
+import argparse
+import io
+import os
+import tempfile
+import time
+
+from bench_walk import make_tree
+
+from pyteleport.core.render import print_tree
+from pyteleport.core.snapshot import (
+    SnapshotStorage,
+    dump_json,
+    dump_snapshot,
+    load_json,
+)
+from pyteleport.core.walker import scandir_walk
+
+
+def timed(name, fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    print(f"{name:28} {best * 1000:9.1f} ms")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--path", help="snapshot an existing directory instead")
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--fanout", type=int, default=8)
+    parser.add_argument("--files", type=int, default=40)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = args.path
+        if root is None:
+            root = os.path.join(tmp, "tree")
+            os.mkdir(root)
+            make_tree(root, args.depth, args.fanout, args.files)
+        tree_list = scandir_walk(root)
+        binary = os.path.join(tmp, "tree.snap")
+        json_path = os.path.join(tmp, "tree.json")
+        dump_snapshot(tree_list, root, binary)
+        dump_json(tree_list, root, json_path)
+        print(f"nodes: {len(tree_list)}")
+        print(f"binary: {os.path.getsize(binary) / 1e6:.1f} MB")
+        print(f"json:   {os.path.getsize(json_path) / 1e6:.1f} MB")
+
+        walk = timed("rewalk", lambda: scandir_walk(root))
+        load = timed("load binary", lambda: SnapshotStorage(binary))
+        timed("load binary + print", lambda: _render(SnapshotStorage(binary)))
+        timed("load binary + records", lambda: SnapshotStorage(binary).records())
+        timed("load json", lambda: load_json(json_path))
+        print(f"binary load is {walk / load:.0f}x faster than a rewalk")
+
+
+def _render(storage):
+    print_tree(
+        (
+            {"symbol": symbol, "name": storage.name(idx), "is_dir": storage.is_dir(idx)}
+            for idx, symbol, _ in storage.iter_symbols_and_paths()
+        ),
+        io.StringIO(),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+"""
+Benchmark the scandir walk engines against the original listdir/isdir walk.
+
+A synthetic tree is generated in a temporary directory, then both walks are
+timed and the `os.stat`/`os.listdir`/`os.scandir` calls they make from Python
+are counted. `DirEntry.is_dir()` uses the `d_type` returned by `readdir` and
+does not go through `os.stat`, which is where the saving comes from.
+The thread-pool walk only pays off where each listing has real latency
+(NFS, overlayfs); on a local disk it mostly measures thread overhead.
+
+Usage:
+    python benchmarks/bench_walk.py --depth 4 --fanout 6 --files 20
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from collections import Counter
+
+from pyteleport.core.walker import parallel_walk, scandir_walk
+
+
+def legacy_teleport_tree(path, rule_fn=None, _prefix="", _visited_list=None):
+    """The recursive listdir/isdir walk `teleport_tree` used before scandir."""
+    if _visited_list is None:
+        _visited_list = []
+    if _prefix == "":
+        _visited_list.append(
+            {
+                "symbol": "",
+                "name": path,
+                "path": path,
+                "parent": -1,
+                "children": [],
+                "is_dir": os.path.isdir(path),
+            }
+        )
+        if not _visited_list[0]["is_dir"]:
+            return _visited_list
+    entries = os.listdir(path)
+    if rule_fn is not None:
+        entries = [entry for entry in entries if rule_fn.matches(entry)]
+    entries_count = len(entries)
+    parent_idx = len(_visited_list) - 1
+    for idx, entry in enumerate(entries):
+        full_path = os.path.join(path, entry)
+        connector = "└── " if idx == entries_count - 1 else "├── "
+        _visited_list.append(
+            {
+                "symbol": f"{_prefix}{connector}",
+                "name": entry,
+                "path": full_path,
+                "parent": parent_idx,
+                "children": [],
+                "is_dir": os.path.isdir(full_path),
+            }
+        )
+        _visited_list[parent_idx]["children"].append(len(_visited_list) - 1)
+        if os.path.isdir(full_path):
+            next_prefix = _prefix + ("    " if idx == entries_count - 1 else "│   ")
+            legacy_teleport_tree(full_path, rule_fn, next_prefix, _visited_list)
+    return _visited_list
+
+
+def make_tree(root: str, depth: int, fanout: int, files: int) -> None:
+    stack = [(root, 0)]
+    while stack:
+        path, level = stack.pop()
+        for i in range(files):
+            with open(os.path.join(path, f"file_{i}.txt"), "w") as f:
+                f.write("x")
+        if level == depth:
+            continue
+        for i in range(fanout):
+            child = os.path.join(path, f"dir_{i}")
+            os.mkdir(child)
+            stack.append((child, level + 1))
+
+
+class SyscallCounter:
+    """Count calls to the `os` functions that map to directory syscalls."""
+
+    NAMES = ("stat", "lstat", "listdir", "scandir")
+
+    def __init__(self):
+        self.counts = Counter()
+        self._originals = {}
+
+    def _wrap(self, name, func):
+        def counted(*args, **kwargs):
+            self.counts[name] += 1
+            return func(*args, **kwargs)
+
+        return counted
+
+    def __enter__(self):
+        for name in self.NAMES:
+            self._originals[name] = getattr(os, name)
+            setattr(os, name, self._wrap(name, self._originals[name]))
+        return self
+
+    def __exit__(self, *exc):
+        for name, func in self._originals.items():
+            setattr(os, name, func)
+
+
+def run(name, walk, root, repeat):
+    with SyscallCounter() as counter:
+        result = walk(root)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        walk(root)
+        best = min(best, time.perf_counter() - start)
+    calls = sum(counter.counts.values())
+    detail = ", ".join(f"{k}={v}" for k, v in sorted(counter.counts.items()))
+    print(
+        f"{name:10} nodes={len(result):7d} calls={calls:7d} ({detail}) best={best * 1e3:8.2f} ms"
+    )
+    return result, calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--path", help="walk an existing directory instead")
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--fanout", type=int, default=6)
+    parser.add_argument("--files", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--workers", type=int, default=8, help="threads for the parallel walk"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = args.path
+        if root is None:
+            root = tmp
+            make_tree(root, args.depth, args.fanout, args.files)
+        legacy, legacy_calls = run("listdir", legacy_teleport_tree, root, args.repeat)
+        current, current_calls = run("scandir", scandir_walk, root, args.repeat)
+        parallel, _ = run(
+            f"parallel/{args.workers}",
+            lambda root: parallel_walk(root, workers=args.workers),
+            root,
+            args.repeat,
+        )
+        assert legacy == current == parallel, "walk engines disagree"
+        print(
+            f"saved {legacy_calls - current_calls} calls "
+            f"({legacy_calls / max(current_calls, 1):.1f}x fewer)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,3 @@
-from .core import TeleportTree, teleport_tree
+from .core import TeleportTree, iter_tree, teleport_tree
 
-__all__ = ["TeleportTree", "teleport_tree"]
+__all__ = ["TeleportTree", "iter_tree", "teleport_tree"]
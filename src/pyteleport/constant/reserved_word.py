@@ -2,4 +2,5 @@ SPECIAL_RULES_RESERVED_WORDS = {
     "HIDDEN": "hidden_file",
     "DIR": "dir",
     "GITIGNORE": "gitignore",
+    "GITIGNORES": "gitignore_tree",
 }
@@ -1,8 +1,14 @@
 from .algorithm import apply_asterisk_rule
+from .compact_tree import CompactTeleportTree
 from .tree import TeleportTree, teleport_tree
+from .tree_view import TeleportTreeView
+from .walker import iter_tree
 
 __all__ = [
     "TeleportTree",
+    "CompactTeleportTree",
+    "TeleportTreeView",
     "teleport_tree",
+    "iter_tree",
     "apply_asterisk_rule",
 ]
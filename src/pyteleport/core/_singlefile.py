@@ -48,8 +48,11 @@ class _SingleFile:
         onefile_text = ""
         for tree_dict in self._tree._tree_list:
             if tree_dict["is_binary"] == "text":
-                with open(tree_dict["path"], "r") as f:
-                    text = f.read()
+                if tree_dict.get("size") == 0:  # known empty from the walk
+                    text = ""
+                else:
+                    with open(tree_dict["path"], "r") as f:
+                        text = f.read()
                 onefile_text += self._get_template(tree_dict["path"])
                 if is_lineno:
                     onefile_text += self._add_line_numbers(text)
@@ -0,0 +1,328 @@
+import os
+import re
+from array import array
+from collections.abc import Iterator, Sequence
+from fnmatch import translate
+
+from binaryornot.check import is_binary
+
+from pyteleport.core._singlefile import _SingleFile
+from pyteleport.core.render import print_tree
+from pyteleport.core.walker import (
+    LAST_CONNECTOR,
+    LAST_PREFIX,
+    MIDDLE_CONNECTOR,
+    MIDDLE_PREFIX,
+    iter_tree,
+)
+from pyteleport.rule.rule_factory import RuleFactory
+
+# flags column
+IS_DIR = 1
+IS_LAST = 2
+HAS_BINARY_INFO = 4
+IS_BINARY = 8
+
+
+class CompactTreeStorage:
+    """
+    Struct-of-arrays storage for a DFS-ordered tree.
+
+    Each node costs a handful of machine integers instead of a six-key dict:
+    parent index, next-sibling index, depth, flags and an id into a table of
+    interned name components. Symbols, paths and children lists are derived
+    from these columns when they are asked for.
+
+    Args:
+        root_path: path of the root node, used as its name and path.
+    """
+
+    def __init__(self, root_path: str):
+        self.root_path = root_path
+        self.parent = array("i")
+        self.next_sibling = array("i")
+        self.depth = array("I")
+        self.flags = array("B")
+        self.name_id = array("I")
+        self.names: list[str] = []
+        self._name_ids: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.parent)
+
+    def _intern(self, name: str) -> int:
+        if len(self._name_ids) != len(self.names):  # names loaded as a table
+            self._name_ids = {name: i for i, name in enumerate(self.names)}
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = self._name_ids[name] = len(self.names)
+            self.names.append(name)
+        return name_id
+
+    def append(self, name: str, parent: int, is_dir: bool, is_last: bool) -> int:
+        """
+        Append a node; nodes must arrive in DFS order.
+        """
+        idx = len(self.parent)
+        self.parent.append(parent)
+        self.next_sibling.append(-1)
+        self.depth.append(0 if parent < 0 else self.depth[parent] + 1)
+        self.flags.append((IS_DIR if is_dir else 0) | (IS_LAST if is_last else 0))
+        self.name_id.append(self._intern(name))
+        return idx
+
+    @classmethod
+    def from_records(cls, root_path: str, records) -> "CompactTreeStorage":
+        """
+        Build the storage from `teleport_tree`-style records, e.g. `iter_tree`.
+        """
+        storage = cls(root_path)
+        # last appended child per parent, to link next_sibling
+        last_child: dict[int, int] = {}
+        for record in records:
+            parent = record["parent"]
+            idx = storage.append(
+                record["name"],
+                parent,
+                record["is_dir"],
+                record["symbol"].endswith(LAST_CONNECTOR) or parent < 0,
+            )
+            previous = last_child.get(parent)
+            if previous is not None:
+                storage.next_sibling[previous] = idx
+            last_child[parent] = idx
+            if record["symbol"].endswith(LAST_CONNECTOR):
+                last_child.pop(parent, None)
+        return storage
+
+    def name(self, idx: int) -> str:
+        return self.names[self.name_id[idx]]
+
+    def is_dir(self, idx: int) -> bool:
+        return bool(self.flags[idx] & IS_DIR)
+
+    def children(self, idx: int) -> list[int]:
+        children = []
+        child = idx + 1
+        if child < len(self.parent) and self.parent[child] == idx:
+            while child != -1:
+                children.append(child)
+                child = self.next_sibling[child]
+        return children
+
+    def path(self, idx: int) -> str:
+        """
+        Build the path of a node from its parent links.
+        """
+        parts = []
+        while idx > 0:
+            parts.append(self.name(idx))
+            idx = self.parent[idx]
+        return os.path.join(self.root_path, *reversed(parts))
+
+    def symbol(self, idx: int) -> str:
+        if idx == 0:
+            return ""
+        parts = [LAST_CONNECTOR if self.flags[idx] & IS_LAST else MIDDLE_CONNECTOR]
+        ancestor = self.parent[idx]
+        while ancestor > 0:
+            parts.append(
+                LAST_PREFIX if self.flags[ancestor] & IS_LAST else MIDDLE_PREFIX
+            )
+            ancestor = self.parent[ancestor]
+        return "".join(reversed(parts))
+
+    def iter_symbols_and_paths(self) -> Iterator[tuple[int, str, str]]:
+        """
+        Yield `(index, symbol, path)` for every node in one DFS pass, reusing
+        the prefix and path already built for each ancestor.
+        """
+        prefixes = [""]
+        paths = [self.root_path]
+        for idx in range(len(self.parent)):
+            depth = self.depth[idx]
+            if idx == 0:
+                yield 0, "", self.root_path
+                continue
+            del prefixes[depth:], paths[depth:]
+            is_last = self.flags[idx] & IS_LAST
+            symbol = prefixes[-1] + (LAST_CONNECTOR if is_last else MIDDLE_CONNECTOR)
+            path = os.path.join(paths[-1], self.name(idx))
+            prefixes.append(prefixes[-1] + (LAST_PREFIX if is_last else MIDDLE_PREFIX))
+            paths.append(path)
+            yield idx, symbol, path
+
+    def record(self, idx: int, symbol: str | None = None, path: str | None = None):
+        record = {
+            "symbol": self.symbol(idx) if symbol is None else symbol,
+            "name": self.name(idx),
+            "path": self.path(idx) if path is None else path,
+            "parent": self.parent[idx],
+            "children": self.children(idx),
+            "is_dir": self.is_dir(idx),
+        }
+        flags = self.flags[idx]
+        if flags & HAS_BINARY_INFO:
+            if flags & IS_DIR:
+                record["is_binary"] = "dir"
+            else:
+                record["is_binary"] = "binary" if flags & IS_BINARY else "text"
+        return record
+
+    def filter(self, keep) -> "CompactTreeStorage":
+        """
+        Return a new storage holding only the nodes where `keep[idx]` is true.
+
+        Parent and sibling links are remapped and `IS_LAST` is recomputed in
+        a single pass. The root is always kept; a node whose parent is
+        dropped is dropped as well.
+        """
+        storage = CompactTreeStorage(self.root_path)
+        new_index = array("i", [-1]) * len(self.parent)
+        last_child: dict[int, int] = {}
+        for idx in range(len(self.parent)):
+            parent = self.parent[idx]
+            new_parent = new_index[parent] if parent >= 0 else -1
+            if idx != 0 and (not keep[idx] or new_parent < 0):
+                continue
+            new_idx = storage.append(self.name(idx), new_parent, False, True)
+            storage.flags[new_idx] = self.flags[idx] | IS_LAST
+            new_index[idx] = new_idx
+            previous = last_child.get(new_parent)
+            if previous is not None:
+                storage.next_sibling[previous] = new_idx
+                storage.flags[previous] &= ~IS_LAST
+            last_child[new_parent] = new_idx
+        return storage
+
+
+class _CompactNodes(Sequence):
+    """Read-only `_tree_list` view that materialises records on access."""
+
+    def __init__(self, storage: CompactTreeStorage):
+        self._storage = storage
+
+    def __len__(self) -> int:
+        return len(self._storage)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError(idx)
+        return self._storage.record(idx)
+
+    def __iter__(self) -> Iterator[dict]:
+        for idx, symbol, path in self._storage.iter_symbols_and_paths():
+            yield self._storage.record(idx, symbol, path)
+
+
+class CompactTeleportTree:
+    """
+    `TeleportTree` backed by `CompactTreeStorage` instead of a list of dicts.
+
+    The walk is streamed from `iter_tree` straight into the columns, so the
+    dict layout is never materialised for the whole tree. `tree_list` still
+    returns the dict layout, built on demand.
+
+    Examples:
+        >>> tree = CompactTeleportTree("./src")
+        >>> tree.print
+        >>> tree.to_single_file("onefile.txt")
+    """
+
+    def __init__(
+        self,
+        path: str,
+        include_patterns: list[str] | None = None,
+        exclude_patterns: list[str] | None = None,
+        special_words: list[str] | None = None,
+        gitignore_path: str = "./.gitignore",
+    ):
+        self._path = self._first_path = path
+        self.rule_fn = RuleFactory.simplify_create_rule(
+            include_patterns,
+            exclude_patterns,
+            special_words,
+            gitignore_path=gitignore_path,
+            root=path,
+        )
+        self._storage = CompactTreeStorage.from_records(
+            path, iter_tree(path, self.rule_fn)
+        )
+
+    @property
+    def _tree_list(self) -> _CompactNodes:
+        return _CompactNodes(self._storage)
+
+    @property
+    def tree_list(self) -> list[dict]:
+        return list(self._tree_list)
+
+    @property
+    def __len__(self) -> int:
+        return len(self._storage)
+
+    @property
+    def print(self) -> None:
+        storage = self._storage
+        print_tree(
+            {"symbol": symbol, "name": storage.name(idx), "is_dir": storage.is_dir(idx)}
+            for idx, symbol, _ in storage.iter_symbols_and_paths()
+        )
+
+    def change_name_root(self, change_root_name: str) -> None:
+        self._path = change_root_name
+        self._storage.name_id[0] = self._storage._intern(change_root_name)
+        self._storage.root_path = change_root_name
+
+    def _update_path(self) -> None:
+        # note: paths are derived from parent links on demand, so there is
+        # nothing to rebuild; kept for parity with `TeleportTree`.
+        return None
+
+    def add_binary_info(self) -> None:
+        storage = self._storage
+        for idx, _, path in storage.iter_symbols_and_paths():
+            flags = storage.flags[idx] & ~IS_BINARY
+            if not flags & IS_DIR and is_binary(path):
+                flags |= IS_BINARY
+            storage.flags[idx] = flags | HAS_BINARY_INFO
+
+    def to_single_file(
+        self,
+        output_path: str | None = None,
+        is_lineno: bool = False,
+        template: str | None = None,
+    ) -> None:
+        single_file = _SingleFile(self, template, output_path)
+        single_file.to_single_file(is_lineno)
+
+    def exclude_leaf(self, exclude_patterns: list[str]) -> None:
+        """
+        Exclude leaves from the tree that match the given patterns.
+        Directories left empty are removed.
+
+        Args:
+            exclude_patterns: List of glob patterns to exclude
+        """
+        if not exclude_patterns:
+            return
+        matcher = re.compile("|".join(translate(p) for p in exclude_patterns))
+        storage = self._storage
+        keep = [
+            storage.is_dir(idx) or matcher.match(storage.name(idx)) is None
+            for idx in range(len(storage))
+        ]
+        # drop directories left empty, deepest first
+        parent = storage.parent
+        has_kept_child = bytearray(len(storage))
+        for idx in range(len(storage) - 1, 0, -1):
+            had_children = idx + 1 < len(storage) and parent[idx + 1] == idx
+            if had_children and storage.is_dir(idx) and not has_kept_child[idx]:
+                keep[idx] = False
+            if keep[idx]:
+                has_kept_child[parent[idx]] = 1
+        self._storage = storage.filter(keep)
@@ -0,0 +1,227 @@
+"""
+Read the file list of a git checkout from its index (`.git/index`).
+
+The index already records every tracked path, so building the tree from it
+costs one file read instead of a walk of the working tree plus a gitignore
+match per entry. Versions 2, 3 and 4 of the index format are supported
+(see `gitformat-index(5)`).
+"""
+
+import os
+import re
+import struct
+
+from pyteleport.core.walker import _assemble, iter_tree
+from pyteleport.rule import (
+    BaseRule,
+    CompositeRule,
+    GitignoreRule,
+    GitignoreTreeRule,
+    RuleQuery,
+)
+
+_HEADER = struct.Struct(">4sII")
+# ctime, mtime (seconds, nanoseconds), dev, ino, mode, uid, gid, size
+_STAT_SIZE = 40
+_FLAG_EXTENDED = 0x4000
+_FLAG_SKIP_WORKTREE = 0x4000  # in the extended flags
+_NAME_MASK = 0x0FFF
+_MODE_TYPE_MASK = 0o170000
+_MODE_GITLINK = 0o160000  # submodule
+_MODE_DIR = 0o040000  # sparse-index directory entry
+
+
+def find_git_dir(repo: str) -> str:
+    """
+    Return the git directory of the checkout `repo`.
+
+    Follows the `gitdir:` file used by worktrees and submodules.
+    """
+    git_path = os.path.join(repo, ".git")
+    if os.path.isfile(git_path):
+        with open(git_path, "r") as f:
+            content = f.read().strip()
+        if not content.startswith("gitdir:"):
+            raise ValueError(f"Invalid .git file: {git_path}")
+        git_dir = content[len("gitdir:") :].strip()
+        return os.path.normpath(os.path.join(repo, git_dir))
+    if os.path.isdir(git_path):
+        return git_path
+    raise FileNotFoundError(f"Not a git checkout: {repo}")
+
+
+def _hash_size(git_dir: str) -> int:
+    """
+    Return the object id size: 32 bytes for sha256 repositories, else 20.
+    """
+    try:
+        with open(os.path.join(git_dir, "config"), "r") as f:
+            config = f.read()
+    except OSError:
+        return 20
+    if re.search(
+        r"^\s*objectformat\s*=\s*sha256\s*$", config, re.MULTILINE | re.IGNORECASE
+    ):
+        return 32
+    return 20
+
+
+def _read_varint(data: bytes, pos: int) -> tuple[int, int]:
+    # offset encoding of index v4 (`decode_varint` in git's varint.c)
+    byte = data[pos]
+    pos += 1
+    value = byte & 0x7F
+    while byte & 0x80:
+        byte = data[pos]
+        pos += 1
+        value = ((value + 1) << 7) | (byte & 0x7F)
+    return value, pos
+
+
+def parse_index(data: bytes, hash_size: int = 20) -> list[tuple[str, int]]:
+    """
+    Parse the entries of an index file.
+
+    Args:
+        data: content of the index file
+        hash_size: object id size in bytes
+    Returns:
+        list: `(path, mode)` of each checked-out entry, in index order.
+            Conflict stages are merged and skip-worktree entries (not
+            present in a sparse checkout) are dropped.
+    """
+    signature, version, count = _HEADER.unpack_from(data, 0)
+    if signature != b"DIRC":
+        raise ValueError("Not a git index file")
+    if version not in (2, 3, 4):
+        raise ValueError(f"Unsupported index version: {version}")
+
+    entries = []
+    pos = _HEADER.size
+    prev_path = b""
+    for _ in range(count):
+        entry_start = pos
+        mode = struct.unpack_from(">I", data, pos + 24)[0]
+        pos += _STAT_SIZE + hash_size
+        flags = struct.unpack_from(">H", data, pos)[0]
+        pos += 2
+        skip_worktree = False
+        if version >= 3 and flags & _FLAG_EXTENDED:
+            skip_worktree = bool(
+                struct.unpack_from(">H", data, pos)[0] & _FLAG_SKIP_WORKTREE
+            )
+            pos += 2
+
+        if version == 4:
+            strip, pos = _read_varint(data, pos)
+            end = data.index(b"\0", pos)
+            path = prev_path[: len(prev_path) - strip] + data[pos:end]
+            pos = end + 1
+        else:
+            name_length = flags & _NAME_MASK
+            if name_length == _NAME_MASK:  # 0xFFF or longer
+                end = data.index(b"\0", pos)
+            else:
+                end = pos + name_length
+            path = data[pos:end]
+            # 1-8 NUL bytes pad the entry to a multiple of 8
+            pos = entry_start + ((end - entry_start) // 8 + 1) * 8
+        prev_path = path
+
+        if skip_worktree:
+            continue
+        # stages 1-3 of a conflicted path are adjacent
+        if entries and entries[-1][0] == path:
+            continue
+        entries.append((path, mode))
+    return [(os.fsdecode(path), mode) for path, mode in entries]
+
+
+def read_git_index(repo: str) -> list[tuple[str, int]]:
+    """
+    Return `(path, mode)` for each tracked entry of the checkout `repo`.
+    """
+    git_dir = find_git_dir(repo)
+    with open(os.path.join(git_dir, "index"), "rb") as f:
+        data = f.read()
+    return parse_index(data, _hash_size(git_dir))
+
+
+def _ignore_rule(repo: str, git_dir: str) -> GitignoreTreeRule:
+    """
+    Rule for the untracked-file walk: every `.gitignore` of the checkout,
+    over `info/exclude`, plus the git directory itself.
+    """
+    patterns = ["/.git"]
+    exclude_path = os.path.join(git_dir, "info", "exclude")
+    if os.path.isfile(exclude_path):
+        patterns.extend(GitignoreRule.read_patterns(exclude_path))
+    return GitignoreTreeRule(repo, patterns)
+
+
+def git_index_tree(
+    repo: str, rule_fn: BaseRule | None = None, include_untracked: bool = False
+) -> list[dict]:
+    """
+    Build the tree of a git checkout from its index, without walking it.
+
+    Directory nodes are synthesised from the tracked paths; submodules are
+    directory nodes without children. Entries are listed in name order.
+
+    Args:
+        repo: root of the checkout
+        rule_fn: rule function applied to each entry, as a `RuleQuery`. A
+            rejected directory drops everything below it, like in a walk.
+        include_untracked: also walk the working tree for files that are
+            neither tracked nor ignored (by the `.gitignore` files of the
+            checkout and `.git/info/exclude`).
+    Returns:
+        list: tree structure of the checkout, same layout as `teleport_tree`.
+
+    Examples:
+        >>> tree_list = git_index_tree(".", rule_fn=GlobRule(["*.py"]))
+    """
+    # rel_dir -> {name: is_dir}
+    listings: dict[str, dict[str, bool]] = {"": {}}
+
+    def add(rel_path: str, is_dir: bool) -> None:
+        rel_dir, _, name = rel_path.rpartition("/")
+        if rel_dir not in listings:
+            add(rel_dir, True)
+        listings[rel_dir][name] = is_dir
+        if is_dir:
+            listings.setdefault(rel_path, {})
+
+    submodules = set()
+    for rel_path, mode in read_git_index(repo):
+        kind = mode & _MODE_TYPE_MASK
+        if kind == _MODE_GITLINK:
+            submodules.add(rel_path)
+        add(rel_path.rstrip("/"), kind in (_MODE_GITLINK, _MODE_DIR))
+
+    if include_untracked:
+        walk_rule = CompositeRule(rules=[_ignore_rule(repo, find_git_dir(repo))])
+        if rule_fn is not None:
+            walk_rule.append(rule_fn)
+        # index -> rel_path of the walked directories, outside submodules
+        rel_dirs = {0: ""}
+        for idx, node in enumerate(iter_tree(repo, walk_rule)):
+            parent_rel = rel_dirs.get(node["parent"])
+            if parent_rel is None:
+                continue
+            rel_path = f"{parent_rel}/{node['name']}" if parent_rel else node["name"]
+            if not node["is_dir"]:
+                add(rel_path, False)
+            elif rel_path not in submodules:
+                rel_dirs[idx] = rel_path
+
+    def listing(rel_dir: str) -> list[tuple]:
+        queries = [
+            RuleQuery(name, f"{rel_dir}/{name}" if rel_dir else name, is_dir)
+            for name, is_dir in sorted(listings.get(rel_dir, {}).items())
+        ]
+        if rule_fn is not None:
+            queries = [q for q, ok in zip(queries, rule_fn.filter_many(queries)) if ok]
+        return [(query, None) for query in queries]
+
+    return _assemble(repo, listing(""), lambda item, _: listing(item[0].rel_path))
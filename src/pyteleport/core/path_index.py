@@ -0,0 +1,69 @@
+"""
+Hash index from relative path and from name to the nodes of a `_tree_list`.
+
+The index maps to the node records themselves rather than to positions:
+inserting or removing a subtree shifts the position of every later node,
+but leaves the records (and so the index entries) of the others valid.
+"""
+
+from collections import defaultdict
+
+from pyteleport.core.tree_edit import iter_rel_paths, subtree_end
+
+
+class PathIndex:
+    """
+    Lookups by `/`-separated path relative to the root, and by name.
+
+    The root is indexed under `""` only; its name is the tree's path.
+    """
+
+    def __init__(self, tree_list: list[dict]):
+        self._by_path: dict[str, dict] = {}
+        self._by_name: defaultdict[str, list[dict]] = defaultdict(list)
+        for idx, rel_path in iter_rel_paths(tree_list):
+            self._add(rel_path, tree_list[idx], is_root=idx == 0)
+
+    def __len__(self) -> int:
+        return len(self._by_path)
+
+    def _add(self, rel_path: str, node: dict, is_root: bool = False) -> None:
+        self._by_path[rel_path] = node
+        if not is_root:
+            self._by_name[node["name"]].append(node)
+
+    def get(self, rel_path: str) -> dict | None:
+        if rel_path == ".":
+            rel_path = ""
+        return self._by_path.get(rel_path)
+
+    def find_name(self, name: str) -> list[dict]:
+        return list(self._by_name.get(name, ()))
+
+    def add_subtree(self, rel_path: str, nodes: list[dict]) -> None:
+        """
+        Index `nodes`, a subtree in `teleport_tree` layout rooted at
+        `rel_path`. Call before the indices of `nodes` are rebased.
+        """
+        for idx, sub_path in iter_rel_paths(nodes):
+            if idx == 0:
+                self._add(rel_path, nodes[0])
+            else:
+                self._add(f"{rel_path}/{sub_path}", nodes[idx])
+
+    def remove_subtree(self, tree_list: list[dict], idx: int, rel_path: str) -> None:
+        """
+        Drop `idx` and its descendants, found at `rel_path`. Call before the
+        subtree is removed from `tree_list`.
+        """
+        rel_paths = {idx: rel_path}
+        for sub_idx in range(idx, subtree_end(tree_list, idx)):
+            node = tree_list[sub_idx]
+            if sub_idx != idx:
+                rel_paths[sub_idx] = f"{rel_paths[node['parent']]}/{node['name']}"
+            self._by_path.pop(rel_paths[sub_idx], None)
+            same_name = self._by_name.get(node["name"])
+            if same_name:
+                same_name[:] = [other for other in same_name if other is not node]
+                if not same_name:
+                    del self._by_name[node["name"]]
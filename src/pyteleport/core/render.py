@@ -0,0 +1,321 @@
+"""
+Render a tree to a terminal or a stream in a few large writes.
+
+Lines are built into one string and written at once, instead of one
+`rich.print` call, with its markup parsing and layout, per node. Colors are
+the escape codes rich would emit for the console's color system, computed
+once per style.
+"""
+
+import os
+import sys
+import time
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from typing import TextIO
+
+from rich.console import COLOR_SYSTEMS, Console
+from rich.style import Style
+from rich.text import Text
+
+from pyteleport.core.walker import LAST_CONNECTOR, MIDDLE_CONNECTOR
+
+DIR_STYLE = "magenta"
+FILE_STYLE = "cyan"
+MARKER_STYLE = "dim"
+TRUNCATED_MARKER = "…"
+
+
+def _marker(node: dict) -> str:
+    if node.get("summary"):
+        return ""
+    if node.get("truncated"):
+        return TRUNCATED_MARKER
+    if node.get("skipped"):
+        return f"({node['skipped']})"
+    return ""
+
+
+def _ansi(style: str, color_system: str | None) -> tuple[str, str]:
+    """
+    Return the escape codes rich writes before and after text in `style`.
+    """
+    if color_system is None:
+        return "", ""
+    rendered = Style.parse(style).render("\0", color_system=COLOR_SYSTEMS[color_system])
+    start, _, end = rendered.partition("\0")
+    return start, end
+
+
+def render_plain(nodes: Iterable[dict], color_system: str | None = None) -> str:
+    """
+    Render nodes as text, one line per node.
+
+    Args:
+        nodes: node records in `teleport_tree` layout
+        color_system: a rich color system name ("standard", "256",
+            "truecolor") to color names with ANSI escapes, None for plain
+            text.
+    """
+    dir_start, dir_end = _ansi(DIR_STYLE, color_system)
+    file_start, file_end = _ansi(FILE_STYLE, color_system)
+    marker_start, marker_end = _ansi(MARKER_STYLE, color_system)
+    lines = []
+    for node in nodes:
+        if node.get("summary"):
+            line = f"{node['symbol']}{marker_start}{node['name']}{marker_end}"
+        elif node["is_dir"]:
+            line = f"{node['symbol']}{dir_start}{node['name']}{dir_end}"
+        else:
+            line = f"{node['symbol']}{file_start}{node['name']}{file_end}"
+        marker = _marker(node)
+        if marker:
+            line = f"{line} {marker_start}{marker}{marker_end}"
+        lines.append(line)
+    lines.append("")
+    return "\n".join(lines)
+
+
+def render_text(nodes: Iterable[dict]) -> Text:
+    """
+    Render nodes into a single rich `Text`.
+
+    Names are appended as plain strings with a style, so they are never
+    parsed as markup.
+    """
+    text = Text()
+    for node in nodes:
+        text.append(node["symbol"])
+        if node.get("summary"):
+            style = MARKER_STYLE
+        else:
+            style = DIR_STYLE if node["is_dir"] else FILE_STYLE
+        text.append(node["name"], style=style)
+        marker = _marker(node)
+        if marker:
+            text.append(f" {marker}", style=MARKER_STYLE)
+        text.append("\n")
+    return text
+
+
+def _batches(nodes: Iterable[dict], interval: float) -> Iterator[list[dict]]:
+    """
+    Group nodes into batches of `interval` seconds of production.
+
+    A node is held back until the next one arrives, since the walk may still
+    mark it (e.g. `skipped`) right after yielding it. The first node is
+    released on its own, for a low time to first line.
+    """
+    batch: list[dict] = []
+    pending = None
+    first = True
+    deadline = time.monotonic() + interval
+    for node in nodes:
+        if pending is not None:
+            batch.append(pending)
+            if first or time.monotonic() >= deadline:
+                yield batch
+                batch = []
+                first = False
+                deadline = time.monotonic() + interval
+        pending = node
+    if pending is not None:
+        batch.append(pending)
+    if batch:
+        yield batch
+
+
+def print_tree(
+    nodes: Iterable[dict],
+    file: TextIO | None = None,
+    flush_interval: float = 0.1,
+) -> None:
+    """
+    Write a tree with one write per batch of lines.
+
+    A list is written at once. Any other iterable, such as `iter_tree`, is
+    rendered progressively: lines are written every `flush_interval`
+    seconds while the walk is still running. Names are colored only when
+    `file` is a terminal with colors enabled (rich's detection, so
+    `NO_COLOR` and `FORCE_COLOR` are honored).
+
+    Lines already written are final. When a walk budget (`max_entries`,
+    `max_total_bytes`) runs out, `iter_tree` flags the directories left
+    open as `truncated` at the end of the walk, after their lines were
+    written, so a progressive render lacks their `…` marker. Render a list
+    to get every marker.
+
+    Args:
+        nodes: node records in `teleport_tree` layout
+        file: output stream, stdout by default
+        flush_interval: seconds between writes of a progressive render
+
+    Examples:
+        >>> print_tree(teleport_tree("./src"))
+        >>> print_tree(iter_tree("/"), flush_interval=0.05)
+    """
+    file = sys.stdout if file is None else file
+    batches = [nodes] if isinstance(nodes, list) else _batches(nodes, flush_interval)
+    console = Console(file=file)
+    if console.legacy_windows:  # no ANSI support, let rich drive the console
+        for batch in batches:
+            text = render_text(batch)
+            text.rstrip()
+            console.print(text, soft_wrap=True)
+        return
+    color_system = console.color_system if console.is_terminal else None
+    for batch in batches:
+        file.write(render_plain(batch, color_system))
+        file.flush()
+
+
+def format_size(size: int) -> str:
+    """
+    Format a byte count with decimal units, e.g. `37 MB`.
+    """
+    for unit in ("B", "KB", "MB", "GB", "TB"):
+        if size < 1000 or unit == "TB":
+            break
+        size /= 1000
+    return f"{size:.0f} {unit}" if unit == "B" or size >= 10 else f"{size:.1f} {unit}"
+
+
+def subtree_totals(
+    tree_list: list[dict], sizes: bool | bytearray = True
+) -> tuple[list[int], list[int]]:
+    """
+    Count the files below each node and add up their sizes, bottom-up.
+
+    Children always come after their parent in `_tree_list`, so one pass in
+    reverse order sees every node after all of its descendants.
+
+    Args:
+        tree_list: tree in `teleport_tree` layout
+        sizes: read file sizes (the node's `size` if present, else `lstat`);
+            a mask indexed like `tree_list` limits it to the marked files
+    Returns:
+        tuple: `(files, total_bytes)` lists, indexed like `tree_list`.
+    """
+    files = [0] * len(tree_list)
+    total_bytes = [0] * len(tree_list)
+    for idx in range(len(tree_list) - 1, -1, -1):
+        node = tree_list[idx]
+        if not node["is_dir"]:
+            files[idx] += 1
+            if sizes is True or (sizes and sizes[idx]):
+                size = node.get("size")
+                if size is None:
+                    try:
+                        size = os.lstat(node["path"]).st_size
+                    except OSError:
+                        size = 0
+                total_bytes[idx] += size
+        parent = node["parent"]
+        if parent >= 0:
+            files[parent] += files[idx]
+            total_bytes[parent] += total_bytes[idx]
+    return files, total_bytes
+
+
+def _group_key(node: dict) -> str:
+    if node["is_dir"]:
+        return "directories"
+    _, ext = os.path.splitext(node["name"])
+    return f"*{ext}" if ext else "files"
+
+
+def summarize_tree(
+    tree_list: list[dict],
+    max_children: int = 50,
+    preview: int = 5,
+    sizes: bool = True,
+    max_groups: int = 3,
+) -> list[dict]:
+    """
+    Collapse directories with more than `max_children` children.
+
+    Such a directory keeps its first `preview` children (with their own
+    subtrees, summarised the same way); the rest are replaced by summary
+    lines grouped by extension, largest group first, such as
+    `… 4,812 more *.json (37 MB)`. The output has at most
+    `preview + max_groups` lines per collapsed directory, however large it
+    is, and only the files that are collapsed have their size read.
+
+    Args:
+        tree_list: tree in `teleport_tree` layout
+        max_children: collapse directories with more children than this
+        preview: children kept before the summary lines
+        sizes: include byte sizes in the summary lines
+        max_groups: summary lines per directory; smaller groups are merged
+            into a final `… N more` line
+    Returns:
+        list: display records (`symbol`, `name`, `is_dir`, ...) for
+            `print_tree`/`render_plain`. Summary lines have `summary: True`.
+
+    Examples:
+        >>> print_tree(summarize_tree(teleport_tree("./data"), max_children=20))
+    """
+    if preview > max_children:
+        raise ValueError("preview must not be larger than max_children.")
+
+    def describe(label: str, count: int, size: int, nested_files: int) -> str:
+        details = []
+        if label == "directories":
+            if count == 1:
+                label = "directory"
+            details.append(f"{nested_files:,} files")
+        if sizes:
+            details.append(format_size(size))
+        text = f"… {count:,} more {label}"
+        return f"{text} ({', '.join(details)})" if details else text
+
+    # first hidden child -> hidden children, and where their subtrees end
+    collapse_at = {}
+    hidden_mask = bytearray(len(tree_list)) if sizes else None
+    for node in tree_list:
+        children = node["children"]
+        if node["is_dir"] and len(children) > max_children:
+            end = children[-1]
+            while tree_list[end]["children"]:
+                end = tree_list[end]["children"][-1]
+            collapse_at[children[preview]] = (children[preview:], end + 1)
+            if sizes:
+                start = children[preview]
+                hidden_mask[start : end + 1] = b"\x01" * (end + 1 - start)
+    files, total_bytes = subtree_totals(tree_list, hidden_mask or False)
+
+    output = []
+    idx = 0
+    while idx < len(tree_list):
+        collapsed = collapse_at.get(idx)
+        if collapsed is None:
+            output.append(tree_list[idx])
+            idx += 1
+            continue
+        hidden, end = collapsed
+        # label -> [entries, bytes, files below]
+        groups = defaultdict(lambda: [0, 0, 0])
+        for child in hidden:
+            group = groups[_group_key(tree_list[child])]
+            group[0] += 1
+            group[1] += total_bytes[child]
+            group[2] += files[child]
+        ranked = sorted(groups.items(), key=lambda g: (-g[1][0], g[0]))
+        if len(ranked) > max_groups:
+            rest = [totals for _, totals in ranked[max_groups - 1 :]]
+            ranked = ranked[: max_groups - 1]
+            ranked.append(("entries", [sum(column) for column in zip(*rest)]))
+        lines = [describe(label, *totals) for label, totals in ranked]
+        prefix = tree_list[idx]["symbol"][: -len(LAST_CONNECTOR)]
+        for pos, line in enumerate(lines):
+            connector = LAST_CONNECTOR if pos == len(lines) - 1 else MIDDLE_CONNECTOR
+            output.append(
+                {
+                    "symbol": prefix + connector,
+                    "name": line,
+                    "is_dir": False,
+                    "summary": True,
+                }
+            )
+        idx = end
+    return output
@@ -0,0 +1,307 @@
+"""
+Save a tree to a file and load it back without walking the disk.
+
+The binary format stores the columns of `CompactTreeStorage` as they are in
+memory, so a loaded snapshot is a storage whose columns are views of an
+`mmap` of the file: nothing is parsed per node until a record is read.
+
+Layout (all sections start on an 8-byte boundary):
+
+    header    magic, version, byte order, node count, section sizes
+    root      root path, UTF-8
+    names     name table, UTF-8 names separated by NUL
+    parent    int32 per node
+    sibling   int32 per node, next sibling or -1
+    depth     uint32 per node
+    name_id   uint32 per node, index into the name table
+    flags     uint8 per node, see `compact_tree`
+    metadata  size, mtime_ns, inode, dev: 64-bit per node, only if the tree
+              was walked with `metadata=True`
+    extras    JSON `{index: {key: value}}` for the rarer record keys
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from itertools import pairwise
+
+from pyteleport.core.compact_tree import (
+    HAS_BINARY_INFO,
+    IS_BINARY,
+    IS_DIR,
+    IS_LAST,
+    CompactTreeStorage,
+)
+from pyteleport.core.walker import (
+    LAST_CONNECTOR,
+    LAST_PREFIX,
+    METADATA_KEYS,
+    MIDDLE_CONNECTOR,
+    MIDDLE_PREFIX,
+)
+
+MAGIC = b"PTTS"
+SNAPSHOT_VERSION = 1
+# magic, version, little endian, has metadata, nodes, root bytes, name bytes,
+# extras bytes
+_HEADER = struct.Struct("<4sBBBxQQQQ")
+TRUNCATED = 16
+HAS_METADATA = 32
+# metadata columns, in file order
+_METADATA_COLUMNS = (("size", "Q"), ("mtime_ns", "q"), ("inode", "Q"), ("dev", "Q"))
+# keys kept in the columns; the metadata keys only for nodes with metadata
+_COLUMN_KEYS = {
+    "symbol",
+    "name",
+    "path",
+    "parent",
+    "children",
+    "is_dir",
+    "is_binary",
+    "truncated",
+}
+_METADATA_COLUMN_KEYS = _COLUMN_KEYS | set(METADATA_KEYS)
+
+
+def _padding(size: int) -> int:
+    return -size % 8
+
+
+def dump_snapshot(tree_list: list[dict], root_path: str, path: str) -> None:
+    """
+    Write `tree_list` to `path` in the binary snapshot format.
+
+    Args:
+        tree_list: tree in `teleport_tree` layout
+        root_path: path of the root node, from which the paths are rebuilt
+        path: output file
+    """
+    size = len(tree_list)
+    parent = array("i", [-1]) * size
+    next_sibling = array("i", [-1]) * size
+    depth = array("I", [0]) * size
+    name_id = array("I", [0]) * size
+    flags = array("B", [0]) * size
+    has_metadata = any("mtime_ns" in node for node in tree_list)
+    metadata = [
+        array(code, [0]) * (size if has_metadata else 0)
+        for _, code in _METADATA_COLUMNS
+    ]
+    names: dict[str, int] = {}
+    extras: dict[int, dict] = {}
+    for idx, node in enumerate(tree_list):
+        parent_idx = parent[idx] = node["parent"]
+        if parent_idx >= 0:
+            depth[idx] = depth[parent_idx] + 1
+        children = node["children"]
+        for child, sibling in pairwise(children):
+            next_sibling[child] = sibling
+        name_id[idx] = names.setdefault(node["name"], len(names))
+        flag = IS_DIR if node["is_dir"] else 0
+        if idx == 0 or (
+            parent_idx >= 0 and tree_list[parent_idx]["children"][-1] == idx
+        ):
+            flag |= IS_LAST
+        is_binary = node.get("is_binary")
+        if is_binary is not None:
+            flag |= HAS_BINARY_INFO | (IS_BINARY if is_binary == "binary" else 0)
+        if node.get("truncated"):
+            flag |= TRUNCATED
+        if has_metadata and "mtime_ns" in node:
+            flag |= HAS_METADATA
+            for column, (key, _) in zip(metadata, _METADATA_COLUMNS):
+                column[idx] = node[key]
+        flags[idx] = flag
+        in_columns = _METADATA_COLUMN_KEYS if flag & HAS_METADATA else _COLUMN_KEYS
+        extra = {key: value for key, value in node.items() if key not in in_columns}
+        if extra:
+            extras[idx] = extra
+
+    root = root_path.encode()
+    name_table = "\0".join(names).encode()
+    extras_json = json.dumps(extras, separators=(",", ":")).encode() if extras else b""
+    header = _HEADER.pack(
+        MAGIC,
+        SNAPSHOT_VERSION,
+        sys.byteorder == "little",
+        has_metadata,
+        size,
+        len(root),
+        len(name_table),
+        len(extras_json),
+    )
+    with open(path, "wb") as f:
+        for section in (
+            header,
+            root,
+            name_table,
+            parent,
+            next_sibling,
+            depth,
+            name_id,
+            flags,
+            *metadata,
+            extras_json,
+        ):
+            data = section if isinstance(section, bytes) else section.tobytes()
+            f.write(data)
+            f.write(b"\0" * _padding(len(data)))
+
+
+class SnapshotStorage(CompactTreeStorage):
+    """
+    `CompactTreeStorage` whose columns are views of a mapped snapshot file.
+
+    The mapping is copy-on-write: edits such as `add_binary_info` stay in
+    memory and never reach the file.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        view = memoryview(self._map)
+        if len(view) < _HEADER.size:
+            raise ValueError(f"Not a tree snapshot: {path}")
+        (
+            magic,
+            version,
+            little,
+            has_metadata,
+            size,
+            root_size,
+            names_size,
+            extras_size,
+        ) = _HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise ValueError(f"Not a tree snapshot: {path}")
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {version}: {path}")
+        if bool(little) != (sys.byteorder == "little"):
+            raise ValueError(f"Snapshot written with another byte order: {path}")
+
+        offset = _HEADER.size
+
+        def section(length: int) -> memoryview:
+            nonlocal offset
+            data = view[offset : offset + length]
+            offset += length + _padding(length)
+            return data
+
+        super().__init__(str(section(root_size), "utf-8"))
+        self.names = str(section(names_size), "utf-8").split("\0")
+        self.parent = section(4 * size).cast("i")
+        self.next_sibling = section(4 * size).cast("i")
+        self.depth = section(4 * size).cast("I")
+        self.name_id = section(4 * size).cast("I")
+        self.flags = section(size).cast("B")
+        self._metadata = [
+            (key, section(8 * size).cast(code))
+            for key, code in (_METADATA_COLUMNS if has_metadata else ())
+        ]
+        extras = section(extras_size)
+        self._extras = (
+            {int(k): v for k, v in json.loads(bytes(extras)).items()} if extras else {}
+        )
+
+    def record(self, idx: int, symbol: str | None = None, path: str | None = None):
+        record = super().record(idx, symbol, path)
+        if self.flags[idx] & TRUNCATED:
+            record["truncated"] = True
+        if self.flags[idx] & HAS_METADATA:
+            for key, column in self._metadata:
+                record[key] = column[idx]
+        extra = self._extras.get(idx)
+        if extra:
+            record.update(extra)
+        return record
+
+    def records(self) -> list[dict]:
+        """
+        Build the whole tree in `teleport_tree` layout, in one pass.
+
+        Parents come before their children, so each path and symbol is the
+        parent's plus one segment.
+        """
+        names, name_id, flags, parent = (
+            self.names,
+            self.name_id,
+            self.flags,
+            self.parent,
+        )
+        metadata = self._metadata
+        sep = os.sep
+        root_prefix = os.path.join(self.root_path, "")
+        # prefix of the children's symbols, by index of a directory
+        prefixes = {0: ""}
+        records = []
+        for idx in range(len(parent)):
+            flag = flags[idx]
+            name = names[name_id[idx]]
+            parent_idx = parent[idx]
+            if idx == 0:
+                symbol, path = "", self.root_path
+            else:
+                prefix = prefixes[parent_idx]
+                is_last = flag & IS_LAST
+                symbol = prefix + (LAST_CONNECTOR if is_last else MIDDLE_CONNECTOR)
+                if flag & IS_DIR:
+                    prefixes[idx] = prefix + (LAST_PREFIX if is_last else MIDDLE_PREFIX)
+                if parent_idx == 0:
+                    path = root_prefix + name
+                else:
+                    path = records[parent_idx]["path"] + sep + name
+                records[parent_idx]["children"].append(idx)
+            record = {
+                "symbol": symbol,
+                "name": name,
+                "path": path,
+                "parent": parent_idx,
+                "children": [],
+                "is_dir": bool(flag & IS_DIR),
+            }
+            if flag & HAS_BINARY_INFO:
+                if flag & IS_DIR:
+                    record["is_binary"] = "dir"
+                else:
+                    record["is_binary"] = "binary" if flag & IS_BINARY else "text"
+            if flag & TRUNCATED:
+                record["truncated"] = True
+            if flag & HAS_METADATA:
+                for key, column in metadata:
+                    record[key] = column[idx]
+            extra = self._extras.get(idx)
+            if extra:
+                record.update(extra)
+            records.append(record)
+        return records
+
+
+def dump_json(tree_list: list[dict], root_path: str, path: str) -> None:
+    """
+    Write `tree_list` to `path` as JSON, for debugging and other tools.
+    """
+    snapshot = {"version": SNAPSHOT_VERSION, "root": root_path, "nodes": tree_list}
+    with open(path, "w") as f:
+        json.dump(snapshot, f, ensure_ascii=False, indent=1)
+
+
+def load_json(path: str) -> tuple[str, list[dict]]:
+    """
+    Read a snapshot written by `dump_json`.
+
+    Returns:
+        tuple: `(root_path, tree_list)`
+    """
+    with open(path, "r") as f:
+        snapshot = json.load(f)
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version: {path}")
+    return snapshot["root"], snapshot["nodes"]
+
+
+def is_binary_snapshot(path: str) -> bool:
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
@@ -1,19 +1,40 @@
+import fnmatch
 import os
+import re
+from collections.abc import Callable
 
 from binaryornot.check import is_binary
-from rich import print
 
 from pyteleport.core.algorithm import apply_asterisk_rule
 from pyteleport.rule import CompositeRule
 from pyteleport.rule.rule_factory import RuleFactory
 from pyteleport.core._singlefile import _SingleFile
+from pyteleport.core.git_index import git_index_tree
+from pyteleport.core.path_index import PathIndex
+from pyteleport.core.tree_edit import prune_tree
+from pyteleport.core.render import print_tree, render_plain, summarize_tree
+from pyteleport.core.snapshot import (
+    SnapshotStorage,
+    dump_json,
+    dump_snapshot,
+    is_binary_snapshot,
+    load_json,
+)
+from pyteleport.core.walk_cache import WalkCache, cached_walk
+from pyteleport.core.walker import parallel_walk, scandir_walk
 
 
 def teleport_tree(
     path: str,
     rule_fn: CompositeRule | None = None,
-    _prefix: str = "",
-    _visited_list: list[str] | None = None,
+    workers: int | None = None,
+    cache: WalkCache | None = None,
+    max_depth: int | None = None,
+    max_entries: int | None = None,
+    max_total_bytes: int | None = None,
+    one_file_system: bool = False,
+    dedupe_hardlinks: bool = False,
+    metadata: bool = False,
 ):
     """
     Get tree structure of the path. like `tree` command.
@@ -21,59 +42,75 @@ def teleport_tree(
     Args:
         path: start path
         rule_fn: rule function
+        workers: list directories on this many threads. The result is the
+            same as the serial walk; useful on network/overlay filesystems.
+        cache: reuse the listings of unchanged directories from this
+            snapshot cache, and update it.
+        max_depth: do not descend below this depth (the root's entries are
+            at depth 1).
+        max_entries: stop after this many entries.
+        max_total_bytes: stop before the file sizes add up to more than
+            this.
+        one_file_system: do not descend into directories on another device
+            (mount points).
+        dedupe_hardlinks: list a file with several hard links only once.
+        metadata: record `size`, `mtime_ns`, `inode` and `dev` in each node,
+            so later steps need no `stat` of their own.
     Returns:
-        list: tree structure of the path.
+        list: tree structure of the path. When a budget runs out the walk
+            stops early and directories with unlisted entries are marked
+            with `"truncated": True`. Directories already walked (symlink
+            loops, repeated bind mounts) are not walked again and are
+            marked with `"skipped": "cycle"`.
 
     Examples:
         >>> from pyteleport import tree
         >>> tree("./src", rule_fn=HiddenFileRule())
     """
-    # Init visited list.
-    if _visited_list is None:
-        _visited_list = []
-
-    if _prefix == "":
-        # add root info to visited list ad dict
-        visited_dict = {
-            "symbol": "",
-            "name": path,
-            "path": path,
-            "parent": -1,  # -1 means root
-            "children": [],
-            "is_dir": os.path.isdir(path),
-        }
-        _visited_list.append(visited_dict)
-
-        if not _visited_list[0]["is_dir"]:  # If init path is file, return
-            return _visited_list
-
-    entries = os.listdir(path)
-    if rule_fn is not None:
-        entries = [entry for entry in entries if rule_fn.matches(entry)]
-    entries_count = len(entries)
-
-    parent_idx = len(_visited_list) - 1
-
-    for idx, entry in enumerate(entries):
-        full_path = os.path.join(path, entry)
-        connector = "└── " if idx == entries_count - 1 else "├── "
-        visited_dict = {
-            "symbol": f"{_prefix}{connector}",
-            "name": entry,
-            "path": full_path,
-            "parent": parent_idx,
-            "children": [],
-            "is_dir": os.path.isdir(full_path),
+    if workers is not None and cache is not None:
+        raise ValueError("workers and cache cannot be used together.")
+    budgets = (max_depth, max_entries, max_total_bytes)
+    flags = (one_file_system, dedupe_hardlinks, metadata)
+    if any(b is not None for b in budgets) or any(flags):
+        if workers is not None or cache is not None:
+            raise ValueError(
+                "Walk budgets, link options and metadata cannot be used with "
+                "workers or cache."
+            )
+        options = {
+            "max_depth": max_depth,
+            "max_entries": max_entries,
+            "max_total_bytes": max_total_bytes,
+            "one_file_system": one_file_system,
+            "dedupe_hardlinks": dedupe_hardlinks,
+            "metadata": metadata,
         }
-        _visited_list.append(visited_dict)
-        _visited_list[parent_idx]["children"].append(len(_visited_list) - 1)
-        if os.path.isdir(full_path):
-            next_prefix = _prefix + ("    " if idx == entries_count - 1 else "│   ")
-            teleport_tree(full_path, rule_fn, next_prefix, _visited_list)
-    return _visited_list
+        return scandir_walk(path, rule_fn, **options)
+    if cache is not None:
+        return cached_walk(path, rule_fn, cache)
+    if workers is not None:
+        return parallel_walk(path, rule_fn, workers)
+    return scandir_walk(path, rule_fn)
+
+
+def binary_kind(node: dict) -> str:
+    """
+    Return the `is_binary` value of a node: "dir", "binary" or "text".
+
+    Files known to be empty from the walk metadata are text without being
+    opened.
+    """
+    if node["is_dir"]:
+        return "dir"
+    if node.get("size") == 0:
+        return "text"
+    return "binary" if is_binary(node["path"]) else "text"
 
 
 class TeleportTree:
+    # built on the first lookup, see `node`
+    _path_index: PathIndex | None = None
+
     def __init__(
         self,
         path: str,
@@ -81,18 +118,128 @@ class TeleportTree:
         exclude_patterns: list[str] = None,
         special_words: list[str] = None,
         gitignore_path: str = "./.gitignore",
+        workers: int | None = None,
+        cache_dir: str | None = None,
+        max_depth: int | None = None,
+        max_entries: int | None = None,
+        max_total_bytes: int | None = None,
+        one_file_system: bool = False,
+        dedupe_hardlinks: bool = False,
+        metadata: bool = False,
+        rule_cache_size: int | None = None,
+        optimize_rules: bool = False,
     ):
         self._path = self._first_path = path
         self.rule_fn = RuleFactory.simplify_create_rule(
+            include_patterns,
+            exclude_patterns,
+            special_words,
+            cache_size=rule_cache_size,
+            optimize=optimize_rules,
+            gitignore_path=gitignore_path,
+            root=path,
+            rule_cache_dir=(
+                os.path.join(cache_dir, "rules") if cache_dir is not None else None
+            ),
+        )
+
+        cache = WalkCache(cache_dir) if cache_dir is not None else None
+        # reused when a watcher rebuilds the tree
+        self._walk_options = {
+            "workers": workers,
+            "cache": cache,
+            "max_depth": max_depth,
+            "max_entries": max_entries,
+            "max_total_bytes": max_total_bytes,
+            "one_file_system": one_file_system,
+            "dedupe_hardlinks": dedupe_hardlinks,
+            "metadata": metadata,
+        }
+        self._tree_list = teleport_tree(path, self.rule_fn, **self._walk_options)
+
+    @classmethod
+    def from_git_index(
+        cls,
+        repo: str,
+        include_patterns: list[str] | None = None,
+        exclude_patterns: list[str] | None = None,
+        special_words: list[str] | None = None,
+        gitignore_path: str = "./.gitignore",
+        include_untracked: bool = False,
+    ) -> "TeleportTree":
+        """
+        Build the tree of a git checkout from `.git/index` instead of a walk.
+
+        Args:
+            repo: root of the checkout
+            include_untracked: also list files that are neither tracked nor
+                ignored, which needs a walk of the non-ignored directories.
+
+        Examples:
+            >>> tree = TeleportTree.from_git_index(".", include_patterns=["*.py"])
+        """
+        tree = cls.__new__(cls)
+        tree._path = tree._first_path = repo
+        tree.rule_fn = RuleFactory.simplify_create_rule(
             include_patterns,
             exclude_patterns,
             special_words,
             gitignore_path=gitignore_path,
+            root=repo,
         )
-        print(self.rule_fn.rules[0].matches("test_rule.py"))
-        print(self.rule_fn.rules[0].matches("test_rule.pyc"))
+        tree._tree_list = git_index_tree(repo, tree.rule_fn, include_untracked)
+        tree._walk_options = {}
+        return tree
+
+    def dump(self, path: str, format: str = "binary") -> None:
+        """
+        Save the tree to a file, see `load`.
 
-        self._tree_list = teleport_tree(path, self.rule_fn)
+        Args:
+            path: output file
+            format: "binary", a compact snapshot that loads in milliseconds,
+                or "json", for debugging and other tools.
+        """
+        root_path = self._tree_list[0]["path"]
+        if format == "binary":
+            dump_snapshot(self._tree_list, root_path, path)
+        elif format == "json":
+            dump_json(self._tree_list, root_path, path)
+        else:
+            raise ValueError(f"Invalid format: {format}")
+
+    @classmethod
+    def load(cls, path: str) -> "TeleportTree":
+        """
+        Load a tree saved by `dump`, in either format.
+
+        A binary snapshot is mapped, not parsed: the records are built in
+        one pass on first use, reading the name table and the fixed-width
+        columns in place. The rules used to build the tree are not saved,
+        so `rule_fn` is None.
+
+        Examples:
+            >>> TeleportTree("./src").dump("src.tree")
+            >>> TeleportTree.load("src.tree").print
+        """
+        tree = cls.__new__(cls)
+        tree.rule_fn = None
+        tree._walk_options = {}
+        if is_binary_snapshot(path):
+            tree._snapshot = SnapshotStorage(path)
+            tree._path = tree._first_path = tree._snapshot.root_path
+        else:
+            tree._path, tree._tree_list = load_json(path)
+            tree._first_path = tree._path
+        return tree
+
+    def __getattr__(self, name: str):
+        # the records of a tree loaded from a binary snapshot are built on
+        # first use; afterwards `_tree_list` is a plain attribute again
+        if name == "_tree_list" and "_snapshot" in self.__dict__:
+            self._tree_list = self.__dict__.pop("_snapshot").records()
+            return self._tree_list
+        raise AttributeError(name)
 
     @property
     def tree_list(self) -> list[str]:
@@ -100,15 +247,64 @@ class TeleportTree:
 
     @property
     def __len__(self) -> int:
-        return len(self._tree_list)
+        snapshot = self.__dict__.get("_snapshot")
+        return len(self._tree_list if snapshot is None else snapshot)
 
     @property
     def print(self) -> None:
-        for tree_dict in self._tree_list:
-            if tree_dict["is_dir"]:
-                print(f"{tree_dict['symbol']}[magenta]{tree_dict['name']}[/magenta]")
-            else:
-                print(f"{tree_dict['symbol']}[cyan]{tree_dict['name']}[/cyan]")
+        print_tree(self._tree_list)
+
+    def _index(self) -> PathIndex:
+        if self._path_index is None:
+            self._path_index = PathIndex(self._tree_list)
+        return self._path_index
+
+    def node(self, rel_path: str) -> dict | None:
+        """
+        Return the node at `rel_path`, or None.
+
+        Lookups go through a hash index built on first use; `watch` updates
+        keep it current, renames and pruning rebuild it on the next lookup.
+
+        Args:
+            rel_path: `/`-separated path relative to the root, "" for the root
+
+        Examples:
+            >>> tree.node("pyteleport/core/tree.py")["is_dir"]
+            False
+        """
+        return self._index().get(rel_path)
+
+    def find_name(self, name: str) -> list[dict]:
+        """
+        Return the nodes named `name`, in tree order (nodes added by
+        `watch` come last).
+
+        Examples:
+            >>> [node["path"] for node in tree.find_name("__init__.py")]
+        """
+        return self._index().find_name(name)
+
+    def print_summary(self, max_children: int = 50, preview: int = 5) -> None:
+        """
+        Print the tree with directories above `max_children` children
+        collapsed into summary lines, see `summarize_tree`.
+        """
+        print_tree(summarize_tree(self._tree_list, max_children, preview))
+
+    def to_text(self, max_children: int | None = None, preview: int = 5) -> str:
+        """
+        Return the tree as plain text, e.g. for a prompt.
+
+        Args:
+            max_children: if given, collapse directories with more children
+                than this into summary lines, which bounds the output size.
+            preview: children kept in a collapsed directory
+        """
+        nodes = self._tree_list
+        if max_children is not None:
+            nodes = summarize_tree(nodes, max_children, preview)
+        return render_plain(nodes)
 
     def change_name_root(self, change_root_name: str) -> None:
         self._path = change_root_name
@@ -125,13 +321,52 @@ class TeleportTree:
         """
         if len(self._tree_list) <= 1:
             return
+        self.rename_all(change_rule)
+
+    def rename_all(
+        self, rule: str | Callable[[str], str], files_only: bool = False
+    ) -> None:
+        """
+        Rename every node except a directory root, and rebuild the paths.
+
+        Names and paths are updated in one pass in DFS order: a parent always
+        comes before its children, so each path is its parent's path plus a
+        separator and the name.
 
-        for idx, tree_dict in enumerate(self._tree_list):
-            if idx == 0 and tree_dict["is_dir"]:
-                continue
+        Args:
+            rule: asterisk rule (see `apply_asterisk_rule`), or a callable
+                mapping the old name to the new one
+            files_only: leave directory names unchanged
+
+        Examples:
+            >>> tree.rename_all("test_*")  # a.py -> test_a.py
+            >>> tree.rename_all(str.lower)
+        """
+        if callable(rule):
+            rename = rule
+        else:
+            # same as `apply_asterisk_rule`, with the rule split only once
+            parts = rule.split("*")
+
+            def rename(name: str) -> str:
+                return name.join(parts)
+
+        self._path_index = None
+        tree_list = self._tree_list
+        root = tree_list[0]
+        if not root["is_dir"]:
+            root["name"] = rename(root["name"])
+            return
+        root_prefix = os.path.join(root["path"], "")
+        sep = os.sep
+        for node in tree_list[1:]:
+            if not (files_only and node["is_dir"]):
+                node["name"] = rename(node["name"])
+            parent = node["parent"]
+            if parent == 0:
+                node["path"] = root_prefix + node["name"]
             else:
-                self._update_tree(idx, change_rule, mode="add")
-        self._update_path()
+                node["path"] = tree_list[parent]["path"] + sep + node["name"]
 
     def _update_tree(
         self, idx: int, update_name_or_rule: str, mode: str = "add"
@@ -145,27 +380,24 @@ class TeleportTree:
         else:
             raise ValueError(f"Invalid mode: {mode}")
         self._tree_list[idx]["name"] = update_name
+        self._path_index = None
 
     def _update_path(self):
         # note: this method is able to use when `name` update already completed.
-        def _update_path_recursive(idx: int):
-            children_idx = self._tree_list[idx]["children"]
-            for child_idx in children_idx:
-                self._tree_list[child_idx]["path"] = os.path.join(
-                    self._tree_list[idx]["path"], self._tree_list[child_idx]["name"]
-                )
-                _update_path_recursive(child_idx)
-
-        _update_path_recursive(0)
+        # DFS order puts every parent before its children, so one forward
+        # pass is enough and deep trees do not recurse.
+        tree_list = self._tree_list
+        root_prefix = os.path.join(tree_list[0]["path"], "")
+        for node in tree_list[1:]:
+            parent = node["parent"]
+            if parent == 0:
+                node["path"] = root_prefix + node["name"]
+            else:
+                node["path"] = tree_list[parent]["path"] + os.sep + node["name"]
 
     def _judge_binary_file(self) -> bool:
         for tree_dict in self._tree_list:
-            if tree_dict["is_dir"]:
-                tree_dict["is_binary"] = "dir"
-            elif is_binary(tree_dict["path"]):
-                tree_dict["is_binary"] = "binary"
-            else:
-                tree_dict["is_binary"] = "text"
+            tree_dict["is_binary"] = binary_kind(tree_dict)
         return self._tree_list
 
     def add_binary_info(self) -> None:
@@ -180,27 +412,71 @@ class TeleportTree:
         single_file = _SingleFile(self, template, output_path)
         single_file.to_single_file(is_lineno)
 
+    def watch(self, backend: str = "auto", poll_interval: float = 1.0):
+        """
+        Keep the tree in sync with the filesystem.
+
+        Args:
+            backend: "inotify", "poll", or "auto" (inotify when available)
+            poll_interval: seconds between scans of the polling backend
+        Returns:
+            TreeWatcher: call `poll()` to apply pending changes.
+        """
+        from pyteleport.core.watch import TreeWatcher
+
+        return TreeWatcher(self, backend=backend, poll_interval=poll_interval)
+
+    def subtree(self, path: str):
+        """
+        Return a read-only view of the subtree rooted at `path`.
+
+        The view shares this tree's records, so it is made without copying
+        nodes or touching the disk, and supports `print`, `to_single_file`
+        and iteration like a tree built from that directory.
+
+        Args:
+            path: `/`-separated path relative to the root, or a path
+                starting with the root path
+        Returns:
+            TeleportTreeView
+        Raises:
+            ValueError: if the tree has no such node.
+        """
+        from pyteleport.core.tree_view import TeleportTreeView, find_subtree
+
+        return TeleportTreeView(self._tree_list, find_subtree(self._tree_list, path))
+
+    def prune(
+        self, keep: Callable[[dict], bool], remove_empty_dirs: bool = True
+    ) -> None:
+        """
+        Drop the nodes for which `keep(node)` is false, with their subtrees.
+
+        Runs in one pass over the tree: indices are remapped, connector
+        symbols recomputed and, with `remove_empty_dirs`, directories left
+        without children are dropped as well. The root is always kept.
+
+        Args:
+            keep: predicate on a node record
+            remove_empty_dirs: drop directories emptied by the pruning
+        """
+        tree_list = self._tree_list
+        flags = [True] + [keep(node) for node in tree_list[1:]]
+        self._tree_list = prune_tree(tree_list, flags, remove_empty_dirs)
+        self._path_index = None
+
     def exclude_leaf(self, exclude_patterns: list[str]) -> None:
         """
         Exclude leaves from the tree that match the given patterns.
 
+        The patterns are compiled into a single regular expression, and
+        directories left empty are removed.
+
         Args:
             exclude_patterns: List of glob patterns to exclude
         """
         if not exclude_patterns:
             return
-
-        from fnmatch import fnmatch
-
-        # Create a new tree_list excluding matching files
-        new_tree_list = []
-        for item in self._tree_list:
-            # Keep directories and files that don't match any exclude pattern
-            if item["is_dir"]:
-                new_tree_list.append(item)
-            else:
-                filename = os.path.basename(item["path"])
-                if not any(fnmatch(filename, pattern) for pattern in exclude_patterns):
-                    new_tree_list.append(item)
-
-        self._tree_list = new_tree_list
+        matcher = re.compile("|".join(fnmatch.translate(p) for p in exclude_patterns))
+        match = matcher.match
+        self.prune(lambda node: node["is_dir"] or match(node["name"]) is None)
@@ -0,0 +1,239 @@
+"""
+In-place edits of a DFS-ordered `_tree_list`.
+
+Every node's subtree is the contiguous range `[idx, subtree_end(idx))`, and a
+node's symbol is its ancestors' continuation segments (`│   ` or `    `)
+followed by its own connector, four characters each.
+"""
+
+from collections.abc import Sequence
+
+from pyteleport.core.walker import (
+    LAST_CONNECTOR,
+    LAST_PREFIX,
+    MIDDLE_CONNECTOR,
+    MIDDLE_PREFIX,
+)
+
+SEGMENT_WIDTH = len(LAST_CONNECTOR)
+
+
+def subtree_end(tree_list: list[dict], idx: int) -> int:
+    """
+    Return the index one past the last descendant of `idx`.
+    """
+    while tree_list[idx]["children"]:
+        idx = tree_list[idx]["children"][-1]
+    return idx + 1
+
+
+def child_prefix(symbol: str) -> str:
+    """
+    Return the prefix of the children of a node drawn with `symbol`.
+    """
+    if not symbol:  # root
+        return ""
+    if symbol.endswith(LAST_CONNECTOR):
+        return symbol[:-SEGMENT_WIDTH] + LAST_PREFIX
+    return symbol[:-SEGMENT_WIDTH] + MIDDLE_PREFIX
+
+
+def set_last(tree_list: list[dict], idx: int, is_last: bool) -> None:
+    """
+    Redraw `idx` as the last (or not last) of its siblings.
+
+    Only the node's connector and the matching segment of its descendants
+    change.
+    """
+    symbol = tree_list[idx]["symbol"]
+    column = len(symbol) - SEGMENT_WIDTH
+    connector = LAST_CONNECTOR if is_last else MIDDLE_CONNECTOR
+    if symbol[column:] == connector:
+        return
+    tree_list[idx]["symbol"] = symbol[:column] + connector
+    segment = LAST_PREFIX if is_last else MIDDLE_PREFIX
+    for node in tree_list[idx + 1 : subtree_end(tree_list, idx)]:
+        symbol = node["symbol"]
+        node["symbol"] = symbol[:column] + segment + symbol[column + SEGMENT_WIDTH :]
+
+
+def _shift(tree_list: list[dict], anchor: int, start: int, threshold: int, delta: int):
+    """
+    Add `delta` to every index `>= threshold`.
+
+    Only the ancestors of `anchor` (inclusive) and the nodes from `start` on
+    can refer to such indices.
+    """
+    ancestor = anchor
+    while ancestor != -1:
+        node = tree_list[ancestor]
+        node["children"] = [
+            c + delta if c >= threshold else c for c in node["children"]
+        ]
+        ancestor = node["parent"]
+    for node in tree_list[start:]:
+        if node["parent"] >= threshold:
+            node["parent"] += delta
+        if node["children"]:
+            node["children"] = [c + delta for c in node["children"]]
+
+
+def insert_subtree(tree_list: list[dict], parent_idx: int, nodes: list[dict]) -> int:
+    """
+    Insert `nodes` as the new last child of `parent_idx`.
+
+    Args:
+        tree_list: tree to edit in place
+        parent_idx: index of the parent directory
+        nodes: subtree in `teleport_tree` layout, rooted at `nodes[0]`, with
+            indices and symbols relative to that root.
+    Returns:
+        int: index of the inserted subtree root.
+    """
+    pos = subtree_end(tree_list, parent_idx)
+    siblings = tree_list[parent_idx]["children"]
+    if siblings:
+        set_last(tree_list, siblings[-1], False)
+    _shift(tree_list, parent_idx, pos, pos, len(nodes))
+
+    prefix = child_prefix(tree_list[parent_idx]["symbol"])
+    for local_idx, node in enumerate(nodes):
+        if local_idx == 0:
+            node["parent"] = parent_idx
+            node["symbol"] = prefix + LAST_CONNECTOR
+        else:
+            node["parent"] += pos
+            node["symbol"] = prefix + LAST_PREFIX + node["symbol"]
+        node["children"] = [c + pos for c in node["children"]]
+    tree_list[pos:pos] = nodes
+    tree_list[parent_idx]["children"].append(pos)  # `_shift` rebuilt the list
+    return pos
+
+
+def remove_subtree(tree_list: list[dict], idx: int) -> int:
+    """
+    Remove `idx` and its descendants.
+
+    Returns:
+        int: number of nodes removed.
+    """
+    if idx == 0:
+        raise ValueError("The root cannot be removed.")
+    end = subtree_end(tree_list, idx)
+    parent_idx = tree_list[idx]["parent"]
+    siblings = tree_list[parent_idx]["children"]
+    was_last = siblings[-1] == idx
+    siblings.remove(idx)
+    if was_last and siblings:
+        set_last(tree_list, siblings[-1], True)
+
+    del tree_list[idx:end]
+    _shift(tree_list, parent_idx, idx, end, idx - end)
+    return end - idx
+
+
+def find_node(tree_list: list[dict], rel_path: str, start: int = 0) -> int | None:
+    """
+    Find a node by its `/`-separated path relative to the root, or to the
+    node at index `start`.
+
+    Follows the children lists from the root, so it costs the sum of the
+    fan-outs along the path rather than a scan of the whole tree.
+    """
+    idx = start
+    if rel_path in ("", "."):
+        return idx
+    for name in rel_path.split("/"):
+        for child in tree_list[idx]["children"]:
+            if tree_list[child]["name"] == name:
+                idx = child
+                break
+        else:
+            return None
+    return idx
+
+
+def iter_rel_paths(tree_list: list[dict]):
+    """
+    Yield `(index, rel_path)` for every node in one DFS pass.
+    """
+    rel_paths: list[str] = []
+    for idx, node in enumerate(tree_list):
+        parent = node["parent"]
+        if parent < 0:
+            rel_path = ""
+        elif parent == 0:
+            rel_path = node["name"]
+        else:
+            rel_path = f"{rel_paths[parent]}/{node['name']}"
+        rel_paths.append(rel_path)
+        yield idx, rel_path
+
+
+def prune_tree(
+    tree_list: list[dict], keep: Sequence[bool], remove_empty_dirs: bool = True
+) -> list[dict]:
+    """
+    Drop the nodes where `keep[idx]` is false, in O(nodes).
+
+    A dropped directory takes its subtree with it. With `remove_empty_dirs`,
+    a directory whose children were all dropped goes too (directories that
+    were empty to begin with stay). Indices are remapped and connector
+    symbols recomputed, so the result is a valid `_tree_list`.
+
+    A reverse pass decides which nodes survive and which survivor is the
+    last child of its parent; a forward pass renumbers the survivors and
+    redraws their symbols. The node dicts are reused.
+
+    Args:
+        tree_list: tree to prune; its node dicts are updated in place
+        keep: per-index flag, the root is always kept
+        remove_empty_dirs: also drop directories emptied by the pruning
+    Returns:
+        list: the pruned tree.
+    """
+    size = len(tree_list)
+    alive = bytearray(size)
+    has_alive_child = bytearray(size)
+    is_last = bytearray(size)
+    for idx in range(size - 1, 0, -1):
+        node = tree_list[idx]
+        if not keep[idx]:
+            continue
+        if (
+            remove_empty_dirs
+            and node["is_dir"]
+            and node["children"]
+            and not has_alive_child[idx]
+        ):
+            continue
+        alive[idx] = 1
+        parent = node["parent"]
+        if not has_alive_child[parent]:  # seen first in reverse: last child
+            has_alive_child[parent] = 1
+            is_last[idx] = 1
+
+    new_index = [-1] * size
+    new_index[0] = 0
+    # prefix of the children of each kept node, by old index
+    prefixes = {0: ""}
+    pruned = [tree_list[0]]
+    tree_list[0]["children"] = []
+    for idx in range(1, size):
+        if not alive[idx]:
+            continue
+        node = tree_list[idx]
+        parent = node["parent"]
+        if new_index[parent] < 0:  # an ancestor was dropped
+            continue
+        new_index[idx] = len(pruned)
+        prefix = prefixes[parent]
+        last = is_last[idx]
+        node["symbol"] = prefix + (LAST_CONNECTOR if last else MIDDLE_CONNECTOR)
+        if node["is_dir"]:
+            prefixes[idx] = prefix + (LAST_PREFIX if last else MIDDLE_PREFIX)
+        node["parent"] = new_index[parent]
+        node["children"] = []
+        pruned[node["parent"]]["children"].append(new_index[idx])
+        pruned.append(node)
+    return pruned
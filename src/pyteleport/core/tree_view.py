@@ -0,0 +1,165 @@
+import os
+from collections.abc import Iterator, Mapping, Sequence
+
+from pyteleport.core._singlefile import _SingleFile
+from pyteleport.core.render import print_tree
+from pyteleport.core.tree import binary_kind
+from pyteleport.core.tree_edit import find_node, subtree_end
+
+
+class _SubtreeRecord(Mapping):
+    """
+    A node of the parent tree, read as a record of the subtree.
+
+    `symbol`, `parent` and `children` (and `name` for the subtree root) are
+    re-based when they are read; every other key is the parent node's, so
+    the node is never copied. `children` is built as a new list on each
+    read.
+    """
+
+    __slots__ = ("_is_root", "_node", "_nodes")
+
+    def __init__(self, node: dict, nodes: "_SubtreeNodes", is_root: bool):
+        self._node = node
+        self._nodes = nodes
+        self._is_root = is_root
+
+    def __getitem__(self, key: str):
+        node = self._node
+        if key == "symbol":
+            return "" if self._is_root else node["symbol"][self._nodes._strip :]
+        if key == "parent":
+            return -1 if self._is_root else node["parent"] - self._nodes._start
+        if key == "children":
+            start = self._nodes._start
+            return [child - start for child in node["children"]]
+        if key == "name" and self._is_root:
+            return node["path"]
+        return node[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._node)
+
+    def __len__(self) -> int:
+        return len(self._node)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class _SubtreeNodes(Sequence):
+    """
+    Read-only `_tree_list` of a subtree, re-based on access.
+
+    Each record is a `_SubtreeRecord` over the parent tree's node: the
+    indices are shifted by the subtree offset, the symbols lose the prefix
+    drawn by the subtree root's ancestors and the root is named after its
+    path. Nothing is stored or copied per node.
+    """
+
+    def __init__(self, tree_list: list[dict], start: int, end: int):
+        self._tree_list = tree_list
+        self._start = start
+        self._end = end
+        self._strip = len(tree_list[start]["symbol"])
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError(idx)
+        return _SubtreeRecord(self._tree_list[self._start + idx], self, idx == 0)
+
+    def __iter__(self) -> Iterator[Mapping]:
+        tree_list = self._tree_list
+        start = self._start
+        for idx in range(start, self._end):
+            yield _SubtreeRecord(tree_list[idx], self, idx == start)
+
+
+class TeleportTreeView:
+    """
+    A subtree of a `TeleportTree`, without copying it or walking the disk.
+
+    In DFS order a subtree is the contiguous range `[start, end)` of the
+    parent tree's `_tree_list`, so the view only keeps the parent list and
+    the two offsets; records are re-based when they are read. The view
+    reflects the parent tree as it was when the view was made: create a new
+    one after renaming, pruning or watching the parent.
+
+    Examples:
+        >>> tree = TeleportTree("./src")
+        >>> core = tree.subtree("pyteleport/core")
+        >>> core.print
+        >>> core.to_single_file("core.txt")
+    """
+
+    def __init__(self, tree_list: list[dict], start: int):
+        self._base = tree_list
+        self._start = start
+        self._end = subtree_end(tree_list, start)
+        self._path = tree_list[start]["path"]
+
+    @property
+    def tree_list(self) -> Sequence[Mapping]:
+        return _SubtreeNodes(self._base, self._start, self._end)
+
+    @property
+    def _tree_list(self) -> Sequence[Mapping]:
+        # read by `_SingleFile`
+        return self.tree_list
+
+    @property
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def __iter__(self) -> Iterator[Mapping]:
+        return iter(self.tree_list)
+
+    @property
+    def print(self) -> None:
+        print_tree(self.tree_list)
+
+    def subtree(self, path: str) -> "TeleportTreeView":
+        """
+        Return a view of a node below this view's root, see
+        `TeleportTree.subtree`.
+        """
+        return TeleportTreeView(self._base, find_subtree(self._base, path, self._start))
+
+    def add_binary_info(self) -> None:
+        for node in self._base[self._start : self._end]:
+            node["is_binary"] = binary_kind(node)
+
+    def to_single_file(
+        self,
+        output_path: str | None = None,
+        is_lineno: bool = False,
+        template: str | None = None,
+    ) -> None:
+        single_file = _SingleFile(self, template, output_path)
+        single_file.to_single_file(is_lineno)
+
+
+def find_subtree(tree_list: list[dict], path: str, start: int = 0) -> int:
+    """
+    Find the index of a node from its path relative to the node at `start`,
+    or from its full path.
+
+    Raises:
+        ValueError: if there is no such node.
+    """
+    root_path = tree_list[start]["path"]
+    if path == root_path:
+        return start
+    root_prefix = os.path.join(root_path, "")
+    rel_path = path.removeprefix(root_prefix)
+    idx = find_node(tree_list, rel_path.replace(os.sep, "/").strip("/"), start)
+    if idx is None:
+        raise ValueError(f"No such node in the tree: {path}")
+    return idx
@@ -0,0 +1,193 @@
+import hashlib
+import json
+import os
+import time
+
+from pyteleport.core.walker import _assemble, _make_node, _scan_entries
+from pyteleport.rule import BaseRule, RuleQuery
+
+SNAPSHOT_VERSION = 2
+# snapshot files are `walk-<sha256>.json`; eviction and `clear` leave any
+# other file of a shared cache directory alone
+SNAPSHOT_PREFIX = "walk-"
+# A directory modified this close to the walk may still change within the
+# same mtime tick, so its listing is stored but never trusted.
+RACY_WINDOW_NS = 2_000_000_000
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class WalkCache:
+    """
+    On-disk snapshots of directory listings, for incremental rescans.
+
+    A snapshot is keyed by the root path and the rule fingerprint and stores,
+    for every directory of the walk, its mtime, the rule's `dir_fingerprint`
+    and its listing after the rule was applied. The next walk only re-lists
+    directories whose mtime changed (an entry was added, removed or renamed)
+    or whose rule files changed (e.g. a `.gitignore` was edited); the
+    listings of the others are spliced in from the snapshot.
+
+    Args:
+        cache_dir: directory holding the snapshot files.
+        max_bytes: cap on the total size of the snapshot files. The least
+            recently written snapshots are evicted first.
+
+    Example:
+        >>> cache = WalkCache("~/.cache/pyteleport")
+        >>> tree_list = cached_walk("./src", rule_fn, cache)  # cold
+        >>> tree_list = cached_walk("./src", rule_fn, cache)  # warm
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = os.path.expanduser(cache_dir)
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def _fingerprint(rule_fn: BaseRule | None) -> str:
+        return "" if rule_fn is None else rule_fn.fingerprint()
+
+    def _snapshot_path(self, root: str, fingerprint: str) -> str:
+        key = hashlib.sha256(
+            f"{SNAPSHOT_VERSION}\0{os.path.abspath(root)}\0{fingerprint}".encode()
+        ).hexdigest()
+        return os.path.join(self.cache_dir, f"{SNAPSHOT_PREFIX}{key}.json")
+
+    @staticmethod
+    def _is_snapshot(entry: os.DirEntry) -> bool:
+        name = entry.name
+        return (
+            name.startswith(SNAPSHOT_PREFIX)
+            and name.endswith(".json")
+            and entry.is_file()
+        )
+
+    def load(self, root: str, rule_fn: BaseRule | None) -> dict[str, list]:
+        """
+        Return `{rel_dir: [mtime_ns, [[name, is_dir], ...], dir_fingerprint]}`,
+        empty on a miss.
+        """
+        fingerprint = self._fingerprint(rule_fn)
+        try:
+            with open(self._snapshot_path(root, fingerprint), "r") as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # guard against key collisions and older formats
+        if (
+            snapshot.get("version") != SNAPSHOT_VERSION
+            or snapshot.get("root") != os.path.abspath(root)
+            or snapshot.get("fingerprint") != fingerprint
+        ):
+            return {}
+        return snapshot["dirs"]
+
+    def store(self, root: str, rule_fn: BaseRule | None, dirs: dict) -> None:
+        """
+        Write the snapshot of a walk, then enforce `max_bytes`.
+        """
+        fingerprint = self._fingerprint(rule_fn)
+        snapshot = {
+            "version": SNAPSHOT_VERSION,
+            "root": os.path.abspath(root),
+            "fingerprint": fingerprint,
+            "dirs": dirs,
+        }
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._snapshot_path(root, fingerprint)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            # json.dumps uses the C encoder, json.dump does not
+            f.write(json.dumps(snapshot, separators=(",", ":")))
+        os.replace(tmp_path, path)  # readers never see a partial snapshot
+        self._evict(keep=path)
+
+    def _evict(self, keep: str) -> None:
+        snapshots = []
+        for entry in os.scandir(self.cache_dir):
+            if self._is_snapshot(entry):
+                stat = entry.stat()
+                snapshots.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in snapshots)
+        # oldest first; the snapshot just written goes last
+        snapshots.sort(key=lambda s: (s[2] == keep, s[0]))
+        for _, size, path in snapshots:
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+
+    def clear(self) -> None:
+        """
+        Remove every snapshot in the cache directory.
+        """
+        if not os.path.isdir(self.cache_dir):
+            return
+        for entry in os.scandir(self.cache_dir):
+            if self._is_snapshot(entry):
+                os.remove(entry.path)
+
+
+def cached_walk(path: str, rule_fn: BaseRule | None, cache: WalkCache) -> list[dict]:
+    """
+    Walk `path` like `scandir_walk`, reusing unchanged listings from `cache`.
+
+    Each directory costs one `stat`, plus what the rule's `dir_fingerprint`
+    reads; only directories whose mtime or rule files differ from the
+    snapshot are listed again. The same `stat` cuts off symlink
+    loops, as in `iter_tree`. The snapshot is rewritten afterwards
+    with the directories of this walk, unless nothing changed.
+
+    Args:
+        path: start path
+        rule_fn: rule function applied to each entry, as a `RuleQuery`
+        cache: snapshot cache
+    Returns:
+        list: tree structure of the path, same layout as `teleport_tree`.
+    """
+    if not os.path.isdir(path):  # If init path is file, return
+        return [_make_node("", path, path, -1, False)]
+
+    snapshot = cache.load(path, rule_fn)
+    fresh: dict[str, list] = {}
+    racy_after = time.time_ns() - RACY_WINDOW_NS
+
+    visited = set()
+
+    def listing(dir_path: str, rel_dir: str) -> list[tuple] | str:
+        # stat before listing: a change during the listing makes the stored
+        # mtime stale, which forces a rescan next time.
+        stat = os.stat(dir_path)
+        if (stat.st_dev, stat.st_ino) in visited:  # symlink loop
+            return "cycle"
+        visited.add((stat.st_dev, stat.st_ino))
+        mtime_ns = stat.st_mtime_ns
+        dir_fingerprint = "" if rule_fn is None else rule_fn.dir_fingerprint(rel_dir)
+        cached = snapshot.get(rel_dir)
+        if (
+            cached is not None
+            and cached[0] == mtime_ns
+            and cached[2] == dir_fingerprint
+        ):
+            entries = cached[1]
+            queries = [
+                RuleQuery(name, f"{rel_dir}/{name}" if rel_dir else name, is_dir)
+                for name, is_dir in entries
+            ]
+        else:
+            queries = _scan_entries(dir_path, rel_dir, rule_fn)
+            entries = [[str(query), query.is_dir] for query in queries]
+        fresh[rel_dir] = [
+            mtime_ns if mtime_ns < racy_after else -1,
+            entries,
+            dir_fingerprint,
+        ]
+        return [(query, None) for query in queries]
+
+    tree_list = _assemble(
+        path,
+        listing(path, ""),
+        lambda item, dir_path: listing(dir_path, item[0].rel_path),
+    )
+    if fresh != snapshot:
+        cache.store(path, rule_fn, fresh)
+    return tree_list
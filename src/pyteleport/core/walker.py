@@ -0,0 +1,389 @@
+import os
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from pyteleport.rule import BaseRule, RuleQuery
+
+LAST_CONNECTOR = "└── "
+MIDDLE_CONNECTOR = "├── "
+LAST_PREFIX = "    "
+MIDDLE_PREFIX = "│   "
+# keys added to every node by `iter_tree(..., metadata=True)`
+METADATA_KEYS = ("size", "mtime_ns", "inode", "dev")
+# entries of a listing judged by one `BaseRule.filter_many` call
+FILTER_BATCH = 1024
+
+
+def _make_node(symbol: str, name: str, path: str, parent: int, is_dir: bool) -> dict:
+    return {
+        "symbol": symbol,
+        "name": name,
+        "path": path,
+        "parent": parent,  # -1 means root
+        "children": [],
+        "is_dir": is_dir,
+    }
+
+
+def _add_metadata(node: dict, stat: os.stat_result) -> None:
+    node["size"] = stat.st_size
+    node["mtime_ns"] = stat.st_mtime_ns
+    node["inode"] = stat.st_ino
+    node["dev"] = stat.st_dev
+
+
+def _scan_entries(path: str, rel_dir: str, rule_fn: BaseRule | None) -> list[RuleQuery]:
+    """
+    List the entries of `path` that pass `rule_fn`, in `os.listdir` order.
+
+    Args:
+        path: directory to list
+        rel_dir: `path` relative to the walk root ("" for the root)
+        rule_fn: rule function applied to each entry
+    """
+    with os.scandir(path) as it:
+        return list(_accepted(it, rel_dir, rule_fn))
+
+
+def _assemble(
+    path: str,
+    root_entries: list,
+    descend: Callable[[tuple, str], list],
+) -> list[dict]:
+    """
+    Build the DFS-ordered tree list from per-directory listings.
+
+    Args:
+        path: root path
+        root_entries: listing of the root, items are `(RuleQuery, ...)`
+        descend: return the listing of a directory, given its item and path,
+            or the reason it is not descended (stored as the node's `skipped`)
+    """
+    tree_list = [_make_node("", path, path, -1, True)]
+    # frame: [entries, next position, parent index, prefix, parent path + sep]
+    stack = [[root_entries, 0, 0, "", os.path.join(path, "")]]
+    while stack:
+        frame = stack[-1]
+        entries, pos, parent_idx, prefix, dir_prefix = frame
+        if pos == len(entries):
+            stack.pop()
+            continue
+        frame[1] = pos + 1
+
+        item = entries[pos]
+        name, is_dir = str(item[0]), item[0].is_dir
+        is_last = pos == len(entries) - 1
+        connector = LAST_CONNECTOR if is_last else MIDDLE_CONNECTOR
+        idx = len(tree_list)
+        # same as `DirEntry.path`, and also works for cached listings
+        full_path = dir_prefix + name
+        node = _make_node(f"{prefix}{connector}", name, full_path, parent_idx, is_dir)
+        tree_list.append(node)
+        tree_list[parent_idx]["children"].append(idx)
+        if is_dir:
+            listing = descend(item, full_path)
+            if isinstance(listing, str):
+                node["skipped"] = listing
+                continue
+            next_prefix = prefix + (LAST_PREFIX if is_last else MIDDLE_PREFIX)
+            stack.append([listing, 0, idx, next_prefix, full_path + os.sep])
+    return tree_list
+
+
+def _accepted(
+    it: Iterator[os.DirEntry], rel_dir: str, rule_fn: BaseRule | None
+) -> Iterator[RuleQuery]:
+    """
+    Wrap each entry in a `RuleQuery` and keep those that pass `rule_fn`.
+
+    Rules see the relative path and the real entry type, and an excluded
+    directory is dropped here, so it is never opened. Entries are judged
+    with one `filter_many` call per `FILTER_BATCH` entries, which is the
+    whole listing of most directories.
+    """
+    if rule_fn is None:
+        for entry in it:
+            yield RuleQuery.from_entry(entry, rel_dir)
+        return
+    while True:
+        queries = [
+            RuleQuery.from_entry(entry, rel_dir) for entry in islice(it, FILTER_BATCH)
+        ]
+        if not queries:
+            return
+        for query, ok in zip(queries, rule_fn.filter_many(queries)):
+            if ok:
+                yield query
+
+
+def iter_tree(
+    path: str,
+    rule_fn: BaseRule | None = None,
+    rel_root: str = "",
+    max_depth: int | None = None,
+    max_entries: int | None = None,
+    max_total_bytes: int | None = None,
+    one_file_system: bool = False,
+    dedupe_hardlinks: bool = False,
+    metadata: bool = False,
+) -> Iterator[dict]:
+    """
+    Lazily walk `path`, yielding node records in `teleport_tree` order.
+
+    Each directory is read through its `os.scandir` iterator with one entry
+    of lookahead, which is all that is needed to choose between `├── ` and
+    `└── `; entries are judged by the rule `FILTER_BATCH` at a time, so no
+    more of a directory listing is held in memory. Records are the
+    same dicts as in `teleport_tree`; a node's `children` list fills up as
+    its descendants are yielded.
+
+    The walk stops as soon as a budget runs out. Directories with entries
+    that were not yielded get `"truncated": True`; the last yielded child
+    of such a directory keeps its `├── ` connector.
+
+    Every directory is descended at most once, keyed by `(st_dev, st_ino)`,
+    so symlink loops and bind mounts seen twice are cut off. A directory
+    that is not descended for that reason gets `"skipped": "cycle"` (or
+    `"skipped": "mount"` with `one_file_system`).
+
+    Args:
+        path: start path
+        rule_fn: rule function applied to each entry, as a `RuleQuery`
+        rel_root: relative path of `path` when it is part of a larger tree,
+            so rules see paths relative to that tree's root
+        max_depth: do not descend below this depth (the root's entries are
+            at depth 1)
+        max_entries: stop after this many entries (the root not included)
+        max_total_bytes: stop before the file sizes add up to more than
+            this. Costs one `stat` per file.
+        one_file_system: do not descend into directories on another device
+            than `path`, like `find -xdev`.
+        dedupe_hardlinks: list a file with several hard links only once.
+            Costs one `stat` per file.
+        metadata: add `size`, `mtime_ns`, `inode` and `dev` to each node,
+            from the entry's `lstat`. `DirEntry` caches it, so the budgets
+            and `dedupe_hardlinks` reuse it, and on Windows it comes with
+            the listing. Costs one `stat` per file elsewhere.
+    Yields:
+        dict: node record. The n-th record yielded has index n.
+
+    Examples:
+        >>> from pyteleport.core import iter_tree
+        >>> first_py = next(n for n in iter_tree("./src") if n["name"].endswith(".py"))
+    """
+    root = _make_node("", path, path, -1, os.path.isdir(path))
+    if metadata:
+        _add_metadata(root, os.lstat(path))
+    yield root
+    if not root["is_dir"]:  # If init path is file, return
+        return
+    _check_budget("max_depth", max_depth, minimum=1)
+    _check_budget("max_entries", max_entries)
+    _check_budget("max_total_bytes", max_total_bytes)
+
+    root_stat = os.stat(path)
+    visited_dirs = {(root_stat.st_dev, root_stat.st_ino)}
+    linked_files: set[tuple[int, int]] = set()
+
+    def skip_reason(entry: os.DirEntry) -> str | None:
+        stat = entry.stat()  # the target, for symlinked directories
+        if one_file_system and stat.st_dev != root_stat.st_dev:
+            return "mount"
+        key = (stat.st_dev, stat.st_ino)
+        if key in visited_dirs:
+            return "cycle"
+        visited_dirs.add(key)
+        return None
+
+    def open_frame(
+        dir_path: str, rel_dir: str, node: dict, idx: int, prefix: str, depth: int
+    ) -> list:
+        it = os.scandir(dir_path)
+        queries = _accepted(it, rel_dir, rule_fn)
+        if dedupe_hardlinks:
+            queries = _unique_files(queries, linked_files)
+        lookahead = next(queries, None)
+        if lookahead is None:
+            it.close()
+        return [it, queries, lookahead, node, idx, prefix, depth]
+
+    count = 1
+    total_bytes = 0
+    # frame: [scandir iterator, accepted queries, lookahead, parent node,
+    #         parent index, prefix, parent depth]
+    stack = [open_frame(path, rel_root, root, 0, "", 0)]
+    try:
+        while stack:
+            frame = stack[-1]
+            query = frame[2]
+            if query is None:
+                stack.pop()
+                continue
+            if max_entries is not None and count > max_entries:
+                break
+            if max_total_bytes is not None and not query.is_dir:
+                size = query.entry.stat(follow_symlinks=False).st_size
+                if total_bytes + size > max_total_bytes:
+                    break
+                total_bytes += size
+            frame[2] = next(frame[1], None)
+            is_last = frame[2] is None
+            if is_last:  # release the directory handle before descending
+                frame[0].close()
+                stack.pop()
+
+            entry, is_dir = query.entry, query.is_dir
+            connector = LAST_CONNECTOR if is_last else MIDDLE_CONNECTOR
+            node = _make_node(
+                f"{frame[5]}{connector}", entry.name, entry.path, frame[4], is_dir
+            )
+            if metadata:
+                _add_metadata(node, entry.stat(follow_symlinks=False))
+            frame[3]["children"].append(count)
+            idx = count
+            count += 1
+            yield node
+            if is_dir:
+                reason = skip_reason(entry)
+                if reason is not None:
+                    node["skipped"] = reason
+                    continue
+                next_prefix = frame[5] + (LAST_PREFIX if is_last else MIDDLE_PREFIX)
+                child = open_frame(
+                    entry.path, query.rel_path, node, idx, next_prefix, frame[6] + 1
+                )
+                if max_depth is not None and frame[6] + 1 >= max_depth:
+                    child[0].close()
+                    if child[2] is not None:
+                        node["truncated"] = True
+                else:
+                    stack.append(child)
+        # a budget ran out: flag the directories left with entries
+        for frame in stack:
+            if frame[2] is not None:
+                frame[3]["truncated"] = True
+    finally:
+        for frame in stack:
+            frame[0].close()
+
+
+def _unique_files(
+    queries: Iterator[RuleQuery], seen: set[tuple[int, int]]
+) -> Iterator[RuleQuery]:
+    """
+    Drop files whose `(st_dev, st_ino)` was already listed.
+
+    Only files with more than one link are remembered, so the set stays as
+    small as the number of hard-linked files.
+    """
+    for query in queries:
+        if not query.is_dir and not query.entry.is_symlink():
+            stat = query.entry.stat(follow_symlinks=False)
+            if stat.st_nlink > 1:
+                key = (stat.st_dev, stat.st_ino)
+                if key in seen:
+                    continue
+                seen.add(key)
+        yield query
+
+
+def _check_budget(name: str, value: int | None, minimum: int = 0) -> None:
+    if value is not None and value < minimum:
+        raise ValueError(f"{name} must be at least {minimum}: {value}")
+
+
+def scandir_walk(path: str, rule_fn: BaseRule | None = None, **options) -> list[dict]:
+    """
+    Walk `path` depth-first with `os.scandir` and an explicit stack.
+
+    `DirEntry.is_dir()` answers from the `d_type` returned by `readdir`, so
+    no file costs an extra `stat` call (except on filesystems that report
+    `DT_UNKNOWN`); each directory costs one, to cut off symlink loops. Deep
+    trees never hit the recursion limit.
+
+    Args:
+        path: start path
+        rule_fn: rule function applied to each entry, as a `RuleQuery`
+        options: walk budgets and link handling, see `iter_tree`
+    Returns:
+        list: tree structure of the path, same layout as `teleport_tree`.
+    """
+    return list(iter_tree(path, rule_fn, **options))
+
+
+def _prefetch_listing(
+    pool: ThreadPoolExecutor,
+    path: str,
+    rel_dir: str,
+    rule_fn: BaseRule | None,
+    ancestors: frozenset = frozenset(),
+) -> tuple[tuple[int, int], list[tuple] | None]:
+    """
+    List `path` and immediately queue the listing of every subdirectory,
+    so siblings (and their descendants) are listed while the caller waits.
+
+    Returns the `(st_dev, st_ino)` of `path` with its listing. A directory
+    that is one of its own ancestors (a symlink loop) is not listed.
+    """
+    stat = os.stat(path)
+    key = (stat.st_dev, stat.st_ino)
+    if key in ancestors:
+        return key, None
+    ancestors = ancestors | {key}
+    listing = []
+    for query in _scan_entries(path, rel_dir, rule_fn):
+        future = None
+        if query.is_dir:
+            future = pool.submit(
+                _prefetch_listing,
+                pool,
+                query.entry.path,
+                query.rel_path,
+                rule_fn,
+                ancestors,
+            )
+        listing.append((query, future))
+    return key, listing
+
+
+def parallel_walk(
+    path: str, rule_fn: BaseRule | None = None, workers: int = 4
+) -> list[dict]:
+    """
+    Walk `path` listing directories concurrently on a thread pool.
+
+    Directory listings are fetched ahead of time by `workers` threads, which
+    hides the per-call latency of network and overlay filesystems. They are
+    then stitched together in the same order as `scandir_walk`, so the result
+    is identical to the serial walk.
+
+    Args:
+        path: start path
+        rule_fn: rule function applied to each entry, as a `RuleQuery`
+        workers: number of listing threads
+    Returns:
+        list: tree structure of the path, same layout as `teleport_tree`.
+    """
+    if workers < 1:
+        raise ValueError(f"workers must be positive: {workers}")
+    if not os.path.isdir(path):  # If init path is file, return
+        return [_make_node("", path, path, -1, False)]
+
+    pool = ThreadPoolExecutor(max_workers=workers)
+    try:
+        root_key, root_listing = _prefetch_listing(pool, path, "", rule_fn)
+        # listings are fetched out of order, but only the first directory in
+        # walk order with a given identity is kept, as in the serial walk
+        visited = {root_key}
+
+        def descend(item: tuple, _) -> list | str:
+            key, listing = item[1].result()
+            if listing is None or key in visited:
+                return "cycle"
+            visited.add(key)
+            return listing
+
+        return _assemble(path, root_listing, descend)
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
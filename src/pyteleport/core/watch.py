@@ -0,0 +1,349 @@
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import time
+from typing import Protocol
+
+from pyteleport.core.path_index import PathIndex
+from pyteleport.core.tree_edit import (
+    find_node,
+    insert_subtree,
+    iter_rel_paths,
+    remove_subtree,
+)
+from pyteleport.core.walker import iter_tree
+from pyteleport.rule import RuleQuery
+
+# inotify(7) constants
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_ONLYDIR = 0x01000000
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_ONLYDIR
+_EVENT_HEADER = struct.Struct("iIII")
+
+# event: (kind, rel_dir, name, is_dir), kind is "create", "delete" or "overflow"
+Event = tuple[str, str, str, bool]
+
+
+class TreeProtocol(Protocol):
+    """Protocol defining the interface required from TeleportTree."""
+
+    _tree_list: list[dict]
+    _first_path: str
+    _path_index: PathIndex | None
+    _walk_options: dict
+    rule_fn: object
+
+
+def _join(rel_dir: str, name: str) -> str:
+    return f"{rel_dir}/{name}" if rel_dir else name
+
+
+class PollingBackend:
+    """
+    Detect changes by comparing directory mtimes and listings.
+
+    Works everywhere; each `read` costs one `stat` per watched directory and
+    one listing per changed directory.
+    """
+
+    def __init__(self, root: str, poll_interval: float = 1.0):
+        self._root = root
+        self._poll_interval = poll_interval
+        # rel_dir -> (mtime_ns, {name: is_dir})
+        self._dirs: dict[str, tuple[int, dict[str, bool]]] = {}
+
+    def _snapshot(self, rel_dir: str) -> tuple[int, dict[str, bool]]:
+        path = os.path.join(self._root, rel_dir)
+        mtime_ns = os.stat(path).st_mtime_ns
+        with os.scandir(path) as it:
+            return mtime_ns, {entry.name: entry.is_dir() for entry in it}
+
+    def add(self, rel_dir: str) -> None:
+        try:
+            self._dirs[rel_dir] = self._snapshot(rel_dir)
+        except OSError:  # removed before it could be watched
+            pass
+
+    def remove(self, rel_dir: str) -> None:
+        prefix = rel_dir + "/"
+        for watched in [d for d in self._dirs if d == rel_dir or d.startswith(prefix)]:
+            del self._dirs[watched]
+
+    def read(self, timeout: float = 0.0) -> list[Event]:
+        deadline = time.monotonic() + timeout
+        while True:
+            events = self._diff()
+            remaining = deadline - time.monotonic()
+            if events or remaining <= 0:
+                return events
+            time.sleep(min(self._poll_interval, remaining))
+
+    def _diff(self) -> list[Event]:
+        events = []
+        for rel_dir, (mtime_ns, names) in list(self._dirs.items()):
+            try:
+                if os.stat(os.path.join(self._root, rel_dir)).st_mtime_ns == mtime_ns:
+                    continue
+                self._dirs[rel_dir] = snapshot = self._snapshot(rel_dir)
+            except OSError:  # reported as a delete by its parent
+                continue
+            new_names = snapshot[1]
+            for name, is_dir in names.items():
+                if new_names.get(name) != is_dir:
+                    events.append(("delete", rel_dir, name, is_dir))
+            for name, is_dir in new_names.items():
+                if names.get(name) != is_dir:
+                    events.append(("create", rel_dir, name, is_dir))
+        return events
+
+    def close(self) -> None:
+        self._dirs.clear()
+
+
+class InotifyBackend:
+    """
+    Receive changes from Linux inotify through ctypes.
+
+    One watch is added per directory of the tree; `read` only costs the
+    events that actually happened.
+    """
+
+    def __init__(self, root: str):
+        if not sys.platform.startswith("linux"):
+            raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._root = root
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._wd_to_dir: dict[int, str] = {}
+        self._dir_to_wd: dict[str, int] = {}
+
+    def add(self, rel_dir: str) -> None:
+        path = os.fsencode(os.path.join(self._root, rel_dir))
+        wd = self._libc.inotify_add_watch(self._fd, path, WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err in (errno.ENOENT, errno.ENOTDIR):  # already gone
+                return
+            raise OSError(err, os.strerror(err), rel_dir)
+        self._wd_to_dir[wd] = rel_dir
+        self._dir_to_wd[rel_dir] = wd
+
+    def remove(self, rel_dir: str) -> None:
+        prefix = rel_dir + "/"
+        for watched in [
+            d for d in self._dir_to_wd if d == rel_dir or d.startswith(prefix)
+        ]:
+            wd = self._dir_to_wd.pop(watched)
+            self._wd_to_dir.pop(wd, None)
+            self._libc.inotify_rm_watch(self._fd, wd)
+
+    def read(self, timeout: float = 0.0) -> list[Event]:
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return []
+        events = []
+        while True:
+            try:
+                buffer = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return events
+            events.extend(self._parse(buffer))
+
+    def _parse(self, buffer: bytes) -> list[Event]:
+        events = []
+        offset = 0
+        while offset < len(buffer):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(buffer, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(buffer[offset : offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                events.append(("overflow", "", "", False))
+                continue
+            if mask & IN_IGNORED:  # watch removed by the kernel
+                rel_dir = self._wd_to_dir.pop(wd, None)
+                if rel_dir is not None and self._dir_to_wd.get(rel_dir) == wd:
+                    del self._dir_to_wd[rel_dir]
+                continue
+            rel_dir = self._wd_to_dir.get(wd)
+            if rel_dir is None:
+                continue
+            is_dir = bool(mask & IN_ISDIR)
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                events.append(("create", rel_dir, name, is_dir))
+            elif mask & (IN_DELETE | IN_MOVED_FROM):
+                events.append(("delete", rel_dir, name, is_dir))
+        return events
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+        self._wd_to_dir.clear()
+        self._dir_to_wd.clear()
+
+
+class TreeWatcher:
+    """
+    Keep a `TeleportTree` in sync with the filesystem.
+
+    Create, delete and rename events are applied to `_tree_list` in place: a
+    created directory is walked on its own, a deleted entry's subtree range
+    is dropped, and only the connector symbols of the affected siblings are
+    redrawn. A rename is applied as a delete followed by a create. Indices
+    after the edited position are shifted in one pass, since `_tree_list`
+    addresses nodes by position.
+
+    Args:
+        tree: tree to keep in sync.
+        backend: "inotify", "poll", or "auto" (inotify, else polling).
+        poll_interval: seconds between scans of the polling backend.
+
+    Example:
+        >>> tree = TeleportTree("./src")
+        >>> with tree.watch() as watcher:
+        ...     changes = watcher.poll(timeout=1.0)
+    """
+
+    def __init__(
+        self, tree: TreeProtocol, backend: str = "auto", poll_interval: float = 1.0
+    ):
+        self._tree = tree
+        self._root = tree._first_path
+        if backend == "auto":
+            try:
+                self._backend = InotifyBackend(self._root)
+            except OSError:
+                self._backend = PollingBackend(self._root, poll_interval)
+        elif backend == "inotify":
+            self._backend = InotifyBackend(self._root)
+        elif backend == "poll":
+            self._backend = PollingBackend(self._root, poll_interval)
+        else:
+            raise ValueError(f"Invalid backend: {backend}")
+        self._watch_all()
+
+    @property
+    def backend(self) -> str:
+        return "inotify" if isinstance(self._backend, InotifyBackend) else "poll"
+
+    def _watch_all(self) -> None:
+        tree_list = self._tree._tree_list
+        if not tree_list[0]["is_dir"]:
+            return
+        for idx, rel_path in iter_rel_paths(tree_list):
+            if tree_list[idx]["is_dir"]:
+                self._backend.add(rel_path)
+
+    def poll(self, timeout: float = 0.0) -> list[tuple[str, str]]:
+        """
+        Apply pending filesystem events to the tree.
+
+        Args:
+            timeout: seconds to wait for the first event.
+        Returns:
+            list: applied changes as `(kind, rel_path)`.
+        """
+        applied = []
+        for kind, rel_dir, name, is_dir in self._backend.read(timeout):
+            rel_path = _join(rel_dir, name)
+            if kind == "overflow":
+                self._rebuild()
+                applied.append(("rebuild", ""))
+                continue
+            if kind == "create":
+                changed = self._create(rel_dir, name, is_dir)
+            else:
+                changed = self._delete(rel_path)
+            if changed:
+                applied.append((kind, rel_path))
+        return applied
+
+    def _create(self, rel_dir: str, name: str, is_dir: bool) -> bool:
+        tree_list = self._tree._tree_list
+        parent_idx = find_node(tree_list, rel_dir)
+        if parent_idx is None or not tree_list[parent_idx]["is_dir"]:
+            return False
+        rel_path = _join(rel_dir, name)
+        if find_node(tree_list, rel_path) is not None:  # already seen
+            return False
+        rule_fn = self._tree.rule_fn
+        if rule_fn is not None and not rule_fn.matches(
+            RuleQuery(name, rel_path, is_dir)
+        ):
+            return False
+
+        path = os.path.join(self._root, rel_path)
+        if is_dir:
+            # watch first, so entries created while walking are not missed
+            self._backend.add(rel_path)
+        # same metadata as the rest of the tree
+        metadata = "mtime_ns" in tree_list[0]
+        nodes = list(iter_tree(path, rule_fn, rel_root=rel_path, metadata=metadata))
+        nodes[0]["name"] = name
+        nodes[0]["is_dir"] = is_dir
+        if not os.path.lexists(path):  # gone again before we got to it
+            self._backend.remove(rel_path)
+            return False
+        sub_dirs = [
+            _join(rel_path, sub_path)
+            for idx, sub_path in iter_rel_paths(nodes)
+            if idx and nodes[idx]["is_dir"]
+        ]
+        if self._tree._path_index is not None:
+            self._tree._path_index.add_subtree(rel_path, nodes)
+        insert_subtree(tree_list, parent_idx, nodes)
+        for sub_dir in sub_dirs:
+            self._backend.add(sub_dir)
+        return True
+
+    def _delete(self, rel_path: str) -> bool:
+        tree_list = self._tree._tree_list
+        idx = find_node(tree_list, rel_path)
+        if idx is None or idx == 0:
+            return False
+        if tree_list[idx]["is_dir"]:
+            self._backend.remove(rel_path)
+        if self._tree._path_index is not None:
+            self._tree._path_index.remove_subtree(tree_list, idx, rel_path)
+        remove_subtree(tree_list, idx)
+        return True
+
+    def _rebuild(self) -> None:
+        from pyteleport.core.tree import teleport_tree
+
+        self._backend.remove("")
+        # same budgets and options as the first build; trees that were loaded
+        # rather than walked keep at least their metadata
+        options = {
+            "metadata": "mtime_ns" in self._tree._tree_list[0],
+            **self._tree._walk_options,
+        }
+        self._tree._tree_list = teleport_tree(self._root, self._tree.rule_fn, **options)
+        self._tree._path_index = None
+        self._watch_all()
+
+    def close(self) -> None:
+        self._backend.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
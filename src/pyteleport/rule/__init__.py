@@ -2,16 +2,22 @@ from pyteleport.rule.base_rule import BaseRule
 from pyteleport.rule.composite_rule import CompositeRule
 from pyteleport.rule.module.dir_rule import DirRule
 from pyteleport.rule.module.gitignore_rule import GitignoreRule
+from pyteleport.rule.module.gitignore_tree_rule import GitignoreTreeRule
 from pyteleport.rule.module.glob_rule import GlobRule
 from pyteleport.rule.module.hidden_file_rule import HiddenFileRule
+from pyteleport.rule.query import RuleQuery
+from pyteleport.rule.rule_cache import RuleCache
 from pyteleport.rule.rule_factory import RuleFactory
 
 __all__ = [
     "BaseRule",
+    "CompositeRule",
+    "DirRule",
     "GitignoreRule",
+    "GitignoreTreeRule",
     "GlobRule",
     "HiddenFileRule",
-    "CompositeRule",
+    "RuleCache",
     "RuleFactory",
-    "DirRule",
+    "RuleQuery",
 ]
@@ -1,13 +1,29 @@
 from abc import ABC, abstractmethod
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from inspect import isroutine
+
+# queries per process with `filter_many(..., workers=N)`
+DEFAULT_CHUNK_SIZE = 100_000
 
 
 class BaseRule(ABC):
+    # True if decisions depend only on the entry name and type, not on where
+    # the entry is; `CompositeRule` then caches them by name.
+    name_only = False
+    # relative cost of one decision, orders rules before `RulePlan` has
+    # measured them
+    cost = 1
+
     @abstractmethod
     def matches(self, query: str) -> bool:
         """
         Check if the query matches the inherited rule.
         Args:
-            query: The query to check against the rule.
+            query: The query to check against the rule. The walker passes a
+                `RuleQuery`, which is the entry name and also carries its
+                relative path and entry type.
 
         Returns:
             bool: True if the query matches the rule, False otherwise.
@@ -41,3 +57,83 @@ class BaseRule(ABC):
             bool: True if the query matches the rule, False otherwise.
         """
         raise NotImplementedError
+
+    def filter_many(
+        self,
+        queries: Sequence[str],
+        workers: int | None = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> list[bool]:
+        """
+        Judge many queries in one call, e.g. a whole directory listing.
+
+        Same decisions as `[self.matches(q) for q in queries]`; rules
+        override `_filter_many` to share work across the batch. Such a fast
+        path re-implements `matches` and the helpers behind it, so it is
+        skipped for a subclass of the rule that defines it, and for an
+        instance that replaces one of its methods.
+
+        Args:
+            queries: queries to judge
+            workers: if given, split batches longer than `chunk_size` into
+                chunks judged by a pool of that many processes. The rule
+                must be picklable; a `RuleQuery` is sent without its `entry`.
+            chunk_size: queries per chunk
+
+        Returns:
+            list: one decision per query, in order
+        """
+        if self._has_fast_path():
+            judge = self._filter_many
+        else:
+            # a partial, as a bound method would pickle as `self._filter_many`
+            judge = partial(BaseRule._filter_many, self)
+        if workers is None or len(queries) <= chunk_size:
+            return judge(queries)
+        chunks = [
+            queries[start : start + chunk_size]
+            for start in range(0, len(queries), chunk_size)
+        ]
+        with ProcessPoolExecutor(workers) as pool:
+            decisions = []
+            for chunk in pool.map(judge, chunks):
+                decisions.extend(chunk)
+        return decisions
+
+    def _filter_many(self, queries: Sequence[str]) -> list[bool]:
+        return [self.matches(query) for query in queries]
+
+    def _has_fast_path(self) -> bool:
+        """
+        True if `_filter_many` is defined by the rule's own class and none of
+        the methods it may re-implement are replaced on the instance.
+        """
+        cls = type(self)
+        owner = next(base for base in cls.__mro__ if "_filter_many" in vars(base))
+        if owner is BaseRule:
+            return True
+        return owner is cls and not any(
+            isroutine(getattr(cls, name, None))
+            for name in getattr(self, "__dict__", {})
+        )
+
+    def fingerprint(self) -> str:
+        """
+        Describe the rule's configuration as a stable string.
+
+        Two rules with the same fingerprint make the same decisions, so it can
+        be used as a cache key. The default covers rules whose state is plain
+        data in their attributes; override it otherwise.
+        """
+        state = sorted((key, repr(value)) for key, value in vars(self).items())
+        return f"{type(self).__module__}.{type(self).__qualname__}{state}"
+
+    def dir_fingerprint(self, rel_dir: str) -> str:
+        """
+        Describe the files, other than the listing, that the decisions for
+        the entries of `rel_dir` depend on (e.g. `.gitignore` files).
+
+        A walk cache reuses the listing of `rel_dir` only if this is
+        unchanged. Rules that only look at the queries return "".
+        """
+        return ""
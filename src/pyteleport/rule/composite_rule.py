@@ -1,6 +1,9 @@
-from typing import List
+import threading
+from collections import OrderedDict
 
 from pyteleport.rule import BaseRule
+from pyteleport.rule.query import query_is_dir, query_path
+from pyteleport.rule.rule_plan import RulePlan, filter_survivors
 
 
 class CompositeRule(BaseRule):
@@ -19,16 +22,123 @@ class CompositeRule(BaseRule):
         True
         >>> composite_rule.matches(".hidden.py")  # Doesn't match rule2
         False
+
+    With `cache_size`, the last decisions of `matches` are kept in an LRU
+    cache. Entries are keyed on the name and entry type when every rule is
+    `name_only`, so `__init__.py` or `node_modules` are judged once per walk
+    whatever directory they are in; otherwise on the relative path and
+    entry type.
+
+        >>> rule = CompositeRule(rules=[rule1, rule2], cache_size=4096)
+        >>> rule.matches("test.py"), rule.matches("test.py")
+        (True, True)
+        >>> rule.cache_info()
+        {'hits': 1, 'misses': 1, 'size': 1, 'max_size': 4096}
+
+    `optimize` flattens nested composites, drops duplicate rules and lets a
+    `RulePlan` choose the evaluation order; `explain` prints it.
+
+        >>> rule = CompositeRule(rules=[CompositeRule([rule2]), rule1, rule2])
+        >>> rule.optimize().rules == [rule2, rule1]
+        True
     """
 
-    def __init__(self, rules: List[BaseRule]):
+    # set by `optimize`
+    _plan: RulePlan | None = None
+
+    def __init__(self, rules: list[BaseRule], cache_size: int | None = None):
         """
         Initialize a CompositeRule with a list of rules.
 
         Args:
             rules: List of rules to combine
+            cache_size: Number of decisions to keep, None to disable the cache
+        """
+        if cache_size is not None and cache_size <= 0:
+            raise ValueError(f"cache_size must be positive: {cache_size}")
+        self.rules = rules
+        self.cache_size = cache_size
+        self._decisions: OrderedDict[tuple, bool] = OrderedDict()
+        # the walker may share a rule between threads
+        self._lock = threading.Lock()
+        self.cache_clear()
+
+    @property
+    def name_only(self) -> bool:
+        return all(rule.name_only for rule in self.rules)
+
+    @property
+    def cost(self) -> int:
+        return sum(rule.cost for rule in self.rules)
+
+    def optimize(self, sample_every: int = 64, reorder_every: int = 16):
         """
+        Flatten nested composites, drop duplicate rules and judge queries
+        in the order chosen by a `RulePlan`.
+
+        Nested composites are only flattened when they are plain
+        `CompositeRule`s, and rules are duplicates when their fingerprints
+        are equal, so the decisions do not change. `rules` keeps the
+        construction order, and so the fingerprint stays stable while the
+        plan re-orders.
+
+        Args:
+            sample_every: judge one query in this many with every rule
+            reorder_every: samples between two re-orderings
+
+        Returns:
+            CompositeRule: this rule
+        """
+        rules = []
+        fingerprints = set()
+        for rule in _flatten(self.rules):
+            fingerprint = rule.fingerprint()
+            if fingerprint not in fingerprints:
+                fingerprints.add(fingerprint)
+                rules.append(rule)
         self.rules = rules
+        self._plan = RulePlan(rules, sample_every, reorder_every)
+        self.cache_clear()
+        return self
+
+    def explain(self) -> None:
+        """
+        Print the order in which `matches` evaluates the rules.
+        """
+        if self._plan is None:
+            print("construction order, not optimized")
+            for position, rule in enumerate(self.rules, 1):
+                print(f"  {position}. {type(rule).__name__}")
+        else:
+            print(self._plan.explain())
+
+    def _all_match(self, query: str) -> bool:
+        if self._plan is not None:
+            return self._plan.matches(query)
+        return all(rule.matches(query) for rule in self.rules)
+
+    def cache_clear(self) -> None:
+        """
+        Drop the cached decisions and reset the counters. Call it after
+        changing `rules` other than through `append`.
+        """
+        with self._lock:
+            self._decisions.clear()
+            self.hits = 0
+            self.misses = 0
+            self._key_by_name = self.name_only
+
+    def cache_info(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._decisions),
+            "max_size": self.cache_size,
+        }
+
+    def _cache_key(self, query: str) -> tuple:
+        name = str(query) if self._key_by_name else query_path(query)
+        return (name, query_is_dir(query))
 
     def matches(self, query: str) -> bool:
         """
@@ -40,7 +150,67 @@ class CompositeRule(BaseRule):
         Returns:
             True if the query matches all rules, False otherwise
         """
-        return all(rule.matches(query) for rule in self.rules)
+        if self.cache_size is None:
+            return self._all_match(query)
+        key = self._cache_key(query)
+        with self._lock:
+            decision = self._decisions.get(key)
+            if decision is not None:
+                self._decisions.move_to_end(key)
+                self.hits += 1
+                return decision
+            self.misses += 1
+        decision = self._all_match(query)
+        with self._lock:
+            self._decisions[key] = decision
+            if len(self._decisions) > self.cache_size:
+                self._decisions.popitem(last=False)
+        return decision
+
+    def _filter_many(self, queries):
+        """
+        Judge the batch rule by rule, each rule only seeing the queries that
+        all the previous ones matched; in the order of the plan, which then
+        also samples the batch.
+        """
+        decisions = [True] * len(queries)
+        pending = list(range(len(queries)))
+        keys = None
+        if self.cache_size is not None:
+            keys = [self._cache_key(query) for query in queries]
+            with self._lock:
+                cached = [self._decisions.get(key) for key in keys]
+                pending = [i for i in pending if cached[i] is None]
+                self.misses += len(pending)
+                self.hits += len(queries) - len(pending)
+            for i, decision in enumerate(cached):
+                if decision is not None:
+                    decisions[i] = decision
+        misses = [queries[i] for i in pending]
+        if self._plan is not None:
+            matched = self._plan.filter_many(misses)
+        else:
+            matched = filter_survivors(self.rules, misses)
+        for i, ok in zip(pending, matched):
+            decisions[i] = ok
+        if keys is not None:
+            with self._lock:
+                for i in pending:
+                    self._decisions[keys[i]] = decisions[i]
+                while len(self._decisions) > self.cache_size:
+                    self._decisions.popitem(last=False)
+        return decisions
+
+    def __getstate__(self) -> dict:
+        # for `filter_many(..., workers=N)`: the lock and cache stay behind
+        state = dict(vars(self))
+        del state["_lock"]
+        state["_decisions"] = OrderedDict()
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        vars(self).update(state)
+        self._lock = threading.Lock()
 
     def is_include(self, query: str) -> bool:
         """
@@ -60,6 +230,18 @@ class CompositeRule(BaseRule):
         """
         return any(rule.is_exclude(query) for rule in self.rules)
 
+    def fingerprint(self) -> str:
+        """
+        Combine the fingerprints of all rules, in order.
+        """
+        return f"CompositeRule[{', '.join(r.fingerprint() for r in self.rules)}]"
+
+    def dir_fingerprint(self, rel_dir: str) -> str:
+        """
+        Combine the directory fingerprints of all rules, in order.
+        """
+        return "\0".join(rule.dir_fingerprint(rel_dir) for rule in self.rules)
+
     def append(self, rule: BaseRule) -> None:
         """
         Append a rule to the composite rule.
@@ -68,3 +250,16 @@ class CompositeRule(BaseRule):
             self.rules.extend(rule.rules)
         else:
             self.rules.append(rule)
+        if self._plan is not None:
+            self.optimize(self._plan.sample_every, self._plan.reorder_every)
+        self.cache_clear()
+
+
+def _flatten(rules: list[BaseRule]):
+    for rule in rules:
+        # a subclass, or an instance with its own methods, may not be an AND
+        overridden = {"matches", "is_include", "is_exclude"} & vars(rule).keys()
+        if type(rule) is CompositeRule and not overridden:
+            yield from _flatten(rule.rules)
+        else:
+            yield rule
@@ -1,11 +1,13 @@
 from pyteleport.rule.module.hidden_file_rule import HiddenFileRule
 from pyteleport.rule.module.dir_rule import DirRule
 from pyteleport.rule.module.gitignore_rule import GitignoreRule
+from pyteleport.rule.module.gitignore_tree_rule import GitignoreTreeRule
 from pyteleport.rule.module.glob_rule import GlobRule
 
 __all__ = [
     "HiddenFileRule",
     "DirRule",
     "GitignoreRule",
+    "GitignoreTreeRule",
     "GlobRule",
 ]
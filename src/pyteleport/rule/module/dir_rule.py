@@ -1,9 +1,12 @@
 import os
 
 from pyteleport.rule import BaseRule
+from pyteleport.rule.query import query_is_dir
 
 
 class DirRule(BaseRule):
+    name_only = True
+
     def __init__(self):
         super().__init__()
 
@@ -13,8 +16,19 @@ class DirRule(BaseRule):
         else:  # file
             return False
 
+    def _is_dir(self, query: str) -> bool:
+        # the walker already knows the entry type; only stat plain strings.
+        is_dir = query_is_dir(query)
+        if is_dir is None:
+            return os.path.isdir(query)
+        return is_dir
+
+    def _filter_many(self, queries):
+        is_dir = self._is_dir
+        return [is_dir(query) for query in queries]
+
     def is_include(self, query: str) -> bool:
-        return os.path.isdir(query)
+        return self._is_dir(query)
 
     def is_exclude(self, query: str) -> bool:
-        return not os.path.isdir(query)
+        return not self._is_dir(query)
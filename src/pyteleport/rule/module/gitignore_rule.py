@@ -1,7 +1,181 @@
-import pathspec
+import re
+from collections.abc import Iterable
+
+try:  # pathspec >= 1.0, where `GitWildMatchPattern` is deprecated
+    from pathspec.patterns.gitignore.spec import GitIgnoreSpecPattern as _Pattern
+except ImportError:
+    from pathspec.patterns import GitWildMatchPattern as _Pattern
 
 from pyteleport.constant import CONFUSING_DIRS
 from pyteleport.rule import BaseRule
+from pyteleport.rule.query import query_is_dir, query_path
+
+_CONFUSING_DIR_SUFFIXES = tuple(CONFUSING_DIRS)
+_WILDCARDS = re.compile(r"[*?[\\/]")
+_GROUP = re.compile(r"\(\?P<\w+>")
+# how `pathspec` (0.12 and 1.x) ends a pattern's regex, and the same
+# anchored to the path itself: descendants are decided through their
+# ignored parent instead
+_REGEX_ENDINGS = (
+    ("(?:(?P<ps_d>/)|$)", "/?\\Z"),
+    ("(?:(?P<ps_d>/).*)?$", "/?\\Z"),
+    ("(?P<ps_d>/).*$", "/\\Z"),
+    ("(?P<ps_d>/)", "/\\Z"),
+    # `foo/**` matches what is below `foo`, not `foo` itself, so negations
+    # of its contents still apply
+    ("/.*$", "/.+\\Z"),
+    ("/", "/.+\\Z"),
+)
+# how `pathspec` starts a pattern that may match at any depth
+_FLOATING = "^(?:.+/)?"
+# `*/`, `**/` and `/**/` match any directory at any depth, which `pathspec`
+# translates differently across versions; as a floating regex, the last
+# component of a directory
+_ANY_DIR = ("*", "**", "/**")
+_ANY_DIR_FLOATING = "[^/]+/\\Z"
+
+
+def _combine(alternatives: list[tuple[int, str]]) -> tuple[int, str]:
+    """
+    Return `(highest index, regex)` of one regex trying `alternatives` from
+    the last pattern to the first; the index is -1 if there are none.
+    """
+    if not alternatives:
+        return -1, ""
+    regex = "|".join(f"(?P<p{idx}>{regex})" for idx, regex in reversed(alternatives))
+    return alternatives[-1][0], regex
+
+
+class _GitignorePatterns:
+    """
+    Gitignore patterns compiled once, answering "which pattern matched last".
+
+    The patterns are bucketed by shape, each bucket keeping the index of the
+    last pattern of the file that can match:
+
+    - literal names (`node_modules`, `build/`): dict lookups of the name
+    - `*.<literal>` (`*.log`, `*.tar.gz`): dict lookups of each suffix of
+      the name that starts with a dot
+    - everything else: `pathspec`'s translations, combined into one regex
+      for the patterns anchored to the start of the path and one for the
+      floating ones (`**/x`, `a*b`), tried at each component. Alternatives
+      are in reverse order, so the first that matches is the last pattern
+      of the file.
+
+    Patterns are matched against the path itself, a directory with a
+    trailing `/`; what is below an ignored directory is left to the caller.
+
+    The regexes are compiled on first use, and `state` holds everything else
+    as plain data, so a rule cache can skip the translation entirely.
+    """
+
+    def __init__(self, patterns: list[str]):
+        # name or suffix -> index of the last pattern, for files and for
+        # directories (which directory-only patterns also match)
+        self._names: tuple[dict[str, int], dict[str, int]] = ({}, {})
+        self._suffixes: tuple[dict[str, int], dict[str, int]] = ({}, {})
+        self._negated: list[bool] = []
+        # (index, regex) of the anchored and of the floating patterns
+        anchored: list[tuple[int, str]] = []
+        floating: list[tuple[int, str]] = []
+        for idx, pattern in enumerate(patterns):
+            regex, include = _Pattern.pattern_to_regex(pattern)
+            self._negated.append(include is False)
+            if regex is None:  # comment or blank
+                continue
+            body = pattern.removeprefix("!")
+            dir_only = body.endswith("/")
+            body = body[:-1] if dir_only else body
+            literal = body and body == body.rstrip(" ")
+            if literal and not _WILDCARDS.search(body):
+                buckets = self._names
+            elif literal and body.startswith("*.") and not _WILDCARDS.search(body[1:]):
+                buckets, body = self._suffixes, body[1:]
+            elif dir_only and body in _ANY_DIR:
+                floating.append((idx, _ANY_DIR_FLOATING))
+                continue
+            else:
+                for ending, replacement in _REGEX_ENDINGS:
+                    if regex.endswith(ending):
+                        regex = regex[: -len(ending)] + replacement
+                        break
+                regex = _GROUP.sub("(?:", regex)
+                if regex.startswith(_FLOATING):
+                    floating.append((idx, regex[len(_FLOATING) :]))
+                else:
+                    anchored.append((idx, regex))
+                continue
+            for is_dir, bucket in enumerate(buckets):
+                if is_dir or not dir_only:
+                    bucket[body] = idx
+        # (highest index, regex) of the anchored and the floating patterns
+        self._regexes = (_combine(anchored), _combine(floating))
+        self._matchers: list = [None, None]
+
+    @property
+    def state(self) -> dict:
+        """
+        The compiled patterns as JSON-compatible data, see `from_state`.
+        """
+        return {
+            "names": self._names,
+            "suffixes": self._suffixes,
+            "negated": self._negated,
+            "regexes": self._regexes,
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "_GitignorePatterns":
+        compiled = cls.__new__(cls)
+        compiled._names = tuple(state["names"])
+        compiled._suffixes = tuple(state["suffixes"])
+        compiled._negated = state["negated"]
+        compiled._regexes = tuple(tuple(regex) for regex in state["regexes"])
+        compiled._matchers = [None, None]
+        return compiled
+
+    def _matcher(self, which: int):
+        matcher = self._matchers[which]
+        if matcher is None:
+            matcher = re.compile(self._regexes[which][1]).match
+            self._matchers[which] = matcher
+        return matcher
+
+    def check(self, path: str, is_dir: bool) -> bool | None:
+        """
+        Return True if `path` is ignored, False if a negation re-includes it
+        and None if no pattern matches it.
+
+        Args:
+            path: `/`-separated, relative to the patterns' directory, without
+                leading `./` or trailing `/`
+            is_dir: True if `path` is a directory
+        """
+        name = path.rpartition("/")[2]
+        last = self._names[is_dir].get(name, -1)
+        suffixes = self._suffixes[is_dir]
+        if suffixes:
+            dot = name.find(".")
+            while dot >= 0:
+                last = max(last, suffixes.get(name[dot:], -1))
+                dot = name.find(".", dot + 1)
+        text = path + "/" if is_dir else path
+        if last < self._regexes[0][0]:
+            match = self._matcher(0)(text)
+            if match:
+                last = max(last, int(match.lastgroup[1:]))
+        if last < self._regexes[1][0]:
+            regex = self._matcher(1)
+            # at the start of each component, the file's own `.+/` prefix
+            start = 0
+            while start >= 0:
+                match = regex(text, start)
+                if match:
+                    last = max(last, int(match.lastgroup[1:]))
+                start = text.find("/", start, len(path)) + 1 or -1
+        if last < 0:
+            return None
+        return not self._negated[last]
 
 
 class GitignoreRule(BaseRule):
@@ -22,9 +196,15 @@ class GitignoreRule(BaseRule):
     False # logs/ is excluded file.
     """
 
+    cost = 10
+
     def __init__(self, patterns: list[str] = None):
         super().__init__()
-        self.spec = pathspec.PathSpec.from_lines("gitwildmatch", patterns)
+        self.patterns = list(patterns) if patterns is not None else []
+        self._compiled = _GitignorePatterns(self.patterns)
+        # directory path -> ignored, so the entries below are decided by one
+        # lookup of their parent
+        self._ignored_dirs: dict[str, bool] = {}
 
     @classmethod
     def load(cls, gitignore_path: str) -> "GitignoreRule":
@@ -34,23 +214,42 @@ class GitignoreRule(BaseRule):
         Args:
             gitignore_path: Path to the gitignore file.
         """
+        return cls(cls.read_patterns(gitignore_path))
+
+    @classmethod
+    def from_compiled(cls, patterns: list[str], state: dict) -> "GitignoreRule":
+        """
+        Rebuild a rule from its patterns and the `_compiled.state` they were
+        compiled to, without compiling them again.
+        """
+        rule = cls.__new__(cls)
+        rule.patterns = list(patterns)
+        rule._compiled = _GitignorePatterns.from_state(state)
+        rule._ignored_dirs = {}
+        return rule
+
+    @staticmethod
+    def read_patterns(gitignore_path: str) -> list[str]:
+        """
+        Read the patterns of a gitignore file, without comments and blank
+        lines.
+        """
         with open(gitignore_path, "r") as f:
-            patterns = []
-            for line in f:
-                line = line.strip()
-                # comment or empty line, skip
-                if line.startswith("#") or line == "":
-                    continue
-                patterns.append(line)
-            print(patterns)
-            return cls(patterns)
-
-    def _setup_query(self, query: str, is_dir: bool = False) -> str:
-        if is_dir and not query.endswith("/"):
-            query = query + "/"
-        if not query.startswith("./") or not query.startswith("/"):
-            query = "./" + query
-        return query
+            return GitignoreRule.parse_patterns(f)
+
+    @staticmethod
+    def parse_patterns(lines: Iterable[str]) -> list[str]:
+        patterns = []
+        for line in lines:
+            line = line.strip()
+            # comment or empty line, skip
+            if line.startswith("#") or line == "":
+                continue
+            patterns.append(line)
+        return patterns
+
+    def fingerprint(self) -> str:
+        return f"GitignoreRule{self.patterns!r}"
 
     @staticmethod
     def suffix_weak_hint(query: str) -> bool:
@@ -80,19 +279,52 @@ class GitignoreRule(BaseRule):
 
         # If it has an extension or is a wildcard file pattern, it's a file
         if has_extension or is_wildcard_file:
-            for dir in CONFUSING_DIRS:
-                if query.endswith(dir):
-                    return True
-            return False
+            return query.endswith(_CONFUSING_DIR_SUFFIXES)
 
         # Otherwise, treat it as a directory
         return True
 
     def _judge_ignore_file(self, query: str, is_dir: bool | None = None) -> bool:
+        # queries from the walker carry the relative path and the real type.
+        if is_dir is None:
+            is_dir = query_is_dir(query)
+        query = query_path(query)
         if is_dir is None:
             is_dir = self.suffix_weak_hint(query)
-        query = self._setup_query(query, is_dir)
-        return self.spec.match_file(query)
+        path = query.removeprefix("./").strip("/")
+        return self._is_ignored(path, is_dir)
+
+    def _filter_many(self, queries):
+        check = self._compiled.check
+        is_ignored_dir = self._is_ignored_dir
+        # a listing shares one parent: look it up once
+        last_parent, parent_ignored = None, False
+        decisions = []
+        for query in queries:
+            is_dir = query_is_dir(query)
+            path = query_path(query)
+            if is_dir is None:
+                is_dir = self.suffix_weak_hint(path)
+            path = path.removeprefix("./").strip("/")
+            parent = path.rpartition("/")[0]
+            if parent != last_parent:
+                last_parent = parent
+                parent_ignored = bool(parent) and is_ignored_dir(parent)
+            decisions.append(not parent_ignored and not check(path, is_dir))
+        return decisions
+
+    def _is_ignored(self, path: str, is_dir: bool) -> bool:
+        # like git, nothing below an ignored directory can be re-included
+        parent = path.rpartition("/")[0]
+        if parent and self._is_ignored_dir(parent):
+            return True
+        return bool(self._compiled.check(path, is_dir))
+
+    def _is_ignored_dir(self, path: str) -> bool:
+        ignored = self._ignored_dirs.get(path)
+        if ignored is None:
+            ignored = self._ignored_dirs[path] = self._is_ignored(path, True)
+        return ignored
 
     def matches(self, query: str, is_dir: bool | None = None) -> bool:
         if self.is_include(query, is_dir):  # include
@@ -0,0 +1,136 @@
+import hashlib
+import os
+
+from pyteleport.rule import BaseRule
+from pyteleport.rule.module.gitignore_rule import GitignoreRule, _GitignorePatterns
+from pyteleport.rule.query import query_is_dir, query_path
+
+# (directory prefix, spec), deepest directory first
+_Chain = tuple[tuple[str, _GitignorePatterns], ...]
+
+
+class GitignoreTreeRule(BaseRule):
+    """
+    Judge a query with every `.gitignore` between the walk root and it.
+
+    Like git, a directory's `.gitignore` applies to the paths below that
+    directory, relative to it, and takes precedence over the files of its
+    ancestors; within one file the last matching pattern wins, so `!keep`
+    re-includes what a parent file ignored.
+
+    Files are read lazily, the first time an entry of their directory is
+    judged, so the `.gitignore` of an ignored directory is never read. The
+    compiled spec of each directory is cached, as is each distinct pattern
+    list, so identical files in sibling subtrees are compiled once.
+
+    The decisions depend on the files, so `fingerprint` only describes the
+    configuration and `dir_fingerprint` the files that apply to a
+    directory; a walk cache checks both.
+
+    Args:
+        root: root of the walk; queries are relative to it.
+        base_patterns: patterns below all `.gitignore` files, relative to
+            `root` (e.g. those of `.git/info/exclude`).
+        filename: name of the per-directory ignore file.
+
+    Example:
+    >>> rule = GitignoreTreeRule("./repo")
+    >>> rule.matches(RuleQuery("out", "web/out", is_dir=True))
+    False # web/.gitignore lists `out/`
+    """
+
+    cost = 10
+
+    def __init__(
+        self,
+        root: str,
+        base_patterns: list[str] | None = None,
+        filename: str = ".gitignore",
+    ):
+        super().__init__()
+        self.root = root
+        self.base_patterns = list(base_patterns) if base_patterns else []
+        self.filename = filename
+        # pattern list -> compiled spec, shared by identical files
+        self._compiled: dict[tuple[str, ...], _GitignorePatterns] = {}
+        # rel_dir -> specs that apply to its entries
+        self._chains: dict[str, _Chain] = {}
+        # rel_dir -> patterns of its own ignore file, and the hash of the
+        # files that apply to it
+        self._read: dict[str, list[str]] = {}
+        self._digests: dict[str, str] = {}
+
+    def fingerprint(self) -> str:
+        return (
+            f"GitignoreTreeRule[{self.root!r}, {self.base_patterns!r}, "
+            f"{self.filename!r}]"
+        )
+
+    def dir_fingerprint(self, rel_dir: str) -> str:
+        """
+        Hash of the ignore files that apply to the entries of `rel_dir`:
+        its own and those of its ancestors.
+        """
+        digest = self._digests.get(rel_dir)
+        if digest is None:
+            parent = self.dir_fingerprint(rel_dir.rpartition("/")[0]) if rel_dir else ""
+            text = "\n".join(self._patterns(rel_dir))
+            digest = hashlib.sha256(f"{parent}\0{text}".encode()).hexdigest()
+            self._digests[rel_dir] = digest
+        return digest
+
+    def _compile(self, patterns: list[str]) -> _GitignorePatterns:
+        key = tuple(patterns)
+        spec = self._compiled.get(key)
+        if spec is None:
+            spec = self._compiled[key] = _GitignorePatterns(patterns)
+        return spec
+
+    def _patterns(self, rel_dir: str) -> list[str]:
+        patterns = self._read.get(rel_dir)
+        if patterns is None:
+            ignore_path = os.path.join(self.root, rel_dir, self.filename)
+            try:
+                patterns = GitignoreRule.read_patterns(ignore_path)
+            except (FileNotFoundError, NotADirectoryError, IsADirectoryError):
+                patterns = []
+            self._read[rel_dir] = patterns
+        return patterns
+
+    def _chain(self, rel_dir: str) -> _Chain:
+        chain = self._chains.get(rel_dir)
+        if chain is not None:
+            return chain
+        if rel_dir:
+            chain = self._chain(rel_dir.rpartition("/")[0])
+        elif self.base_patterns:
+            chain = (("", self._compile(self.base_patterns)),)
+        else:
+            chain = ()
+        patterns = self._patterns(rel_dir)
+        if patterns:
+            prefix = f"{rel_dir}/" if rel_dir else ""
+            chain = ((prefix, self._compile(patterns)), *chain)
+        self._chains[rel_dir] = chain
+        return chain
+
+    def _judge_ignore_file(self, query: str) -> bool:
+        rel_path = query_path(query).strip("/")
+        is_dir = query_is_dir(query)
+        if is_dir is None:
+            is_dir = os.path.isdir(os.path.join(self.root, rel_path))
+        rel_dir = rel_path.rpartition("/")[0]
+        for prefix, spec in self._chain(rel_dir):
+            ignored = spec.check(rel_path[len(prefix) :], is_dir)
+            if ignored is not None:
+                return ignored
+        return False
+
+    def matches(self, query: str) -> bool:
+        return self.is_include(query)
+
+    def is_include(self, query: str) -> bool:
+        return not self._judge_ignore_file(query)
+
+    def is_exclude(self, query: str) -> bool:
+        return self._judge_ignore_file(query)
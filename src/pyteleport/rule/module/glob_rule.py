@@ -1,7 +1,106 @@
 import fnmatch
-from pathlib import Path
+import os
+import re
+from pathlib import PurePath
 
 from pyteleport.rule import BaseRule
+from pyteleport.rule.query import RuleQuery, query_path
+
+# `PurePath.match` compares case-insensitively on Windows
+_CASEFOLD = os.name == "nt"
+_WILDCARDS = re.compile(r"[*?[]")
+
+
+def _path_parts(path: str) -> tuple[str, ...]:
+    """
+    Return `PurePath(path).parts`, casefolded like `PurePath.match` does.
+
+    Relative POSIX paths, which is what the walker passes, are split
+    without building a path object.
+    """
+    if _CASEFOLD:
+        return tuple(part.lower() for part in PurePath(path).parts)
+    if path.startswith("/"):
+        return PurePath(path).parts
+    return tuple(part for part in path.split("/") if part and part != ".")
+
+
+class _PathPatterns:
+    """
+    Glob patterns compiled once, matched like any of `PurePath(q).match(p)`.
+
+    `PurePath.match` compares a relative pattern with the last components of
+    the path, one `fnmatchcase` per component. So the patterns are bucketed
+    by shape:
+
+    - `*<literal>` (e.g. `*.py`): one `str.endswith` with a tuple of
+      suffixes, on the last component
+    - other one-component patterns: one combined regex on the last component
+    - multi-component patterns with k components: one combined regex per
+      k, on the last k components joined with NUL. Each pattern has k - 1
+      literal NULs and so has the text, so no wildcard can match across a
+      component boundary.
+    - anchored patterns (`/abs/*.py`, `C:*`): `PurePath.match` itself
+    """
+
+    def __init__(self, patterns: list[str]):
+        self.patterns = list(patterns)
+        suffixes = []
+        names = []
+        # component count -> translated patterns
+        multi: dict[int, list[str]] = {}
+        self._anchored: list[str] = []
+        for pattern in self.patterns:
+            pure = PurePath(pattern)
+            if not pure.parts:
+                raise ValueError(f"empty pattern: {pattern!r}")
+            if pure.drive or pure.root:
+                self._anchored.append(pattern)
+                continue
+            parts = _path_parts(pattern)
+            if len(parts) > 1:
+                # `translate` ends each pattern with `\Z`, kept only at the end
+                translated = [fnmatch.translate(part)[:-2] for part in parts]
+                pattern_re = r"\x00".join(translated) + r"\Z"
+                multi.setdefault(len(parts), []).append(pattern_re)
+            elif parts[0].startswith("*") and not _WILDCARDS.search(parts[0][1:]):
+                suffixes.append(parts[0][1:])
+            else:
+                names.append(fnmatch.translate(parts[0]))
+        self._suffixes = tuple(suffixes)
+        self._names = re.compile("|".join(names)).match if names else None
+        self._multi = [
+            (count, re.compile("|".join(translated)).match)
+            for count, translated in sorted(multi.items())
+        ]
+
+    @property
+    def name_only(self) -> bool:
+        """
+        True if only the last component of a path is ever compared.
+        """
+        return not self._multi and not self._anchored
+
+    def __repr__(self) -> str:
+        return f"_PathPatterns({self.patterns!r})"
+
+    def match(self, query: str) -> bool:
+        parts = _path_parts(query)
+        if parts:
+            name = parts[-1]
+            if self._suffixes and name.endswith(self._suffixes):
+                return True
+            if self._names is not None and self._names(name):
+                return True
+            for count, match in self._multi:
+                if count > len(parts):
+                    break
+                if match("\0".join(parts[-count:])):
+                    return True
+        if self._anchored:
+            path = PurePath(query)
+            return any(path.match(pattern) for pattern in self._anchored)
+        return False
 
 
 class GlobRule(BaseRule):
@@ -27,6 +126,8 @@ class GlobRule(BaseRule):
     False
     """
 
+    cost = 2
+
     def __init__(
         self, include_patterns: list[str] = None, exclude_patterns: list[str] = None
     ):
@@ -39,6 +140,13 @@ class GlobRule(BaseRule):
         )
         # default exclude_patterns is []. exclude-target nothing.
         self.exclude_patterns = exclude_patterns if exclude_patterns is not None else []
+        # compiled once; same decisions as `Path(query).match(pattern)`
+        self._include = _PathPatterns(self.include_patterns)
+        self._exclude = _PathPatterns(self.exclude_patterns)
+
+    @property
+    def name_only(self) -> bool:
+        return self._include.name_only and self._exclude.name_only
 
     """
     def matches(self, query: str) -> bool:
@@ -54,19 +162,38 @@ class GlobRule(BaseRule):
             return True
         return False
 
+    def _filter_many(self, queries):
+        include, exclude = self._include.match, self._exclude.match
+        if not self.name_only:
+            return [
+                not exclude(path) and include(path) for path in map(query_path, queries)
+            ]
+        # decided once per name, which repeats across directories
+        decisions: dict[str, bool] = {}
+        result = []
+        for query in queries:
+            name = str(query) if isinstance(query, RuleQuery) else query
+            decision = decisions.get(name)
+            if decision is None:
+                path = query_path(query)
+                decision = decisions[name] = not exclude(path) and include(path)
+            result.append(decision)
+        return result
+
     def _judge_include_or_exclude(self, query: str) -> bool:
         """
         Judge if the query matches the include or exclude patterns.
         - if return True, the query matches the include path.
         - if return False, the query matches the exclude path.
         """
+        # match against the relative path when the walker provides one, so
+        # multi-component patterns like `src/*.py` can apply.
+        query = query_path(query)
         # exclude
-        #if any(fnmatch.fnmatch(query, pattern) for pattern in self.exclude_patterns):
-        if any(Path(query).match(pattern) for pattern in self.exclude_patterns):
+        if self._exclude.match(query):
             return False
         # include
-        #if any(fnmatch.fnmatch(query, pattern) for pattern in self.include_patterns):
-        if any(Path(query).match(pattern) for pattern in self.include_patterns):
+        if self._include.match(query):
             return True
         # if not match any patterns, return False, but treat as exclude.
         return False
@@ -17,11 +17,16 @@ class HiddenFileRule(BaseRule):
         True
     """
 
+    name_only = True
+
     def matches(self, query: str) -> bool:
         if self.is_include(query):  # not hidden file
             return True
         return False  # hidden file
 
+    def _filter_many(self, queries):
+        return [not query.startswith(".") for query in queries]
+
     def is_include(self, query: str) -> bool:
         return not query.startswith(".")  # not hidden file
 
@@ -0,0 +1,66 @@
+import os
+
+
+class RuleQuery(str):
+    """
+    Query handed to rules by the walker.
+
+    It is a `str` equal to the bare entry name, so rules that only look at the
+    name keep working unchanged, and it also carries what the walker already
+    knows about the entry.
+
+    Attributes:
+        rel_path: path relative to the walk root, always `/`-separated.
+        is_dir: True if the entry is a directory, None if unknown.
+        entry: the `os.DirEntry` the query was built from, if any.
+
+    Example:
+        >>> query = RuleQuery("fixtures", rel_path="src/api/fixtures", is_dir=True)
+        >>> query == "fixtures"
+        True
+        >>> query.rel_path
+        'src/api/fixtures'
+    """
+
+    rel_path: str
+    is_dir: bool | None
+    entry: os.DirEntry | None
+
+    def __new__(
+        cls,
+        name: str,
+        rel_path: str | None = None,
+        is_dir: bool | None = None,
+        entry: os.DirEntry | None = None,
+    ):
+        query = super().__new__(cls, name)
+        query.rel_path = name if rel_path is None else rel_path
+        query.is_dir = is_dir
+        query.entry = entry
+        return query
+
+    def __reduce__(self):
+        # `os.DirEntry` cannot be pickled
+        return RuleQuery, (str(self), self.rel_path, self.is_dir)
+
+    @classmethod
+    def from_entry(cls, entry: os.DirEntry, rel_dir: str = "") -> "RuleQuery":
+        """
+        Build a query for `entry`, found in the directory `rel_dir` of the walk.
+        """
+        rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+        return cls(entry.name, rel_path, entry.is_dir(), entry)
+
+
+def query_path(query: str) -> str:
+    """
+    Return the relative path of a query, or the query itself for plain strings.
+    """
+    return query.rel_path if isinstance(query, RuleQuery) else query
+
+
+def query_is_dir(query: str) -> bool | None:
+    """
+    Return the entry type of a query, or None when it is not known.
+    """
+    return query.is_dir if isinstance(query, RuleQuery) else None
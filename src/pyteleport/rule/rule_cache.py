@@ -0,0 +1,94 @@
+import hashlib
+import json
+import os
+from importlib import metadata
+
+import pathspec
+
+from pyteleport.rule.module.gitignore_rule import GitignoreRule
+
+# bump when the compiled form of `GitignoreRule` changes
+RULE_CACHE_VERSION = 3
+
+
+def _library_versions() -> str:
+    try:
+        version = metadata.version("pyteleport")
+    except metadata.PackageNotFoundError:  # run from a source checkout
+        version = "source"
+    return f"pyteleport {version}, pathspec {pathspec.__version__}"
+
+
+class RuleCache:
+    """
+    On-disk cache of compiled gitignore files, for fast start-up.
+
+    Compiling a large ignore file (translating every pattern and bucketing
+    it) costs far more than reading it. The compiled form is plain data, so
+    it is stored as JSON keyed by the file content and the library
+    versions; a later run with the same file loads it without compiling.
+    The regexes themselves are compiled by `re` on first use.
+
+    Args:
+        cache_dir: directory holding the cache files.
+
+    Example:
+        >>> cache = RuleCache("~/.cache/pyteleport/rules")
+        >>> rule = cache.load_gitignore(".gitignore")  # compiles and stores
+        >>> rule = cache.load_gitignore(".gitignore")  # loads
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = os.path.expanduser(cache_dir)
+
+    def _cache_path(self, content: bytes) -> str:
+        digest = hashlib.sha256(
+            f"{RULE_CACHE_VERSION}\0{_library_versions()}\0".encode() + content
+        ).hexdigest()
+        return os.path.join(self.cache_dir, f"gitignore-{digest}.json")
+
+    def load_gitignore(self, gitignore_path: str) -> GitignoreRule:
+        """
+        Load a gitignore file as a `GitignoreRule`, compiled from the cache
+        when this content was seen before.
+        """
+        with open(gitignore_path, "rb") as f:
+            content = f.read()
+        cache_path = self._cache_path(content)
+        try:
+            with open(cache_path, "r") as f:
+                cached = json.load(f)
+            return GitignoreRule.from_compiled(cached["patterns"], cached["compiled"])
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+        patterns = GitignoreRule.parse_patterns(content.decode().splitlines())
+        rule = GitignoreRule(patterns)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, "w") as f:
+                f.write(
+                    json.dumps(
+                        {"patterns": patterns, "compiled": rule._compiled.state},
+                        separators=(",", ":"),
+                    )
+                )
+            os.replace(tmp_path, cache_path)  # readers never see a partial file
+        except OSError:
+            # read-only, full or not ours: the rule works without the cache
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+        return rule
+
+    def clear(self) -> None:
+        """
+        Remove every cache file in the cache directory.
+        """
+        if not os.path.isdir(self.cache_dir):
+            return
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.startswith("gitignore-") and entry.name.endswith(".json"):
+                os.remove(entry.path)
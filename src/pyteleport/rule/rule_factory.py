@@ -7,9 +7,11 @@ from pyteleport.rule import (
     CompositeRule,
     DirRule,
     GitignoreRule,
+    GitignoreTreeRule,
     GlobRule,
     HiddenFileRule,
 )
+from pyteleport.rule.rule_cache import RuleCache
 
 
 class RuleFactory:
@@ -18,6 +20,8 @@ class RuleFactory:
         include_patterns: List[str] = None,
         exclude_patterns: List[str] = None,
         special_words: str | List[str] | None = None,
+        cache_size: int | None = None,
+        optimize: bool = False,
         **kwargs,
     ) -> CompositeRule:
         rule_configs = []
@@ -34,12 +38,23 @@ class RuleFactory:
                             "gitignore_path": kwargs.get("gitignore_path"),
                         }
                     )
+                elif special_word == "GITIGNORES":
+                    rule_configs.append(
+                        {
+                            "type": SPECIAL_RULES_RESERVED_WORDS[special_word],
+                            "root": kwargs.get("root", "."),
+                        }
+                    )
                 else:  # hidden_file or dir
                     rule_configs.append(
                         {
                             "type": SPECIAL_RULES_RESERVED_WORDS[special_word],
                         }
                     )
+        if kwargs.get("rule_cache_dir"):
+            for config in rule_configs:
+                if config["type"] == "gitignore":
+                    config["cache_dir"] = kwargs["rule_cache_dir"]
 
         rule_configs.append(
             {
@@ -48,7 +63,11 @@ class RuleFactory:
                 "exclude_patterns": exclude_patterns,
             }
         )
-        return RuleFactory.create_composite_rule(rule_configs)
+        rule = RuleFactory.create_composite_rule(rule_configs, cache_size)
+        if optimize:
+            # flat, deduplicated, and ordered by measured cost per rejection
+            rule.optimize()
+        return rule
 
     @staticmethod
     def create_rule(rule_type: str, **kwargs) -> Union[BaseRule, CompositeRule]:
@@ -56,7 +75,7 @@ class RuleFactory:
         Create a rule based on the specified rule type and parameters.
 
         Args:
-            rule_type: The type of rule to create ('glob', 'gitignore', 'hidden_file', 'dir', 'composite')
+            rule_type: The type of rule to create ('glob', 'gitignore', 'gitignore_tree', 'hidden_file', 'dir', 'composite')
             **kwargs: Additional parameters specific to the rule type
 
         Returns:
@@ -71,14 +90,26 @@ class RuleFactory:
                 exclude_patterns=kwargs.get("exclude_patterns", []),
             )
         elif rule_type == "gitignore":
+            # with `cache_dir`, compiled once per file content
+            load = (
+                RuleCache(kwargs["cache_dir"]).load_gitignore
+                if kwargs.get("cache_dir")
+                else GitignoreRule.load
+            )
             if "gitignore_path" not in kwargs:
                 if os.path.exists("./.gitignore"):
-                    rules = GitignoreRule.load("./.gitignore")
+                    rules = load("./.gitignore")
                     return CompositeRule(rules=[rules])
                 raise ValueError("gitignore_path is required")
-            rules = GitignoreRule.load(kwargs.get("gitignore_path"))
+            rules = load(kwargs.get("gitignore_path"))
             return CompositeRule(rules=[rules])
 
+        elif rule_type == "gitignore_tree":
+            rule = GitignoreTreeRule(
+                kwargs.get("root", "."), kwargs.get("base_patterns")
+            )
+            return CompositeRule(rules=[rule])
+
         elif rule_type == "hidden_file":
             return CompositeRule(rules=[HiddenFileRule()])
 
@@ -99,12 +130,15 @@ class RuleFactory:
             raise ValueError(f"Invalid rule type: {rule_type}")
 
     @staticmethod
-    def create_composite_rule(rule_configs: List[Dict[str, Any]]) -> CompositeRule:
+    def create_composite_rule(
+        rule_configs: List[Dict[str, Any]], cache_size: int | None = None
+    ) -> CompositeRule:
         """
         Create a composite rule from a list of rule configurations.
 
         Args:
             rule_configs: List of rule configurations, each containing a 'type' key and other parameters
+            cache_size: Number of decisions the composite rule caches, None for no cache
 
         Returns:
             A CompositeRule that combines all the specified rules
@@ -122,4 +156,4 @@ class RuleFactory:
             rule_type = config_copy.pop("type")
             rule = RuleFactory.create_rule(rule_type, **config_copy)
             rules.append(rule)
-        return CompositeRule(rules=rules)
+        return CompositeRule(rules=rules, cache_size=cache_size)
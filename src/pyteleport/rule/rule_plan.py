@@ -0,0 +1,171 @@
+import reprlib
+import time
+from collections.abc import Sequence
+
+from pyteleport.rule import BaseRule
+
+
+def _describe(rule: BaseRule) -> str:
+    patterns = [
+        f"{key}={reprlib.repr(value)}"
+        for key, value in vars(rule).items()
+        if key in ("patterns", "include_patterns", "exclude_patterns")
+    ]
+    return " ".join([type(rule).__name__, *patterns])
+
+
+def filter_survivors(rules: Sequence[BaseRule], queries: Sequence[str]) -> list[bool]:
+    """
+    Judge a batch rule by rule, each rule only seeing the queries that all
+    the previous ones matched.
+    """
+    decisions = [True] * len(queries)
+    pending = list(range(len(queries)))
+    for rule in rules:
+        if not pending:
+            break
+        matched = rule.filter_many([queries[i] for i in pending])
+        kept = []
+        for i, ok in zip(pending, matched):
+            if ok:
+                kept.append(i)
+            else:
+                decisions[i] = False
+        pending = kept
+    return decisions
+
+
+class RulePlan:
+    """
+    Order in which `CompositeRule.matches` evaluates its rules.
+
+    A query matches only if every rule matches it, so evaluation stops at
+    the first rule that rejects it and the order changes the cost but never
+    the decision. The cheapest expected order runs first the rules with the
+    lowest cost per rejection, `cost / rejection_rate`.
+
+    Until they are measured, rules are ordered by their static `cost`. Then
+    one query in `sample_every` is judged by every rule, each timed, and the
+    plan is re-ordered from those statistics every `reorder_every` samples.
+    `filter_many` samples the same way by batch: one batch in `sample_every`
+    is judged whole by every rule, each timed over the batch.
+    Statistics are not locked: with threads, a few samples may be lost.
+
+    Args:
+        rules: rules to evaluate, in construction order
+        sample_every: judge one query in this many with every rule
+        reorder_every: samples between two re-orderings
+    """
+
+    def __init__(
+        self, rules: list[BaseRule], sample_every: int = 64, reorder_every: int = 16
+    ):
+        if sample_every <= 0 or reorder_every <= 0:
+            raise ValueError("sample_every and reorder_every must be positive")
+        self.sample_every = sample_every
+        self.reorder_every = reorder_every
+        self.calls = 0
+        self.batches = 0
+        self.samples = 0
+        # rule index -> measured seconds, rejections
+        self._seconds = [0.0] * len(rules)
+        self._rejections = [0] * len(rules)
+        self._rules = list(rules)
+        self.order = sorted(range(len(rules)), key=lambda i: rules[i].cost)
+        self._ordered = [rules[i] for i in self.order]
+
+    def matches(self, query: str) -> bool:
+        calls = self.calls
+        self.calls = calls + 1
+        if calls % self.sample_every:
+            return all(rule.matches(query) for rule in self._ordered)
+        return self._sample(query)
+
+    def filter_many(self, queries: Sequence[str]) -> list[bool]:
+        """
+        Judge a batch in the current order, as `CompositeRule.filter_many`.
+        """
+        batches = self.batches
+        self.batches = batches + 1
+        self.calls += len(queries)
+        if batches % self.sample_every or not queries:
+            return filter_survivors(self._ordered, queries)
+        return self._sample_many(queries)
+
+    @property
+    def rules(self) -> list[BaseRule]:
+        """
+        The rules, in the current evaluation order.
+        """
+        return self._ordered
+
+    def _sample(self, query: str) -> bool:
+        decision = True
+        clock = time.perf_counter
+        for i, rule in enumerate(self._rules):
+            start = clock()
+            matched = rule.matches(query)
+            self._seconds[i] += clock() - start
+            if not matched:
+                self._rejections[i] += 1
+                decision = False
+        self.samples += 1
+        if self.samples % self.reorder_every == 0:
+            self._reorder()
+        return decision
+
+    def _sample_many(self, queries: Sequence[str]) -> list[bool]:
+        decisions = [True] * len(queries)
+        clock = time.perf_counter
+        for i, rule in enumerate(self._rules):
+            start = clock()
+            matched = rule.filter_many(queries)
+            self._seconds[i] += clock() - start
+            for j, ok in enumerate(matched):
+                if not ok:
+                    self._rejections[i] += 1
+                    decisions[j] = False
+        samples = self.samples
+        self.samples = samples + len(queries)
+        if self.samples // self.reorder_every > samples // self.reorder_every:
+            self._reorder()
+        return decisions
+
+    def cost(self, i: int) -> float:
+        """
+        Mean seconds per decision of rule `i`, measured.
+        """
+        return self._seconds[i] / self.samples if self.samples else 0.0
+
+    def rejection_rate(self, i: int) -> float:
+        """
+        Share of the sampled queries rejected by rule `i`.
+        """
+        return self._rejections[i] / self.samples if self.samples else 0.0
+
+    def _reorder(self) -> None:
+        samples = self.samples
+
+        def cost_per_rejection(i: int) -> float:
+            # smoothed, so a rule that never rejected still has a finite rank
+            rate = (self._rejections[i] + 1) / (samples + 2)
+            return self._seconds[i] / samples / rate
+
+        order = sorted(range(len(self._rules)), key=cost_per_rejection)
+        # swap the list in one assignment, other threads may be iterating
+        self._ordered = [self._rules[i] for i in order]
+        self.order = order
+
+    def explain(self) -> str:
+        lines = [f"plan after {self.calls} queries, {self.samples} sampled"]
+        for position, i in enumerate(self.order, 1):
+            rule = self._rules[i]
+            if self.samples:
+                measured = (
+                    f"{self.cost(i) * 1e6:8.2f} us/query, "
+                    f"rejects {self.rejection_rate(i):6.1%}"
+                )
+            else:
+                measured = f"static cost {rule.cost}"
+            lines.append(f"  {position}. {_describe(rule)}: {measured}")
+        return "\n".join(lines)
@@ -0,0 +1,81 @@
+import os
+
+import pytest
+
+from pyteleport.core import CompactTeleportTree, TeleportTree
+from pyteleport.core.compact_tree import CompactTreeStorage
+from pyteleport.core.walker import iter_tree
+
+
+@pytest.fixture
+def temp_dir():
+    temp_dir = os.path.join("./", "dummy", "example_tree")
+
+    yield temp_dir
+
+
+class TestCompactTreeStorage:
+    def test_round_trip_records(self, temp_dir):
+        records = list(iter_tree(temp_dir))
+        storage = CompactTreeStorage.from_records(temp_dir, records)
+
+        assert len(storage) == len(records)
+        assert [storage.record(idx) for idx in range(len(storage))] == records
+
+    def test_names_are_interned(self, temp_dir):
+        storage = CompactTreeStorage.from_records(temp_dir, iter_tree(temp_dir))
+        # file5.md exists in both dir1 and dir2
+        assert storage.names.count("file5.md") == 1
+
+    def test_filter_relinks_siblings(self, temp_dir):
+        storage = CompactTreeStorage.from_records(temp_dir, iter_tree(temp_dir))
+        keep = [not storage.name(idx).endswith(".md") for idx in range(len(storage))]
+        filtered = storage.filter(keep)
+        records = [filtered.record(idx) for idx in range(len(filtered))]
+
+        assert all(not r["name"].endswith(".md") for r in records)
+        for idx, record in enumerate(records):
+            for child in record["children"]:
+                assert records[child]["parent"] == idx
+            if record["children"]:
+                last = records[record["children"][-1]]
+                assert last["symbol"].endswith("└── ")
+
+
+class TestCompactTeleportTree:
+    def test_tree_list_matches_dict_layout(self, temp_dir):
+        assert (
+            CompactTeleportTree(temp_dir).tree_list == TeleportTree(temp_dir).tree_list
+        )
+
+    def test_print_matches_dict_layout(self, temp_dir, capsys):
+        compact, tree = CompactTeleportTree(temp_dir), TeleportTree(temp_dir)
+        capsys.readouterr()
+        compact.print  # noqa: B018
+        compact_out = capsys.readouterr().out
+        tree.print  # noqa: B018
+        assert compact_out == capsys.readouterr().out
+
+    def test_exclude_leaf(self, temp_dir):
+        tree_obj = CompactTeleportTree(temp_dir)
+        initial_count = tree_obj.__len__
+
+        tree_obj.exclude_leaf(["*.txt"])
+
+        names = [item["name"] for item in tree_obj.tree_list]
+        assert not any(name.endswith(".txt") for name in names)
+        assert tree_obj.__len__ < initial_count
+
+    def test_exclude_leaf_matches_dict_layout(self, temp_dir):
+        compact, tree = CompactTeleportTree(temp_dir), TeleportTree(temp_dir)
+        compact.exclude_leaf(["*.md", "*.py"])
+        tree.exclude_leaf(["*.md", "*.py"])
+        assert compact.tree_list == tree.tree_list
+
+    def test_to_single_file_matches_dict_layout(self, temp_dir, tmp_path):
+        compact_out = tmp_path / "compact.txt"
+        dict_out = tmp_path / "dict.txt"
+        CompactTeleportTree(temp_dir).to_single_file(str(compact_out))
+        TeleportTree(temp_dir).to_single_file(str(dict_out))
+
+        assert compact_out.read_text() == dict_out.read_text()
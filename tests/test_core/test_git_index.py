@@ -0,0 +1,101 @@
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from pyteleport.core.git_index import git_index_tree, read_git_index
+from pyteleport.core.tree import TeleportTree
+from pyteleport.rule import GlobRule
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="needs git")
+
+
+def _git(repo, *args):
+    subprocess.run(["git", "-C", str(repo), *args], check=True, capture_output=True)
+
+
+def _files(tree_list, root):
+    return sorted(
+        os.path.relpath(node["path"], root).replace(os.sep, "/")
+        for node in tree_list
+        if not node["is_dir"]
+    )
+
+
+def _assert_consistent(tree_list):
+    for idx, node in enumerate(tree_list):
+        for pos, child in enumerate(node["children"]):
+            assert tree_list[child]["parent"] == idx
+            is_last = pos == len(node["children"]) - 1
+            assert tree_list[child]["symbol"].endswith("└── " if is_last else "├── ")
+
+
+@pytest.fixture
+def repo(tmp_path):
+    _git(tmp_path, "init", "-q")
+    for rel_path in ["a.py", "docs/index.md", "src/pkg/__init__.py", "src/pkg/m.py"]:
+        path = tmp_path / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("")
+    (tmp_path / ".gitignore").write_text("build/\n*.log\n")
+    _git(tmp_path, "add", ".")
+    # ignored and untracked files
+    (tmp_path / "build").mkdir()
+    (tmp_path / "build" / "out.o").write_text("")
+    (tmp_path / "debug.log").write_text("")
+    (tmp_path / "src" / "pkg" / "new.py").write_text("")
+    return tmp_path
+
+
+TRACKED = [".gitignore", "a.py", "docs/index.md", "src/pkg/__init__.py", "src/pkg/m.py"]
+
+
+@pytest.mark.parametrize("version", ["2", "3", "4"])
+def test_read_git_index_versions(repo, version):
+    _git(repo, "update-index", "--index-version", version)
+    assert [path for path, _ in read_git_index(str(repo))] == TRACKED
+
+
+def test_git_index_tree(repo):
+    tree_list = git_index_tree(str(repo))
+    _assert_consistent(tree_list)
+    assert tree_list[0]["name"] == str(repo)
+    assert _files(tree_list, repo) == TRACKED
+    dirs = {node["name"] for node in tree_list[1:] if node["is_dir"]}
+    assert dirs == {"docs", "src", "pkg"}
+
+
+def test_git_index_tree_untracked(repo):
+    tree_list = git_index_tree(str(repo), include_untracked=True)
+    _assert_consistent(tree_list)
+    assert _files(tree_list, repo) == sorted(TRACKED + ["src/pkg/new.py"])
+
+
+def test_git_index_tree_untracked_nested_gitignore(repo):
+    (repo / "src" / ".gitignore").write_text("new.py\n")
+    (repo / "src" / "pkg" / "other.py").write_text("")
+    tree_list = git_index_tree(str(repo), include_untracked=True)
+    assert _files(tree_list, repo) == sorted(
+        TRACKED + ["src/.gitignore", "src/pkg/other.py"]
+    )
+
+
+def test_git_index_tree_rule(repo):
+    tree_list = git_index_tree(str(repo), GlobRule(exclude_patterns=["docs", "m.py"]))
+    assert _files(tree_list, repo) == [".gitignore", "a.py", "src/pkg/__init__.py"]
+
+
+def test_git_index_tree_not_a_repo(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        git_index_tree(str(tmp_path))
+
+
+def test_tree_from_git_index(repo):
+    tree = TeleportTree.from_git_index(str(repo), exclude_patterns=["*.md"])
+    assert _files(tree.tree_list, repo) == [
+        ".gitignore",
+        "a.py",
+        "src/pkg/__init__.py",
+        "src/pkg/m.py",
+    ]
@@ -0,0 +1,162 @@
+import io
+import os
+
+import pytest
+
+from pyteleport.core.render import (
+    _batches,
+    format_size,
+    print_tree,
+    render_plain,
+    render_text,
+    subtree_totals,
+    summarize_tree,
+)
+from pyteleport.core.walker import iter_tree, scandir_walk
+
+
+@pytest.fixture
+def nodes():
+    return [
+        {"symbol": "", "name": "root", "is_dir": True, "truncated": True},
+        {"symbol": "├── ", "name": "[bold]x.py", "is_dir": False},
+        {"symbol": "└── ", "name": "loop", "is_dir": True, "skipped": "cycle"},
+    ]
+
+
+def test_render_plain(nodes):
+    assert render_plain(nodes) == "root …\n├── [bold]x.py\n└── loop (cycle)\n"
+
+
+def test_render_plain_colors(nodes):
+    lines = render_plain(nodes, "standard").splitlines()
+    assert lines[0] == "\x1b[35mroot\x1b[0m \x1b[2m…\x1b[0m"
+    assert lines[1] == "├── \x1b[36m[bold]x.py\x1b[0m"
+
+
+def test_render_text_does_not_parse_markup(nodes):
+    text = render_text(nodes)
+    assert text.plain == render_plain(nodes)
+    assert {span.style for span in text.spans} == {"magenta", "cyan", "dim"}
+
+
+def test_print_tree_plain_stream(nodes):
+    out = io.StringIO()
+    print_tree(nodes, out)
+    assert out.getvalue() == render_plain(nodes)
+
+
+def test_print_tree_progressive(tmp_path):
+    for i in range(5):
+        (tmp_path / f"d{i}").mkdir()
+        (tmp_path / f"d{i}" / "f.txt").write_text("x")
+    out = io.StringIO()
+    print_tree(iter_tree(str(tmp_path)), out)
+    assert out.getvalue() == render_plain(scandir_walk(str(tmp_path)))
+
+
+def test_batches_release_first_node_early():
+    produced = []
+
+    def nodes():
+        for i in range(4):
+            produced.append(i)
+            yield {"symbol": "", "name": str(i), "is_dir": False}
+
+    batches = _batches(nodes(), interval=60)
+    first = next(batches)
+    assert [node["name"] for node in first] == ["0"]
+    # the first node is released as soon as the second one is known
+    assert produced == [0, 1]
+    assert [node["name"] for batch in batches for node in batch] == ["1", "2", "3"]
+
+
+@pytest.fixture
+def fixtures_tree(tmp_path):
+    data = tmp_path / "data"
+    data.mkdir()
+    for i in range(120):
+        (data / f"case{i:03d}.json").write_text("x" * 100)
+    for i in range(30):
+        (data / f"case{i:03d}.txt").write_text("x")
+    (data / "nested").mkdir()
+    (data / "nested" / "a.bin").write_text("x" * 1000)
+    (tmp_path / "README.md").write_text("x")
+    return tmp_path
+
+
+def test_format_size():
+    assert format_size(512) == "512 B"
+    assert format_size(1500) == "1.5 KB"
+    assert format_size(37_000_000) == "37 MB"
+
+
+def test_subtree_totals(fixtures_tree):
+    tree_list = scandir_walk(str(fixtures_tree))
+    files, total_bytes = subtree_totals(tree_list)
+    assert files[0] == 152
+    assert total_bytes[0] == 120 * 100 + 30 + 1000 + 1
+
+
+def test_summarize_tree(fixtures_tree):
+    tree_list = _sorted_walk(str(fixtures_tree))
+    lines = render_plain(summarize_tree(tree_list, max_children=10, preview=2))
+    lines = lines.splitlines()
+    assert lines[1:] == [
+        "├── README.md",
+        "└── data",
+        "    ├── case000.json",
+        "    ├── case000.txt",
+        "    ├── … 119 more *.json (12 KB)",
+        "    ├── … 29 more *.txt (29 B)",
+        "    └── … 1 more directory (1 files, 1.0 KB)",
+    ]
+
+
+def test_summarize_tree_groups_and_bounds(fixtures_tree):
+    tree_list = _sorted_walk(str(fixtures_tree))
+    nodes = summarize_tree(tree_list, max_children=10, preview=0, max_groups=2)
+    summary = [node["name"] for node in nodes if node.get("summary")]
+    assert summary == [
+        "… 120 more *.json (12 KB)",
+        "… 31 more entries (1.0 KB)",
+    ]
+    assert summarize_tree(tree_list, max_children=1000) == tree_list
+
+
+def _sorted_walk(path):
+    """Walk with children in name order, so the output is deterministic."""
+    tree_list = []
+
+    def visit(full_path, name, parent, prefix, connector):
+        idx = len(tree_list)
+        is_dir = os.path.isdir(full_path)
+        tree_list.append(
+            {
+                "symbol": prefix + connector,
+                "name": name,
+                "path": full_path,
+                "parent": parent,
+                "children": [],
+                "is_dir": is_dir,
+            }
+        )
+        if parent >= 0:
+            tree_list[parent]["children"].append(idx)
+        if is_dir:
+            names = sorted(os.listdir(full_path))
+            child_prefix = prefix + (
+                "" if parent < 0 else ("    " if connector == "└── " else "│   ")
+            )
+            for pos, child in enumerate(names):
+                last = pos == len(names) - 1
+                visit(
+                    os.path.join(full_path, child),
+                    child,
+                    idx,
+                    child_prefix,
+                    "└── " if last else "├── ",
+                )
+
+    visit(path, path, -1, "", "")
+    return tree_list
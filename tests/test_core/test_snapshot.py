@@ -0,0 +1,77 @@
+import os
+
+import pytest
+
+from pyteleport.core import TeleportTree
+from pyteleport.core.snapshot import SnapshotStorage, dump_snapshot
+from pyteleport.core.walker import scandir_walk
+
+
+@pytest.fixture
+def temp_dir():
+    temp_dir = os.path.join("./", "dummy", "example_tree")
+
+    yield temp_dir
+
+
+@pytest.mark.parametrize("format", ["binary", "json"])
+def test_round_trip(temp_dir, tmp_path, format):
+    tree = TeleportTree(temp_dir)
+    tree.add_binary_info()
+    tree.dump(str(tmp_path / "tree.snap"), format=format)
+
+    loaded = TeleportTree.load(str(tmp_path / "tree.snap"))
+    assert loaded.tree_list == tree.tree_list
+    assert loaded._first_path == temp_dir
+
+
+def test_binary_load_is_lazy(temp_dir, tmp_path, capsys):
+    tree = TeleportTree(temp_dir)
+    tree.dump(str(tmp_path / "tree.snap"))
+    capsys.readouterr()
+    tree.print  # noqa: B018
+    expected = capsys.readouterr().out
+
+    loaded = TeleportTree.load(str(tmp_path / "tree.snap"))
+    assert loaded.__len__ == len(tree.tree_list)
+    assert "_tree_list" not in loaded.__dict__
+
+    # the records are built on first use
+    loaded.print  # noqa: B018
+    assert capsys.readouterr().out == expected
+    assert "_snapshot" not in loaded.__dict__
+    loaded.exclude_leaf(["*.md"])
+    assert not any(node["name"].endswith(".md") for node in loaded.tree_list)
+
+
+def test_extra_keys(tmp_path):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "a" / "x.py").write_text("")
+    (tmp_path / "b.py").write_text("")
+    tree_list = scandir_walk(str(tmp_path))
+    tree_list[1]["truncated"] = True
+    tree_list[-1]["skipped"] = "cycle"
+    tree_list[-1]["size"] = 3
+    dump_snapshot(tree_list, str(tmp_path), str(tmp_path / "tree.snap"))
+
+    assert SnapshotStorage(str(tmp_path / "tree.snap")).records() == tree_list
+
+
+def test_metadata_columns(tmp_path):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "a" / "x.py").write_text("abc")
+    tree_list = scandir_walk(str(tmp_path), metadata=True)
+    tree_list[-1]["skipped"] = "cycle"
+    dump_snapshot(tree_list, str(tmp_path), str(tmp_path / "tree.snap"))
+
+    storage = SnapshotStorage(str(tmp_path / "tree.snap"))
+    assert storage.records() == tree_list
+    assert storage._extras == {2: {"skipped": "cycle"}}
+
+
+def test_invalid_snapshot(temp_dir, tmp_path):
+    (tmp_path / "bad.snap").write_bytes(b"PTTS" + b"\0" * 60)
+    with pytest.raises(ValueError):
+        TeleportTree.load(str(tmp_path / "bad.snap"))
+    with pytest.raises(ValueError):
+        TeleportTree(temp_dir).dump(str(tmp_path / "tree.snap"), format="yaml")
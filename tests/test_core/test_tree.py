@@ -81,6 +81,21 @@ class TestTreeClass:
         # Check that __len__ returns the correct number of entries
         assert tree_obj.__len__ == len(tree_obj.tree_list)
 
+    def test_tree_class_workers(self, temp_dir):
+        """Test that the thread-pool walk builds the same tree."""
+        assert (
+            TeleportTree(temp_dir, workers=4).tree_list
+            == TeleportTree(temp_dir).tree_list
+        )
+
+    def test_tree_budgets(self, temp_dir):
+        """Test that walk budgets return a truncated partial tree."""
+        tree_obj = TeleportTree(temp_dir, max_entries=2)
+        assert len(tree_obj.tree_list) == 3
+        assert tree_obj.tree_list[0]["truncated"] is True
+        with pytest.raises(ValueError):
+            teleport_tree(temp_dir, workers=2, max_depth=1)
+
     @pytest.mark.parametrize(
         "test_name,method_to_call,args,expected_check",
         [
@@ -115,6 +130,77 @@ class TestTreeClass:
         # Verify the result
         assert expected_check(tree_obj)
 
+    def test_rename_all(self, temp_dir):
+        """Test bulk renames and the rebuilt paths."""
+        tree_obj = TeleportTree(temp_dir)
+        tree_obj.rename_all(str.upper, files_only=True)
+        for item in tree_obj.tree_list[1:]:
+            name = os.path.basename(item["path"])
+            assert item["name"] == name
+            assert name.isupper() != item["is_dir"]
+            parent = tree_obj.tree_list[item["parent"]]
+            assert item["path"] == os.path.join(parent["path"], name)
+
+        tree_obj.rename_all("x_*_*")
+        assert tree_obj.tree_list[1]["name"].startswith("x_")
+        assert tree_obj.tree_list[0]["name"] == temp_dir
+
+    def test_update_path_deep_tree(self, temp_dir):
+        """Test that paths are rebuilt without recursion."""
+        tree_obj = TeleportTree(temp_dir)
+        depth = 2000
+        tree_obj._tree_list = tree_obj._tree_list[:1]
+        tree_obj._tree_list[0]["children"] = [1]
+        for idx in range(1, depth + 1):
+            tree_obj._tree_list.append(
+                {
+                    "symbol": "",
+                    "name": "d",
+                    "path": "",
+                    "parent": idx - 1,
+                    "children": [idx + 1] if idx < depth else [],
+                    "is_dir": True,
+                }
+            )
+        tree_obj._update_path()
+        assert tree_obj.tree_list[-1]["path"] == os.path.join(temp_dir, *["d"] * depth)
+
+    def test_metadata_avoids_reads(self, tmp_path, monkeypatch):
+        """Test that files known to be empty are not opened."""
+        (tmp_path / "empty.py").write_text("")
+        (tmp_path / "full.py").write_text("x = 1\n")
+        tree_obj = TeleportTree(str(tmp_path), metadata=True)
+        assert tree_obj.node("full.py")["size"] == 6
+
+        opened = []
+        monkeypatch.setattr(
+            "pyteleport.core.tree.is_binary",
+            lambda path: opened.append(os.path.basename(path)) or False,
+        )
+        tree_obj.to_single_file(str(tmp_path / "onefile.txt"))
+        assert opened == ["full.py"]
+
+    def test_node_lookup(self, temp_dir):
+        """Test lookups by relative path and by name."""
+        tree_obj = TeleportTree(temp_dir)
+        assert tree_obj.node("") is tree_obj.tree_list[0]
+        assert tree_obj.node("dir1/subdir1/file4.py")["path"] == os.path.join(
+            temp_dir, "dir1", "subdir1", "file4.py"
+        )
+        assert tree_obj.node("dir1/missing.py") is None
+        assert [n["path"] for n in tree_obj.find_name("file5.md")] == [
+            os.path.join(temp_dir, "dir1", "file5.md"),
+            os.path.join(temp_dir, "dir2", "file5.md"),
+        ]
+
+        # the index follows renames and pruning
+        tree_obj.rename_all("new_*")
+        assert tree_obj.node("dir1/file5.md") is None
+        assert tree_obj.node("new_dir1/new_file5.md")["name"] == "new_file5.md"
+        tree_obj.exclude_leaf(["*.md"])
+        assert tree_obj.find_name("new_file5.md") == []
+        assert tree_obj.node("new_dir2") is None
+
     def test_exclude_leaf(self, temp_dir):
         """Test excluding leaves from the tree."""
         tree_obj = TeleportTree(temp_dir)
@@ -0,0 +1,68 @@
+import pytest
+
+from pyteleport.core.tree_edit import prune_tree
+from pyteleport.core.walker import scandir_walk
+
+
+def _assert_valid(tree_list):
+    """Indices point both ways and symbols match the structure."""
+    assert tree_list[0]["parent"] == -1
+    for idx, node in enumerate(tree_list):
+        children = node["children"]
+        for pos, child in enumerate(children):
+            assert child > idx
+            assert tree_list[child]["parent"] == idx
+            prefix = node["symbol"][:-4]
+            if node["symbol"]:
+                prefix += "    " if node["symbol"].endswith("└── ") else "│   "
+            is_last = pos == len(children) - 1
+            assert tree_list[child]["symbol"] == prefix + (
+                "└── " if is_last else "├── "
+            )
+
+
+@pytest.fixture
+def tree_list(tmp_path):
+    (tmp_path / "a" / "b").mkdir(parents=True)
+    (tmp_path / "a" / "b" / "x.py").write_text("")
+    (tmp_path / "a" / "b" / "y.txt").write_text("")
+    (tmp_path / "a" / "z.txt").write_text("")
+    (tmp_path / "empty").mkdir()
+    (tmp_path / "c").mkdir()
+    (tmp_path / "c" / "only.txt").write_text("")
+    (tmp_path / "top.py").write_text("")
+    return scandir_walk(str(tmp_path))
+
+
+def _names(tree_list):
+    return sorted(node["name"] for node in tree_list[1:])
+
+
+class TestPruneTree:
+    def test_keep_all(self, tree_list):
+        expected = [dict(node) for node in tree_list]
+        assert prune_tree(tree_list, [True] * len(tree_list)) == expected
+
+    def test_removes_emptied_dirs(self, tree_list):
+        keep = [not node["name"].endswith(".txt") for node in tree_list]
+        pruned = prune_tree(tree_list, keep)
+        _assert_valid(pruned)
+        # c held only a .txt file; empty was empty to begin with
+        assert _names(pruned) == ["a", "b", "empty", "top.py", "x.py"]
+
+    def test_keep_emptied_dirs(self, tree_list):
+        keep = [not node["name"].endswith(".txt") for node in tree_list]
+        pruned = prune_tree(tree_list, keep, remove_empty_dirs=False)
+        _assert_valid(pruned)
+        assert "c" in _names(pruned)
+
+    def test_dropped_dir_takes_subtree(self, tree_list):
+        keep = [node["name"] != "a" for node in tree_list]
+        pruned = prune_tree(tree_list, keep)
+        _assert_valid(pruned)
+        assert _names(pruned) == ["c", "empty", "only.txt", "top.py"]
+
+    def test_root_is_kept(self, tree_list):
+        pruned = prune_tree(tree_list, [False] * len(tree_list))
+        assert len(pruned) == 1
+        assert pruned[0]["children"] == []
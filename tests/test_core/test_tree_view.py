@@ -0,0 +1,68 @@
+import os
+
+import pytest
+
+from pyteleport.core import TeleportTree, walker
+
+
+@pytest.fixture
+def temp_dir():
+    temp_dir = os.path.join("./", "dummy", "example_tree")
+
+    yield temp_dir
+
+
+class TestTeleportTreeView:
+    def test_records_match_tree_of_subdir(self, temp_dir):
+        view = TeleportTree(temp_dir).subtree("dir1")
+        expected = TeleportTree(os.path.join(temp_dir, "dir1")).tree_list
+
+        assert view.__len__ == len(expected)
+        assert list(view) == expected
+
+    def test_nested_and_full_paths(self, temp_dir):
+        tree = TeleportTree(temp_dir)
+        nested = tree.subtree("dir1").subtree("subdir1")
+        direct = tree.subtree(os.path.join(temp_dir, "dir1", "subdir1"))
+
+        assert list(nested) == list(direct)
+        assert [r["name"] for r in nested][1:] == ["file4.py"]
+        assert tree.subtree(temp_dir).tree_list[:] == tree.tree_list
+
+    def test_sequence_access(self, temp_dir):
+        view = TeleportTree(temp_dir).subtree("dir2")
+        assert view.tree_list[-1] == view.tree_list[len(view.tree_list) - 1]
+        with pytest.raises(IndexError):
+            view.tree_list[view.__len__]
+
+    def test_records_are_not_copied(self, temp_dir):
+        tree = TeleportTree(temp_dir)
+        record = next(r for r in tree.subtree("dir1") if r["name"] == "file3.txt")
+        node = next(n for n in tree.tree_list if n["name"] == "file3.txt")
+
+        # the record reads the parent's node, so edits show through
+        node["is_binary"] = "text"
+        assert record["is_binary"] == "text"
+
+    def test_view_does_not_touch_the_disk(self, temp_dir, monkeypatch, capsys):
+        tree = TeleportTree(temp_dir)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("the disk was walked")
+
+        monkeypatch.setattr(walker.os, "scandir", fail)
+        tree.subtree("dir1").print  # noqa: B018
+
+        assert "file4.py" in capsys.readouterr().out
+
+    def test_to_single_file_matches_tree_of_subdir(self, temp_dir, tmp_path):
+        view_out = tmp_path / "view.txt"
+        tree_out = tmp_path / "tree.txt"
+        TeleportTree(temp_dir).subtree("dir2").to_single_file(str(view_out))
+        TeleportTree(os.path.join(temp_dir, "dir2")).to_single_file(str(tree_out))
+
+        assert view_out.read_text() == tree_out.read_text()
+
+    def test_missing_node(self, temp_dir):
+        with pytest.raises(ValueError):
+            TeleportTree(temp_dir).subtree("dir1/missing")
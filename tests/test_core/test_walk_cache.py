@@ -0,0 +1,155 @@
+import os
+
+import pytest
+
+from pyteleport.core import TeleportTree, teleport_tree
+from pyteleport.core.walk_cache import WalkCache, cached_walk
+from pyteleport.core.walker import scandir_walk
+from pyteleport.rule import GitignoreTreeRule, GlobRule, HiddenFileRule
+
+OLD_NS = 1_000_000_000_000_000_000  # well outside the racy window
+
+
+def _age(root, mtime_ns=OLD_NS):
+    for dir_path, _, _ in os.walk(root):
+        os.utime(dir_path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def project(tmp_path):
+    root = tmp_path / "project"
+    for rel_path in ["a/x.py", "a/b/y.py", "c/z.py", ".hidden/w.py", "top.txt"]:
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("x")
+    _age(root)
+    return str(root)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return WalkCache(str(tmp_path / "cache"))
+
+
+@pytest.fixture
+def scandir_calls(monkeypatch):
+    calls = []
+    scandir = os.scandir
+
+    def recording_scandir(path):
+        if os.path.basename(path) != "cache":  # eviction scans the cache dir
+            calls.append(os.path.basename(path))
+        return scandir(path)
+
+    monkeypatch.setattr(os, "scandir", recording_scandir)
+    return calls
+
+
+class TestCachedWalk:
+    def test_cold_and_warm_match_scandir_walk(self, project, cache):
+        rule_fn = HiddenFileRule()
+        expected = scandir_walk(project, rule_fn)
+
+        assert cached_walk(project, rule_fn, cache) == expected
+        assert cached_walk(project, rule_fn, cache) == expected
+
+    def test_warm_walk_lists_nothing(self, project, cache, scandir_calls):
+        cached_walk(project, None, cache)
+        scandir_calls.clear()
+        cached_walk(project, None, cache)
+
+        assert scandir_calls == []
+
+    def test_only_changed_directory_is_rescanned(self, project, cache, scandir_calls):
+        cached_walk(project, None, cache)
+        new_file = os.path.join(project, "a", "b", "new.py")
+        with open(new_file, "w") as f:
+            f.write("x")
+        os.utime(os.path.dirname(new_file), ns=(OLD_NS + 1, OLD_NS + 1))
+        scandir_calls.clear()
+
+        tree_list = cached_walk(project, None, cache)
+
+        assert scandir_calls == ["b"]
+        assert tree_list == scandir_walk(project)
+
+    def test_recent_directory_is_not_trusted(self, project, cache, scandir_calls):
+        os.utime(os.path.join(project, "c"))  # modified just now
+        cached_walk(project, None, cache)
+        scandir_calls.clear()
+        cached_walk(project, None, cache)
+
+        assert scandir_calls == ["c"]
+
+    def test_rule_change_invalidates(self, project, cache):
+        cached_walk(project, GlobRule(exclude_patterns=["*.txt"]), cache)
+
+        assert cache.load(project, GlobRule(exclude_patterns=["*.md"])) == {}
+        assert cache.load(project, GlobRule(exclude_patterns=["*.txt"])) != {}
+
+    def test_corrupt_snapshot_is_ignored(self, project, cache):
+        cached_walk(project, None, cache)
+        for entry in os.scandir(cache.cache_dir):
+            with open(entry.path, "w") as f:
+                f.write("{not json")
+
+        assert cached_walk(project, None, cache) == scandir_walk(project)
+
+    def test_size_cap_evicts_oldest(self, project, cache):
+        cached_walk(project, None, cache)
+        size = sum(e.stat().st_size for e in os.scandir(cache.cache_dir))
+        cache.max_bytes = size + size // 2
+
+        cached_walk(project, HiddenFileRule(), cache)
+
+        assert cache.load(project, None) == {}
+        assert cache.load(project, HiddenFileRule()) != {}
+
+    def test_other_files_are_kept(self, project, cache):
+        os.makedirs(os.path.join(cache.cache_dir, "rules"))
+        other = os.path.join(cache.cache_dir, "settings.json")
+        with open(other, "w") as f:
+            f.write("{}")
+        cache.max_bytes = 0
+
+        cached_walk(project, None, cache)
+        cached_walk(project, HiddenFileRule(), cache)
+        cache.clear()
+
+        assert sorted(os.listdir(cache.cache_dir)) == ["rules", "settings.json"]
+
+    def test_gitignores_reuse_the_snapshot(self, project, tmp_path):
+        with open(os.path.join(project, ".gitignore"), "w") as f:
+            f.write("*.txt\n")
+        _age(project)
+        cache_dir = str(tmp_path / "cache")
+        trees = [
+            TeleportTree(project, special_words=["GITIGNORES"], cache_dir=cache_dir)
+            for _ in range(3)
+        ]
+
+        snapshots = [name for name in os.listdir(cache_dir) if name != "rules"]
+        assert len(snapshots) == 1
+        names = [node["name"] for node in trees[-1].tree_list]
+        assert "top.txt" not in names and "x.py" in names
+
+    def test_gitignore_change_relists(self, project, cache, scandir_calls):
+        with open(os.path.join(project, "a", ".gitignore"), "w") as f:
+            f.write("")
+        _age(project)
+        cached_walk(project, GitignoreTreeRule(project), cache)
+        # edited in place: the directory mtime does not change
+        with open(os.path.join(project, "a", ".gitignore"), "w") as f:
+            f.write("*.py\n")
+        scandir_calls.clear()
+
+        result = cached_walk(project, GitignoreTreeRule(project), cache)
+
+        # `a` and, through the inherited file, `a/b` are listed again
+        assert sorted(scandir_calls) == ["a", "b"]
+        assert result == scandir_walk(project, GitignoreTreeRule(project))
+        assert "y.py" not in [node["name"] for node in result]
+
+    def test_workers_and_cache_are_exclusive(self, project, cache):
+        with pytest.raises(ValueError):
+            teleport_tree(project, workers=2, cache=cache)
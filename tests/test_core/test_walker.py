@@ -0,0 +1,287 @@
+import os
+import sys
+
+import pytest
+
+from pyteleport.core.walker import iter_tree, parallel_walk, scandir_walk
+from pyteleport.rule import HiddenFileRule
+
+
+def _listdir_tree(path, rule_fn=None, _prefix="", _visited_list=None):
+    """Reference implementation: the original recursive listdir/isdir walk."""
+    if _visited_list is None:
+        _visited_list = [
+            {
+                "symbol": "",
+                "name": path,
+                "path": path,
+                "parent": -1,
+                "children": [],
+                "is_dir": os.path.isdir(path),
+            }
+        ]
+        if not _visited_list[0]["is_dir"]:
+            return _visited_list
+    entries = os.listdir(path)
+    if rule_fn is not None:
+        entries = [entry for entry in entries if rule_fn.matches(entry)]
+    parent_idx = len(_visited_list) - 1
+    for idx, entry in enumerate(entries):
+        full_path = os.path.join(path, entry)
+        is_last = idx == len(entries) - 1
+        _visited_list.append(
+            {
+                "symbol": f"{_prefix}{'└── ' if is_last else '├── '}",
+                "name": entry,
+                "path": full_path,
+                "parent": parent_idx,
+                "children": [],
+                "is_dir": os.path.isdir(full_path),
+            }
+        )
+        _visited_list[parent_idx]["children"].append(len(_visited_list) - 1)
+        if os.path.isdir(full_path):
+            next_prefix = _prefix + ("    " if is_last else "│   ")
+            _listdir_tree(full_path, rule_fn, next_prefix, _visited_list)
+    return _visited_list
+
+
+@pytest.fixture
+def example_tree():
+    return os.path.join("./", "dummy", "example_tree")
+
+
+class TestScandirWalk:
+    @pytest.mark.parametrize("rule_fn", [None, HiddenFileRule()])
+    def test_same_layout_as_listdir_walk(self, example_tree, rule_fn):
+        assert scandir_walk(example_tree, rule_fn) == _listdir_tree(
+            example_tree, rule_fn
+        )
+
+    def test_file_root(self, example_tree):
+        file_path = os.path.join(example_tree, "file1.txt")
+        result = scandir_walk(file_path)
+        assert len(result) == 1
+        assert result[0]["is_dir"] is False
+
+    def test_deep_tree_does_not_recurse(self, tmp_path):
+        depth = 300
+        deepest = str(tmp_path)
+        for _ in range(depth):
+            deepest = os.path.join(deepest, "d")
+            os.mkdir(deepest)
+
+        limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(200)  # shallower than the tree
+        try:
+            result = scandir_walk(str(tmp_path))
+        finally:
+            sys.setrecursionlimit(limit)
+
+        assert len(result) == depth + 1
+        assert result[-1]["parent"] == depth - 1
+        assert result[-1]["symbol"] == "    " * (depth - 1) + "└── "
+
+
+@pytest.fixture
+def wide_tree(tmp_path):
+    for i in range(5):
+        for j in range(4):
+            sub = tmp_path / f"dir{i}" / f"sub{j}"
+            sub.mkdir(parents=True)
+            for k in range(3):
+                (sub / f"file{k}.py").write_text("x")
+        (tmp_path / f"top{i}.txt").write_text("x")
+    return str(tmp_path)
+
+
+class TestParallelWalk:
+    @pytest.mark.parametrize("workers", [1, 2, 8])
+    def test_same_as_serial(self, wide_tree, workers):
+        assert parallel_walk(wide_tree, workers=workers) == scandir_walk(wide_tree)
+
+    def test_same_as_serial_with_rule(self, example_tree):
+        rule_fn = HiddenFileRule()
+        assert parallel_walk(example_tree, rule_fn, workers=4) == scandir_walk(
+            example_tree, rule_fn
+        )
+
+    def test_file_root(self, example_tree):
+        file_path = os.path.join(example_tree, "file1.txt")
+        assert parallel_walk(file_path, workers=2) == scandir_walk(file_path)
+
+    def test_invalid_workers(self, example_tree):
+        with pytest.raises(ValueError):
+            parallel_walk(example_tree, workers=0)
+
+
+class TestIterTree:
+    def test_same_as_listdir_walk(self, wide_tree):
+        assert list(iter_tree(wide_tree)) == _listdir_tree(wide_tree)
+
+    def test_file_root(self, example_tree):
+        file_path = os.path.join(example_tree, "file1.txt")
+        assert list(iter_tree(file_path)) == _listdir_tree(file_path)
+
+    def test_is_lazy(self, wide_tree, monkeypatch):
+        opened = []
+        scandir = os.scandir
+
+        def counting_scandir(path):
+            opened.append(path)
+            return scandir(path)
+
+        monkeypatch.setattr(os, "scandir", counting_scandir)
+        nodes = iter_tree(wide_tree)
+        next(nodes)  # root
+        next(nodes)  # first entry of the root
+        nodes.close()
+
+        # Only the root has been opened so far (plus the first entry if it
+        # is a directory): nothing is read ahead of the consumer.
+        assert len(opened) <= 2
+
+    def test_rule_override_applies(self, example_tree):
+        class KeepHiddenRule(HiddenFileRule):
+            def is_include(self, query):
+                return True
+
+        names = [node["name"] for node in iter_tree(example_tree, KeepHiddenRule())]
+        assert ".hidden_file.txt" in names
+        assert len(names) == len(list(iter_tree(example_tree)))
+
+    def test_connectors_with_lookahead(self, tmp_path):
+        for name in ["a", "b", "c"]:
+            (tmp_path / name).write_text("x")
+        symbols = [node["symbol"] for node in iter_tree(str(tmp_path))][1:]
+
+        assert symbols == ["├── ", "├── ", "└── "]
+
+
+class TestWalkBudgets:
+    def test_max_depth(self, wide_tree):
+        result = scandir_walk(wide_tree, max_depth=2)
+        full = scandir_walk(wide_tree)
+        assert len(result) == 1 + 5 * 2 + 5 * 4
+        subs = [node for node in result if node["name"].startswith("sub")]
+        assert all(node["truncated"] and not node["children"] for node in subs)
+        assert not any("truncated" in node for node in full)
+
+    def test_max_depth_empty_dir_not_truncated(self, tmp_path):
+        (tmp_path / "empty").mkdir()
+        result = scandir_walk(str(tmp_path), max_depth=1)
+        assert "truncated" not in result[1]
+
+    def test_max_entries(self, wide_tree):
+        result = scandir_walk(wide_tree, max_entries=7)
+        full = scandir_walk(wide_tree)
+        assert len(result) == 8
+        # a prefix of the full walk, with the open directories flagged
+        for node, expected in zip(result, full):
+            assert node["name"] == expected["name"]
+            assert node["symbol"] == expected["symbol"]
+        truncated = [idx for idx, node in enumerate(result) if node.get("truncated")]
+        assert 0 in truncated
+        assert truncated == [idx for idx in truncated if result[idx]["is_dir"]]
+
+    def test_max_entries_stops_listing(self, wide_tree, monkeypatch):
+        opened = []
+        scandir = os.scandir
+
+        def counting_scandir(path):
+            opened.append(path)
+            return scandir(path)
+
+        monkeypatch.setattr(os, "scandir", counting_scandir)
+        scandir_walk(wide_tree, max_entries=3)
+        assert len(opened) <= 4
+
+    def test_max_total_bytes(self, tmp_path):
+        for name in ["a", "b", "c"]:
+            (tmp_path / name).write_text("x" * 10)
+        result = scandir_walk(str(tmp_path), max_total_bytes=25)
+        assert len(result) == 3
+        assert result[0]["truncated"] is True
+
+    def test_no_budget_hit(self, wide_tree):
+        assert scandir_walk(wide_tree, max_depth=10, max_entries=10**6) == (
+            scandir_walk(wide_tree)
+        )
+
+    def test_invalid_budget(self, wide_tree):
+        with pytest.raises(ValueError):
+            scandir_walk(wide_tree, max_depth=0)
+        with pytest.raises(ValueError):
+            scandir_walk(wide_tree, max_entries=-1)
+
+
+@pytest.fixture
+def loop_tree(tmp_path):
+    (tmp_path / "a" / "b").mkdir(parents=True)
+    (tmp_path / "a" / "b" / "f.py").write_text("x")
+    os.symlink("..", tmp_path / "a" / "b" / "up")  # a/b/up -> a
+    os.symlink("a", tmp_path / "alias")  # a second route into a
+    return str(tmp_path)
+
+
+class TestLinks:
+    def test_symlink_loop_is_cut(self, loop_tree):
+        result = scandir_walk(loop_tree)
+        skipped = {
+            node["name"]: node["skipped"] for node in result if "skipped" in node
+        }
+        assert len(result) == 6
+        # whichever route comes first is walked, the other is cut off
+        assert list(skipped.values()) == ["cycle", "cycle"]
+        assert all(not node["children"] for node in result if "skipped" in node)
+
+    def test_parallel_and_cached_agree(self, loop_tree, tmp_path_factory):
+        from pyteleport.core.walk_cache import WalkCache, cached_walk
+
+        cache = WalkCache(str(tmp_path_factory.mktemp("cache")))
+        expected = scandir_walk(loop_tree)
+        assert parallel_walk(loop_tree, workers=4) == expected
+        assert cached_walk(loop_tree, None, cache) == expected
+
+    def test_dedupe_hardlinks(self, tmp_path):
+        (tmp_path / "a.txt").write_text("x")
+        os.link(tmp_path / "a.txt", tmp_path / "b.txt")
+        (tmp_path / "c.txt").write_text("x")
+
+        names = {node["name"] for node in scandir_walk(str(tmp_path))[1:]}
+        assert names == {"a.txt", "b.txt", "c.txt"}
+        result = scandir_walk(str(tmp_path), dedupe_hardlinks=True)
+        names = [node["name"] for node in result[1:]]
+        assert len(names) == 2 and "c.txt" in names
+        assert result[-1]["symbol"] == "└── "
+
+    def test_one_file_system(self, tmp_path):
+        other = "/proc" if os.path.isdir("/proc") else "/dev"
+        if os.stat(other).st_dev == os.stat(tmp_path).st_dev:
+            pytest.skip("no second filesystem to link to")
+        os.symlink(other, tmp_path / "mnt")
+        result = scandir_walk(str(tmp_path), one_file_system=True)
+        assert len(result) == 2
+        assert result[1]["skipped"] == "mount"
+
+
+class TestMetadata:
+    def test_metadata_matches_lstat(self, tmp_path):
+        (tmp_path / "d").mkdir()
+        (tmp_path / "d" / "a.txt").write_text("abc")
+        os.symlink("d/a.txt", tmp_path / "link")
+
+        result = scandir_walk(str(tmp_path), metadata=True)
+        for node in result:
+            stat = os.lstat(node["path"])
+            assert node["size"] == stat.st_size
+            assert node["mtime_ns"] == stat.st_mtime_ns
+            assert (node["inode"], node["dev"]) == (stat.st_ino, stat.st_dev)
+
+        without = scandir_walk(str(tmp_path))
+        assert all("size" not in node for node in without)
+
+    def test_metadata_with_budget(self, wide_tree):
+        result = scandir_walk(wide_tree, max_total_bytes=10**9, metadata=True)
+        assert len(result) == len(scandir_walk(wide_tree))
+        assert all("mtime_ns" in node for node in result)
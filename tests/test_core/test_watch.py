@@ -0,0 +1,176 @@
+import os
+import shutil
+
+import pytest
+
+from pyteleport.core.path_index import PathIndex
+from pyteleport.core.tree import TeleportTree
+from pyteleport.core.tree_edit import (
+    find_node,
+    insert_subtree,
+    iter_rel_paths,
+    remove_subtree,
+)
+from pyteleport.core.walker import iter_tree, scandir_walk
+from pyteleport.core.watch import InotifyBackend, TreeWatcher
+from pyteleport.rule import HiddenFileRule
+
+
+class _Tree:
+    _path_index = None
+
+    def __init__(self, path, rule_fn=None):
+        self._first_path = path
+        self._walk_options = {}
+        self.rule_fn = rule_fn
+        self._tree_list = scandir_walk(path, rule_fn)
+
+
+def _nested(tree_list, idx=0):
+    node = tree_list[idx]
+    children = sorted(_nested(tree_list, c) for c in node["children"])
+    return (node["name"], node["is_dir"], tuple(children))
+
+
+def _assert_consistent(tree_list):
+    """Parent/children links agree and symbols match the structure."""
+    for idx, node in enumerate(tree_list):
+        for pos, child in enumerate(node["children"]):
+            assert tree_list[child]["parent"] == idx
+            is_last = pos == len(node["children"]) - 1
+            prefix = node["symbol"][:-4]
+            if node["symbol"]:
+                prefix += "    " if node["symbol"].endswith("└── ") else "│   "
+            assert tree_list[child]["symbol"] == prefix + (
+                "└── " if is_last else "├── "
+            )
+        if idx:
+            assert idx in tree_list[node["parent"]]["children"]
+            assert os.path.basename(node["path"]) == node["name"]
+
+
+def _assert_matches_walk(tree):
+    _assert_consistent(tree._tree_list)
+    expected = scandir_walk(tree._first_path, tree.rule_fn)
+    assert _nested(tree._tree_list)[2] == _nested(expected)[2]
+
+
+@pytest.fixture
+def root(tmp_path):
+    (tmp_path / "a" / "b").mkdir(parents=True)
+    (tmp_path / "a" / "b" / "x.py").write_text("")
+    (tmp_path / "a" / "y.py").write_text("")
+    (tmp_path / "c").mkdir()
+    (tmp_path / "z.py").write_text("")
+    return tmp_path
+
+
+def _backends():
+    backends = ["poll"]
+    try:
+        InotifyBackend(".").close()
+        backends.append("inotify")
+    except OSError:
+        pass
+    return backends
+
+
+def test_insert_and_remove_subtree(root):
+    tree_list = scandir_walk(str(root))
+    new_dir = root / "c" / "new"
+    (new_dir / "deep").mkdir(parents=True)
+    (new_dir / "deep" / "f.txt").write_text("")
+
+    nodes = list(iter_tree(str(new_dir)))
+    nodes[0]["name"] = "new"
+    insert_subtree(tree_list, find_node(tree_list, "c"), nodes)
+    _assert_consistent(tree_list)
+    assert _nested(tree_list)[2] == _nested(scandir_walk(str(root)))[2]
+
+    removed = remove_subtree(tree_list, find_node(tree_list, "a"))
+    assert removed == 4
+    _assert_consistent(tree_list)
+    assert find_node(tree_list, "a/b/x.py") is None
+    assert find_node(tree_list, "c/new/deep/f.txt") is not None
+    with pytest.raises(ValueError):
+        remove_subtree(tree_list, 0)
+
+
+@pytest.mark.parametrize("backend", _backends())
+def test_watch_create_delete_rename(root, backend):
+    tree = _Tree(str(root))
+    with TreeWatcher(tree, backend=backend, poll_interval=0.01) as watcher:
+        assert watcher.backend == backend
+
+        (root / "c" / "new.py").write_text("")
+        (root / "d" / "e").mkdir(parents=True)
+        (root / "d" / "e" / "f.py").write_text("")
+        changes = watcher.poll(timeout=1.0)
+        assert ("create", "c/new.py") in changes
+        _assert_matches_walk(tree)
+
+        shutil.rmtree(root / "a")
+        os.remove(root / "z.py")
+        changes = watcher.poll(timeout=1.0)
+        assert ("delete", "a") in changes
+        assert ("delete", "z.py") in changes
+        _assert_matches_walk(tree)
+
+        os.rename(root / "d", root / "c" / "moved")
+        watcher.poll(timeout=1.0)
+        _assert_matches_walk(tree)
+
+        # entries inside a directory created while watching are tracked too
+        (root / "c" / "moved" / "e" / "g.py").write_text("")
+        changes = watcher.poll(timeout=1.0)
+        assert ("create", "c/moved/e/g.py") in changes
+        _assert_matches_walk(tree)
+
+
+@pytest.mark.parametrize("backend", _backends())
+def test_watch_applies_rule(root, backend):
+    tree = _Tree(str(root), HiddenFileRule())
+    with TreeWatcher(tree, backend=backend, poll_interval=0.01) as watcher:
+        (root / ".hidden").write_text("")
+        (root / "shown.py").write_text("")
+        changes = watcher.poll(timeout=1.0)
+        assert changes == [("create", "shown.py")]
+        _assert_matches_walk(tree)
+
+
+@pytest.mark.parametrize("backend", _backends())
+def test_watch_updates_path_index(root, backend):
+    tree = _Tree(str(root))
+    tree._path_index = index = PathIndex(tree._tree_list)
+    with TreeWatcher(tree, backend=backend, poll_interval=0.01) as watcher:
+        (root / "c" / "d").mkdir()
+        (root / "c" / "d" / "y.py").write_text("")
+        shutil.rmtree(root / "a" / "b")
+        watcher.poll(timeout=1.0)
+
+    assert tree._path_index is index
+    assert len(index) == len(tree._tree_list)
+    for idx, rel_path in iter_rel_paths(tree._tree_list):
+        assert index.get(rel_path) is tree._tree_list[idx]
+    assert index.get("a/b/x.py") is None
+    assert [node["path"] for node in index.find_name("y.py")] == [
+        str(root / "a" / "y.py"),
+        str(root / "c" / "d" / "y.py"),
+    ]
+
+
+def test_rebuild_keeps_walk_options(root):
+    tree = TeleportTree(str(root), max_depth=1, metadata=True)
+    before = [node["path"] for node in tree._tree_list]
+    with TreeWatcher(tree, backend="poll", poll_interval=0.01) as watcher:
+        watcher._backend.read = lambda timeout: [("overflow", "", "", False)]
+        assert watcher.poll() == [("rebuild", "")]
+
+    assert [node["path"] for node in tree._tree_list] == before
+    assert str(root / "a" / "y.py") not in before
+    assert "mtime_ns" in tree._tree_list[0]
+
+
+def test_watch_invalid_backend(root):
+    with pytest.raises(ValueError):
+        TreeWatcher(_Tree(str(root)), backend="fsevents")
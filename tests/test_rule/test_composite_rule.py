@@ -1,4 +1,12 @@
-from pyteleport.rule import CompositeRule, GlobRule, HiddenFileRule
+import pytest
+
+from pyteleport.rule import (
+    CompositeRule,
+    DirRule,
+    GlobRule,
+    HiddenFileRule,
+    RuleQuery,
+)
 
 
 class TestCompositeRuleMatches:
@@ -90,12 +98,12 @@ class TestCompositeRuleMatches:
         # Create first composite rule - matches either .py OR .js files
         # This is an OR condition because we're checking if ANY rule matches
         code_files_rule = CompositeRule(rules=[])
-        code_files_rule.matches = lambda query: py_rule.matches(
-            query
-        ) or js_rule.matches(query)
-        code_files_rule.is_exclude = lambda query: py_rule.is_exclude(
-            query
-        ) and js_rule.is_exclude(query)
+        code_files_rule.matches = lambda query: (
+            py_rule.matches(query) or js_rule.matches(query)
+        )
+        code_files_rule.is_exclude = lambda query: (
+            py_rule.is_exclude(query) and js_rule.is_exclude(query)
+        )
 
         # Create nested composite rule
         nested_rule = CompositeRule(rules=[code_files_rule, hidden_rule])
@@ -126,3 +134,122 @@ class TestCompositeRuleMatches:
         assert len(composite_rule.rules) == 2
         assert composite_rule.rules[0] == glob_rule
         assert composite_rule.rules[1] == hidden_rule
+
+    def test_decision_cache(self):
+        """Test the LRU cache of decisions and its counters."""
+        composite_rule = CompositeRule(
+            rules=[GlobRule(include_patterns=["*.py"]), HiddenFileRule()],
+            cache_size=2,
+        )
+        assert composite_rule.name_only is True
+
+        assert composite_rule.matches(RuleQuery("a.py", "x/a.py", False)) is True
+        assert composite_rule.matches(RuleQuery("a.py", "y/a.py", False)) is True
+        assert composite_rule.matches(".a.py") is False
+        assert composite_rule.cache_info() == {
+            "hits": 1,
+            "misses": 2,
+            "size": 2,
+            "max_size": 2,
+        }
+
+        # least recently used entry is evicted
+        composite_rule.matches("b.txt")
+        assert composite_rule.cache_info()["size"] == 2
+        composite_rule.matches(RuleQuery("a.py", "a.py", False))
+        assert composite_rule.cache_info()["misses"] == 4
+
+    def test_decision_cache_keyed_on_path(self):
+        """Test that path-dependent rules are cached by relative path."""
+        composite_rule = CompositeRule(
+            rules=[GlobRule(include_patterns=["src/*.py"])], cache_size=16
+        )
+        assert composite_rule.name_only is False
+
+        assert composite_rule.matches(RuleQuery("a.py", "src/a.py", False)) is True
+        assert composite_rule.matches(RuleQuery("a.py", "lib/a.py", False)) is False
+        assert composite_rule.cache_info()["misses"] == 2
+
+    def test_decision_cache_entry_type(self):
+        """Test that files and directories of the same name are cached apart."""
+        composite_rule = CompositeRule(rules=[DirRule()], cache_size=16)
+
+        assert composite_rule.matches(RuleQuery("build", "build", True)) is True
+        assert composite_rule.matches(RuleQuery("build", "build", False)) is False
+
+    def test_append_clears_cache(self):
+        """Test that appending a rule drops the cached decisions."""
+        composite_rule = CompositeRule(
+            rules=[GlobRule(include_patterns=["*.py"])], cache_size=16
+        )
+        assert composite_rule.matches(".a.py") is True
+
+        composite_rule.append(HiddenFileRule())
+        assert composite_rule.cache_info()["size"] == 0
+        assert composite_rule.matches(".a.py") is False
+
+    def test_invalid_cache_size(self):
+        with pytest.raises(ValueError):
+            CompositeRule(rules=[], cache_size=0)
+
+
+def _queries():
+    return [
+        RuleQuery(name, f"{rel_dir}/{name}" if rel_dir else name, name == "build")
+        for rel_dir in ["", "src", "src/pkg"]
+        for name in ["a.py", ".hidden.py", "b.txt", "build", "test_a.py"]
+    ]
+
+
+class TestCompositeRuleFilterMany:
+    @pytest.mark.parametrize("cache_size", [None, 4])
+    def test_same_as_matches(self, cache_size):
+        composite_rule = CompositeRule(
+            rules=[
+                CompositeRule([HiddenFileRule()]),
+                GlobRule(["*.py", "build"], ["test_*"]),
+            ],
+            cache_size=cache_size,
+        )
+        queries = _queries()
+        expected = [composite_rule.matches(query) for query in queries]
+        assert composite_rule.filter_many(queries) == expected
+        # served from the cache the second time
+        assert composite_rule.filter_many(queries) == expected
+
+    def test_only_survivors_reach_later_rules(self):
+        seen = []
+
+        class RecordingRule(HiddenFileRule):
+            def _filter_many(self, queries):
+                seen.extend(queries)
+                return super()._filter_many(queries)
+
+        composite_rule = CompositeRule(rules=[GlobRule(["*.py"]), RecordingRule()])
+        composite_rule.filter_many(_queries())
+        assert sorted(set(seen)) == [".hidden.py", "a.py", "test_a.py"]
+
+    def test_filter_many_honours_overrides(self):
+        class NoPyRule(CompositeRule):
+            def matches(self, query):
+                return not query.endswith(".py") and super().matches(query)
+
+        class KeepHiddenRule(HiddenFileRule):
+            def is_include(self, query):
+                return True
+
+        queries = _queries()
+        for composite_rule in (
+            NoPyRule(rules=[HiddenFileRule()]),
+            CompositeRule(rules=[KeepHiddenRule(), GlobRule(["*.py"])]),
+        ):
+            expected = [composite_rule.matches(query) for query in queries]
+            assert composite_rule.filter_many(queries) == expected
+
+    def test_process_pool(self):
+        composite_rule = CompositeRule(
+            rules=[HiddenFileRule(), GlobRule(["*.py"])], cache_size=16
+        )
+        queries = _queries() * 3
+        expected = [composite_rule.matches(query) for query in queries]
+        assert composite_rule.filter_many(queries, workers=2, chunk_size=7) == expected
@@ -1,6 +1,6 @@
 import pytest
 
-from pyteleport.rule import DirRule
+from pyteleport.rule import DirRule, RuleQuery
 
 
 @pytest.fixture
@@ -44,3 +44,12 @@ class TestDirRule:
     def test_is_exclude(self, temp_structure, path_key, expected):
         rule = DirRule()
         assert rule.is_exclude(temp_structure[path_key]) == expected
+
+    def test_filter_many(self, temp_structure):
+        rule = DirRule()
+        queries = [
+            temp_structure["test_dir"],
+            temp_structure["test_file"],
+            RuleQuery("build", "build", True),
+        ]
+        assert rule.filter_many(queries) == [True, False, True]
@@ -1,6 +1,9 @@
+import subprocess
+
 import pytest
 
-from pyteleport.rule import GitignoreRule
+from pyteleport.rule import GitignoreRule, RuleQuery
+from pyteleport.rule.module.gitignore_rule import _GitignorePatterns
 
 
 @pytest.fixture
@@ -21,6 +24,35 @@ def empty_rule():
     return GitignoreRule([])
 
 
+def _kept_and_git_listed(tmp_path, patterns, paths):
+    """
+    Return the files of `paths` kept by a `GitignoreRule` of `patterns`, and
+    those `git ls-files --others --exclude-standard` lists with the same
+    `.gitignore`.
+    """
+    for rel_path in paths:
+        path = tmp_path / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("")
+    (tmp_path / ".gitignore").write_text("\n".join(patterns) + "\n")
+    subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+    listed = subprocess.run(
+        ["git", "ls-files", "--others", "--exclude-standard"],
+        cwd=tmp_path,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.split()
+
+    rule = GitignoreRule(patterns)
+    kept = [
+        rel_path
+        for rel_path in [".gitignore", *paths]
+        if rule.matches(RuleQuery(rel_path.rpartition("/")[2], rel_path, False))
+    ]
+    return sorted(kept), sorted(listed)
+
+
 class TestGitignoreRule:
     def test_check_instance(self, gitignore_rule):
         """Test that the GitignoreRule can be instantiated"""
@@ -40,7 +72,7 @@ class TestGitignoreRule:
             ("logs", False),  # **/logs
             ("app/logs", False),  # **/logs
             (".venv", True),  # .venv/* doesn't match .venv itself
-            ("node_modules", False),  # node_modules/**
+            ("node_modules", True),  # node_modules/** doesn't match node_modules itself
             # Files in excluded directories
             ("build/a.log", False),  # build/
             ("build/subdir/file.js", False),  # build/
@@ -118,7 +150,6 @@ class TestGitignoreRule:
         "dir_path, file_path",
         [
             ("build", "build/output.txt"),  # build/ pattern
-            ("node_modules", "node_modules/package.json"),  # node_modules/** pattern
             (
                 "src/components/.cache",
                 "src/components/.cache/data.json",
@@ -170,3 +201,155 @@ class TestGitignoreRule:
     def test_path_normalization(self, gitignore_rule, path1, path2):
         """Test that paths are properly normalized before matching"""
         assert gitignore_rule.matches(path1) == gitignore_rule.matches(path2)
+
+
+class TestGitignorePatterns:
+    @pytest.mark.parametrize(
+        "path, is_dir, expected",
+        [
+            ("build", True, True),  # build/
+            ("build", False, None),  # build/ only matches directories
+            ("a/x.txt", False, True),  # *.txt, by suffix
+            ("import.log", False, False),  # !import.log, last match wins
+            ("docs/a.md", False, True),  # /docs/*.md, by regex
+            ("sub/docs/a.md", False, None),
+            ("main.py", False, None),
+        ],
+    )
+    def test_check(self, gitignore_rule, path, is_dir, expected):
+        assert gitignore_rule._compiled.check(path, is_dir) is expected
+
+    @pytest.mark.parametrize(
+        "pattern, anchored, floating",
+        [
+            # the bucketing relies on how `pathspec` translates patterns;
+            # these are the same with every supported version
+            ("*/", "", r"[^/]+/\Z"),
+            ("**/", "", r"[^/]+/\Z"),
+            ("/**/", "", r"[^/]+/\Z"),
+            ("/a/", r"^a/\Z", ""),
+            ("a/*/", r"^a/[^/]+/\Z", ""),
+            ("a*b/", "", r"a[^/]*b/\Z"),
+            ("/*/", r"^[^/]+/\Z", ""),
+            ("a/*", r"^a/[^/]+/?\Z", ""),
+            ("a/b", r"^a/b/?\Z", ""),
+            ("a?c", "", r"a[^/]c/?\Z"),
+            ("**/a", "", r"a/?\Z"),
+            ("a/**/b", r"^a(?:/.+)?/b/?\Z", ""),
+            ("a/**", r"^a/.+\Z", ""),
+            ("**/a/**", "", r"a/.+\Z"),
+        ],
+    )
+    def test_translation_shapes(self, pattern, anchored, floating):
+        regexes = _GitignorePatterns([pattern])._regexes
+        assert regexes == (
+            (0 if anchored else -1, f"(?P<p0>{anchored})" if anchored else ""),
+            (0 if floating else -1, f"(?P<p0>{floating})" if floating else ""),
+        )
+
+    def test_ignored_directory_short_circuit(self):
+        rule = GitignoreRule(["build/", "!build/keep.txt"])
+        # like git, a file below an ignored directory cannot be re-included
+        assert rule.matches(RuleQuery("keep.txt", "build/keep.txt", False)) is False
+        assert rule._ignored_dirs == {"build": True}
+        assert rule.matches(RuleQuery("a.txt", "src/a.txt", False)) is True
+        assert rule._ignored_dirs == {"build": True, "src": False}
+
+    def test_same_as_git(self, tmp_path, gitignore_path):
+        paths = [
+            "a.txt",
+            "docs/a.md",
+            "sub/docs/a.md",
+            "build/out.o",
+            "app/logs/debug",
+            ".venv/lib/x.py",
+            ".venv_file",
+            "node_modules/p/index.js",
+            "a/x/b/c.py",
+            "error.log",
+            "import.log",
+            "logs.py",
+            "temp1/x.py",
+            "temp1.py",
+            "file1.js",
+            "root-only.mdc",
+            "sub/root-only.mdc",
+            "src/c/test/u/button.spec.js",
+            ".env.local",
+            ".env.example",
+            "dist/bundle.js",
+            "dist/.gitkeep",
+            "src/.cache/data.json",
+            "main.py",
+        ]
+        with open(gitignore_path) as f:
+            patterns = f.read().splitlines()
+        kept, listed = _kept_and_git_listed(tmp_path, patterns, paths)
+        assert kept == listed
+
+    @pytest.mark.parametrize(
+        "patterns",
+        [
+            ["*/"],
+            ["*/", "!keep/"],
+            ["**/", "!keep/"],
+            ["/**/"],
+            ["/*/", "!src/"],
+            ["a*b/", "*.log", "!keep.log"],
+            ["src/*/", "!src/keep/"],
+        ],
+    )
+    def test_same_as_git_dir_patterns(self, tmp_path, patterns):
+        paths = [
+            "top.txt",
+            "x.log",
+            "keep.log",
+            "keep/a.txt",
+            "keep/sub/b.txt",
+            "src/main.py",
+            "src/keep/c.txt",
+            "src/keep/deep/d.txt",
+            "src/other/e.txt",
+            "axb/f.txt",
+            "deep/axb/g.txt",
+        ]
+        kept, listed = _kept_and_git_listed(tmp_path, patterns, paths)
+        assert kept == listed
+
+    @pytest.mark.parametrize(
+        "patterns",
+        [
+            ["foo/**", "!*.py"],
+            ["docs/**", "!docs/foo/", "!docs/foo/**"],
+            ["**/foo/**", "!x.py"],
+            ["/foo/**"],
+        ],
+    )
+    def test_same_as_git_contents_patterns(self, tmp_path, patterns):
+        paths = [
+            "foo/x.py",
+            "foo/y.txt",
+            "foo/a/x.py",
+            "deep/foo/x.py",
+            "deep/foo/y.txt",
+            "docs/index.md",
+            "docs/foo/x.py",
+            "docs/foo/sub/y.txt",
+            "docs/bar/z.py",
+        ]
+        kept, listed = _kept_and_git_listed(tmp_path, patterns, paths)
+        assert kept == listed
+
+    def test_filter_many(self, gitignore_rule):
+        queries = [
+            RuleQuery("a.txt", "a.txt", False),
+            RuleQuery("build", "build", True),
+            RuleQuery("out.o", "build/out.o", False),
+            RuleQuery("import.log", "import.log", False),
+            RuleQuery("main.py", "src/main.py", False),
+            "logs/error.log",
+            "./dist/.gitkeep",
+        ]
+        expected = [gitignore_rule.matches(query) for query in queries]
+        assert expected == [False, False, False, True, True, False, True]
+        assert GitignoreRule(gitignore_rule.patterns).filter_many(queries) == expected
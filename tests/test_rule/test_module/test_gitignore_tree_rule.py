@@ -0,0 +1,123 @@
+import subprocess
+
+import pytest
+
+from pyteleport.core.walker import iter_tree
+from pyteleport.rule import GitignoreTreeRule, RuleQuery
+
+
+def _write(root, rel_path, text=""):
+    path = root / rel_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+@pytest.fixture
+def monorepo(tmp_path):
+    _write(tmp_path, ".gitignore", "*.log\nbuild/\n")
+    _write(tmp_path, "web/.gitignore", "out/\n!keep.log\n/local.txt\n")
+    _write(tmp_path, "web/app/.gitignore", "*.tmp\n")
+    _write(tmp_path, "api/.gitignore", "out/\n")
+    for rel_path in [
+        "a.log",
+        "build/x.o",
+        "web/keep.log",
+        "web/other.log",
+        "web/local.txt",
+        "web/app/local.txt",
+        "web/out/bundle.js",
+        "web/app/cache.tmp",
+        "web/app/main.js",
+        "api/out/x.bin",
+        "api/cache.tmp",
+    ]:
+        _write(tmp_path, rel_path)
+    return tmp_path
+
+
+def _walk(root, rule):
+    rel_paths = {0: ""}
+    files = []
+    for idx, node in enumerate(iter_tree(str(root), rule)):
+        if idx == 0:
+            continue
+        parent = rel_paths[node["parent"]]
+        rel_paths[idx] = f"{parent}/{node['name']}" if parent else node["name"]
+        if not node["is_dir"]:
+            files.append(rel_paths[idx])
+    return sorted(files)
+
+
+EXPECTED = [
+    ".gitignore",
+    "api/.gitignore",
+    "api/cache.tmp",
+    "web/.gitignore",
+    "web/app/.gitignore",
+    "web/app/local.txt",
+    "web/app/main.js",
+    "web/keep.log",
+]
+
+
+class TestGitignoreTreeRule:
+    def test_walk(self, monorepo):
+        assert _walk(monorepo, GitignoreTreeRule(str(monorepo))) == EXPECTED
+
+    def test_same_as_git(self, monorepo):
+        subprocess.run(["git", "init", "-q", str(monorepo)], check=True)
+        listed = subprocess.run(
+            ["git", "ls-files", "--others", "--exclude-standard"],
+            cwd=monorepo,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.split()
+        assert sorted(listed) == EXPECTED
+
+    @pytest.mark.parametrize(
+        "rel_path, is_dir, expected",
+        [
+            ("a.log", False, False),
+            ("web/keep.log", False, True),  # re-included by web/.gitignore
+            ("web/app/keep.log", False, True),
+            ("api/keep.log", False, False),
+            ("web/local.txt", False, False),  # anchored to web/
+            ("web/app/local.txt", False, True),
+            ("web/out", True, False),
+            ("web/out", False, True),  # `out/` only matches directories
+            ("web/app/x.tmp", False, False),
+            ("api/x.tmp", False, True),
+        ],
+    )
+    def test_precedence(self, monorepo, rel_path, is_dir, expected):
+        rule = GitignoreTreeRule(str(monorepo))
+        query = RuleQuery(rel_path.rpartition("/")[2], rel_path, is_dir)
+        assert rule.matches(query) is expected
+        assert rule.is_exclude(query) is not expected
+
+    def test_plain_string_query(self, monorepo):
+        rule = GitignoreTreeRule(str(monorepo))
+        assert rule.matches("build") is False
+        assert rule.matches("web/app/main.js") is True
+
+    def test_base_patterns(self, monorepo):
+        rule = GitignoreTreeRule(str(monorepo), base_patterns=["*.js"])
+        assert rule.matches(RuleQuery("main.js", "web/app/main.js", False)) is False
+
+    def test_specs_cached(self, monorepo):
+        _write(monorepo, "web/app/.gitignore", "out/\n")
+        rule = GitignoreTreeRule(str(monorepo))
+        rule.matches(RuleQuery("a", "web/app/a", False))
+        rule.matches(RuleQuery("b", "web/app/b", False))
+        rule.matches(RuleQuery("c", "api/c", False))
+        assert set(rule._chains) == {"", "web", "web/app", "api"}
+        # web/app and api have the same patterns
+        assert len(rule._compiled) == 3
+        assert rule._chains["web/app"][0][1] is rule._chains["api"][0][1]
+
+    def test_ignored_directory_not_read(self, monorepo):
+        _write(monorepo, "build/.gitignore", "!*\n")
+        rule = GitignoreTreeRule(str(monorepo))
+        _walk(monorepo, rule)
+        assert "build" not in rule._chains
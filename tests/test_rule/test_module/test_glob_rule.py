@@ -1,6 +1,8 @@
+from pathlib import PurePath
+
 import pytest
 
-from pyteleport.rule import GlobRule
+from pyteleport.rule import GlobRule, RuleQuery
 
 
 class TestGlobRule:
@@ -158,3 +160,76 @@ class TestGlobRule:
         assert glob_rule.is_include(query) == expected_include
         assert glob_rule.is_exclude(query) == expected_exclude
         assert glob_rule.matches(query) == expected_matches
+
+    @pytest.mark.parametrize(
+        "pattern",
+        [
+            "*",
+            "*.py",
+            "*.tar.gz",
+            "test_*",
+            "[!a]*.py",
+            "a?/*.py",
+            "**/*.py",
+            "src/**",
+            "*/b/*",
+            "a/../b",
+            "./x.py",
+            "/abs/*.py",
+            "/*",
+        ],
+    )
+    def test_same_as_path_match(self, pattern):
+        queries = [
+            "x.py",
+            "a/x.py",
+            "ab/x.py",
+            "src/a/b/x.py",
+            "src/b",
+            "a/../b",
+            "c.tar.gz",
+            "test_a.py",
+            "/abs/x.py",
+            "/x.py",
+            ".",
+            "",
+        ]
+        glob_rule = GlobRule(include_patterns=[pattern])
+        for query in queries:
+            expected = PurePath(query).match(pattern)
+            assert glob_rule.is_include(query) == expected, query
+
+    def test_rule_query_uses_relative_path(self):
+        glob_rule = GlobRule(include_patterns=["src/*.py"])
+        assert glob_rule.matches(RuleQuery("a.py", "src/a.py", False))
+        assert not glob_rule.matches(RuleQuery("a.py", "lib/a.py", False))
+
+    def test_empty_pattern(self):
+        with pytest.raises(ValueError):
+            GlobRule(include_patterns=[""])
+
+    @pytest.mark.parametrize(
+        "include, exclude",
+        [(["*.py"], ["test_*"]), (["src/*.py", "*.md"], ["docs/**"])],
+    )
+    def test_filter_many(self, include, exclude):
+        glob_rule = GlobRule(include_patterns=include, exclude_patterns=exclude)
+        queries = [
+            RuleQuery("a.py", "src/a.py", False),
+            RuleQuery("a.py", "lib/a.py", False),
+            RuleQuery("test_a.py", "src/test_a.py", False),
+            RuleQuery("README.md", "docs/README.md", False),
+            "src/b.py",
+            "README.md",
+        ]
+        expected = [glob_rule.matches(query) for query in queries]
+        assert glob_rule.filter_many(queries) == expected
+
+    def test_filter_many_honours_overrides(self):
+        class KeepReadme(GlobRule):
+            def _judge_include_or_exclude(self, query):
+                return query == "README.md" or super()._judge_include_or_exclude(query)
+
+        glob_rule = KeepReadme(include_patterns=["*.py"])
+        queries = ["a.py", "README.md", "b.txt"]
+        assert glob_rule.filter_many(queries) == [True, True, False]
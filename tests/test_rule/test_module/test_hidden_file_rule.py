@@ -24,3 +24,23 @@ class TestHiddenFileRule:
     def test_is_exclude(self, file_name, expected):
         rule = HiddenFileRule()
         assert rule.is_exclude(file_name) == expected
+
+    def test_filter_many(self):
+        rule = HiddenFileRule()
+        assert rule.filter_many(["test.py", ".hidden.py", "src"]) == [
+            True,
+            False,
+            True,
+        ]
+
+    def test_filter_many_honours_overrides(self):
+        class KeepHiddenRule(HiddenFileRule):
+            def is_include(self, query):
+                return True
+
+        names = ["test.py", ".hidden.py"]
+        assert KeepHiddenRule().filter_many(names) == [True, True]
+
+        rule = HiddenFileRule()
+        rule.is_include = lambda query: True
+        assert rule.filter_many(names) == [True, True]
@@ -0,0 +1,97 @@
+import os
+
+import pytest
+
+from pyteleport.core.walker import iter_tree
+from pyteleport.rule import DirRule, GitignoreRule, GlobRule, HiddenFileRule, RuleQuery
+
+
+@pytest.fixture
+def project(tmp_path):
+    for rel_path in [
+        "build/out.o",
+        "src/build/gen.py",
+        "src/main.py",
+        "src/api/fixtures/a.json",
+        "src/api/handler.py",
+        "node_modules/pkg/index.js",
+        "fixtures/top.json",
+    ]:
+        path = tmp_path / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("x")
+    return str(tmp_path)
+
+
+def _rel_paths(root, rule_fn):
+    return {
+        os.path.relpath(node["path"], root).replace(os.sep, "/")
+        for node in iter_tree(root, rule_fn)
+    }
+
+
+class TestRuleQuery:
+    def test_is_the_entry_name(self):
+        query = RuleQuery("fixtures", rel_path="src/api/fixtures", is_dir=True)
+
+        assert query == "fixtures"
+        assert query.startswith("fix")
+        assert query.rel_path == "src/api/fixtures"
+        assert query.is_dir is True
+
+    def test_from_entry(self, project):
+        entry = next(e for e in os.scandir(project) if e.name == "src")
+        query = RuleQuery.from_entry(entry, "parent")
+
+        assert query == "src"
+        assert query.rel_path == "parent/src"
+        assert query.is_dir is True
+        assert query.entry is entry
+
+    def test_name_only_rules_are_unchanged(self):
+        query = RuleQuery(".env", rel_path="a/.env", is_dir=False)
+        assert HiddenFileRule().matches(query) is False
+
+    def test_dir_rule_uses_entry_type(self, monkeypatch):
+        monkeypatch.setattr(os.path, "isdir", lambda path: pytest.fail("stat"))
+        rule = DirRule()
+
+        assert rule.matches(RuleQuery("a.py", is_dir=True)) is True
+        assert rule.matches(RuleQuery("build", is_dir=False)) is False
+
+
+class TestWalkerPruning:
+    def test_directory_pattern_with_real_type(self, project):
+        rel_paths = _rel_paths(project, GitignoreRule(["build/"]))
+
+        assert "build" not in rel_paths
+        assert "src/build" not in rel_paths
+        assert "src/main.py" in rel_paths
+
+    def test_anchored_pattern_uses_relative_path(self, project):
+        rel_paths = _rel_paths(project, GitignoreRule(["src/**/fixtures"]))
+
+        assert "src/api/fixtures" not in rel_paths
+        assert "src/api/handler.py" in rel_paths
+        assert "fixtures/top.json" in rel_paths
+
+    def test_glob_rule_sees_relative_path(self, project):
+        rule = GlobRule(exclude_patterns=["src/*.py"])
+        rel_paths = _rel_paths(project, rule)
+
+        assert "src/main.py" not in rel_paths
+        assert "src/api/handler.py" in rel_paths
+
+    def test_excluded_directory_is_never_opened(self, project, monkeypatch):
+        opened = []
+        scandir = os.scandir
+
+        def recording_scandir(path):
+            opened.append(os.path.basename(path))
+            return scandir(path)
+
+        monkeypatch.setattr(os, "scandir", recording_scandir)
+        list(iter_tree(project, GitignoreRule(["node_modules/"])))
+
+        assert "node_modules" not in opened
+        assert "pkg" not in opened
@@ -0,0 +1,114 @@
+import os
+
+from pyteleport.rule import GitignoreRule, RuleCache, RuleFactory, RuleQuery
+
+PATTERNS = "# build\n*.pyc\nbuild/\n/dist\n!keep.pyc\ndocs/**/*.tmp\n"
+QUERIES = [
+    RuleQuery("a.pyc", "src/a.pyc", is_dir=False),
+    RuleQuery("keep.pyc", "keep.pyc", is_dir=False),
+    RuleQuery("build", "src/build", is_dir=True),
+    RuleQuery("dist", "dist", is_dir=True),
+    RuleQuery("dist", "src/dist", is_dir=True),
+    RuleQuery("x.tmp", "docs/a/b/x.tmp", is_dir=False),
+    RuleQuery("main.py", "src/main.py", is_dir=False),
+]
+
+
+def _write(path, content):
+    with open(path, "w") as f:
+        f.write(content)
+    return str(path)
+
+
+def _cache_files(cache_dir):
+    return sorted(os.listdir(cache_dir)) if os.path.isdir(cache_dir) else []
+
+
+def test_miss_then_hit(tmp_path):
+    gitignore = _write(tmp_path / ".gitignore", PATTERNS)
+    cache_dir = str(tmp_path / "cache")
+    cache = RuleCache(cache_dir)
+    expected = [GitignoreRule.load(gitignore).matches(q) for q in QUERIES]
+
+    first = cache.load_gitignore(gitignore)
+    files = _cache_files(cache_dir)
+    assert len(files) == 1
+    second = cache.load_gitignore(gitignore)
+    assert _cache_files(cache_dir) == files
+
+    assert second.patterns == first.patterns
+    assert [first.matches(q) for q in QUERIES] == expected
+    assert [second.matches(q) for q in QUERIES] == expected
+
+
+def test_changed_content_new_key(tmp_path):
+    gitignore = _write(tmp_path / ".gitignore", PATTERNS)
+    cache_dir = str(tmp_path / "cache")
+    cache = RuleCache(cache_dir)
+    assert not cache.load_gitignore(gitignore).matches(QUERIES[0])
+
+    _write(gitignore, "build/\n")
+    rule = cache.load_gitignore(gitignore)
+    assert rule.matches(QUERIES[0])
+    assert len(_cache_files(cache_dir)) == 2
+
+
+def test_corrupt_cache_recompiles(tmp_path):
+    gitignore = _write(tmp_path / ".gitignore", PATTERNS)
+    cache_dir = str(tmp_path / "cache")
+    cache = RuleCache(cache_dir)
+    cache.load_gitignore(gitignore)
+    (cache_file,) = _cache_files(cache_dir)
+    _write(os.path.join(cache_dir, cache_file), '{"patterns": [')
+
+    rule = cache.load_gitignore(gitignore)
+    assert not rule.matches(QUERIES[0])
+    # rewritten with a valid entry
+    assert cache.load_gitignore(gitignore).patterns == rule.patterns
+
+
+def test_clear(tmp_path):
+    gitignore = _write(tmp_path / ".gitignore", PATTERNS)
+    cache = RuleCache(str(tmp_path / "cache"))
+    cache.clear()  # no directory yet
+    cache.load_gitignore(gitignore)
+    cache.clear()
+    assert _cache_files(cache.cache_dir) == []
+
+
+def test_factory_uses_cache(tmp_path):
+    gitignore = _write(tmp_path / ".gitignore", PATTERNS)
+    cache_dir = str(tmp_path / "cache")
+    rule = RuleFactory.simplify_create_rule(
+        special_words="GITIGNORE", gitignore_path=gitignore, rule_cache_dir=cache_dir
+    )
+    assert len(_cache_files(cache_dir)) == 1
+    assert not rule.matches(QUERIES[0])
+
+
+def test_load_is_silent(tmp_path, capsys):
+    gitignore = _write(tmp_path / ".gitignore", PATTERNS)
+    GitignoreRule.load(gitignore)
+    RuleCache(str(tmp_path / "cache")).load_gitignore(gitignore)
+    assert capsys.readouterr().out == ""
+
+
+def test_unwritable_cache_dir(tmp_path, monkeypatch):
+    gitignore = _write(tmp_path / ".gitignore", PATTERNS)
+    cache_dir = tmp_path / "cache"
+    cache = RuleCache(str(cache_dir))
+
+    def fail(*args, **kwargs):
+        raise OSError(28, "No space left on device")
+
+    # the temporary file is written, then moving it in place fails
+    monkeypatch.setattr(os, "replace", fail)
+    rule = cache.load_gitignore(gitignore)
+    assert not rule.matches(QUERIES[0])
+    assert _cache_files(str(cache_dir)) == []
+
+    # the directory cannot be created
+    monkeypatch.undo()
+    not_a_dir = _write(tmp_path / "file", "")
+    rule = RuleCache(not_a_dir).load_gitignore(gitignore)
+    assert not rule.matches(QUERIES[0])
@@ -7,8 +7,10 @@ from pyteleport.rule import (
     CompositeRule,
     DirRule,
     GitignoreRule,
+    GitignoreTreeRule,
     GlobRule,
     HiddenFileRule,
+    RuleQuery,
 )
 from pyteleport.rule.rule_factory import RuleFactory
 
@@ -279,3 +281,26 @@ def test_simplify_create_rule_with_gitignore(monkeypatch):
     assert glob_rule is not None, "Glob rule not found"
     assert glob_rule.include_patterns == include_patterns
     assert glob_rule.exclude_patterns == exclude_patterns
+
+
+def test_simplify_create_rule_optimize():
+    """Test that an optimized rule has no nested composites."""
+    rule = RuleFactory.simplify_create_rule(
+        include_patterns=["*.py"], special_words=["HIDDEN", "DIR"], optimize=True
+    )
+
+    assert [type(r) for r in rule.rules] == [HiddenFileRule, DirRule, GlobRule]
+    assert rule.matches(RuleQuery("src", "src", True)) is False
+
+
+def test_simplify_create_rule_gitignores(tmp_path):
+    """Test that GITIGNORES reads the .gitignore files below `root`."""
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / ".gitignore").write_text("*.log\n")
+    rule = RuleFactory.simplify_create_rule(
+        special_words="GITIGNORES", root=str(tmp_path)
+    )
+
+    assert isinstance(rule.rules[0].rules[0], GitignoreTreeRule)
+    assert rule.matches(RuleQuery("a.log", "sub/a.log", False)) is False
+    assert rule.matches(RuleQuery("a.log", "a.log", False)) is True
@@ -0,0 +1,164 @@
+import pytest
+
+from pyteleport.core.walker import iter_tree
+from pyteleport.rule import (
+    BaseRule,
+    CompositeRule,
+    GitignoreRule,
+    GlobRule,
+    HiddenFileRule,
+    RuleQuery,
+)
+from pyteleport.rule.rule_plan import RulePlan
+
+
+class CountingRule(BaseRule):
+    """Reject names starting with `prefix`, counting the calls."""
+
+    def __init__(self, prefix: str, cost: int = 1):
+        self.prefix = prefix
+        self.cost = cost
+        self.calls = 0
+
+    def matches(self, query: str) -> bool:
+        self.calls += 1
+        return not query.startswith(self.prefix)
+
+    def fingerprint(self) -> str:
+        return f"CountingRule[{self.prefix!r}]"
+
+    def is_include(self, query: str) -> bool:
+        return self.matches(query)
+
+    def is_exclude(self, query: str) -> bool:
+        return not self.matches(query)
+
+
+def test_static_order():
+    """Rules are ordered by their static cost before any sample."""
+    gitignore = GitignoreRule(["*.log"])
+    glob = GlobRule(["*.py"])
+    hidden = HiddenFileRule()
+    plan = RulePlan([gitignore, glob, hidden], sample_every=10**6)
+    assert plan.order == [2, 1, 0]
+
+
+def test_reorder_by_rejections():
+    """A rule that rejects most queries moves first."""
+    rarely = CountingRule("never")
+    often = CountingRule("tmp")
+    plan = RulePlan([rarely, often], sample_every=1, reorder_every=4)
+    for i in range(8):
+        assert plan.matches(f"tmp{i}") is False
+    assert plan.order == [1, 0]
+    assert plan.rejection_rate(1) == 1.0
+    assert plan.rejection_rate(0) == 0.0
+
+    rarely.calls = 0
+    plan.sample_every = 10**6
+    plan.calls = 1
+    plan.matches("tmp")
+    # rejected by the first rule of the plan, the other is not evaluated
+    assert rarely.calls == 0
+
+
+def test_filter_many_reorders():
+    """Sampled batches feed the same statistics as sampled queries."""
+    rarely = CountingRule("never")
+    often = CountingRule("tmp", cost=5)
+    plan = RulePlan([rarely, often], sample_every=2, reorder_every=4)
+    queries = [f"tmp{i}" for i in range(6)] + ["a.txt", "b.txt"]
+    assert plan.filter_many(queries) == [False] * 6 + [True, True]
+    assert plan.samples == 8
+    assert plan.order == [1, 0]
+    assert plan.rejection_rate(1) == 0.75
+
+    rarely.calls = 0
+    often.calls = 0
+    # not sampled: only the survivors of `often` reach `rarely`
+    assert plan.filter_many(queries) == [False] * 6 + [True, True]
+    assert (often.calls, rarely.calls) == (8, 2)
+    assert plan.samples == 8
+    assert plan.calls == 16
+
+
+def test_walk_reorders(tmp_path):
+    """The walker judges through `filter_many`, which samples too."""
+    for i in range(12):
+        (tmp_path / f"tmp{i}").write_text("")
+    (tmp_path / "a.txt").write_text("")
+    rarely = CountingRule("never")
+    often = CountingRule("tmp", cost=5)
+    rule = CompositeRule([rarely, often]).optimize(sample_every=1, reorder_every=4)
+    assert rule._plan.order == [0, 1]
+
+    names = [node["name"] for node in iter_tree(str(tmp_path), rule)][1:]
+    assert names == ["a.txt"]
+    assert rule._plan.samples == 13
+    assert rule._plan.order == [1, 0]
+
+
+def test_same_decisions():
+    rules = [CountingRule("a"), CountingRule("b"), HiddenFileRule()]
+    plan = RulePlan(rules, sample_every=3, reorder_every=2)
+    for name in ["a1", "b1", ".c", "d", "ab", "ba"] * 5:
+        assert plan.matches(name) is all(rule.matches(name) for rule in rules)
+
+
+def test_invalid_parameters():
+    with pytest.raises(ValueError):
+        RulePlan([], sample_every=0)
+
+
+def test_optimize_flattens_and_deduplicates():
+    hidden = HiddenFileRule()
+    glob = GlobRule(["*.py"])
+    rule = CompositeRule(
+        [CompositeRule([glob]), CompositeRule([HiddenFileRule()]), hidden]
+    )
+    before = [rule.matches(name) for name in ["a.py", ".a.py", "a.txt"]]
+
+    assert rule.optimize() is rule
+    assert len(rule.rules) == 2
+    assert rule.rules[0] is glob
+    assert isinstance(rule.rules[1], HiddenFileRule)
+    assert [rule.matches(name) for name in ["a.py", ".a.py", "a.txt"]] == before
+
+
+def test_optimize_keeps_custom_composites():
+    custom = CompositeRule([])
+    custom.matches = lambda query: query.endswith(".py")
+    rule = CompositeRule([custom, HiddenFileRule()]).optimize()
+    assert rule.rules[0] is custom
+    assert rule.matches(RuleQuery("a.txt")) is False
+
+
+def test_fingerprint_stable_while_reordering():
+    rule = CompositeRule([CountingRule("never"), CountingRule("tmp")])
+    rule.optimize(sample_every=1, reorder_every=1)
+    fingerprint = rule.fingerprint()
+    for i in range(4):
+        rule.matches(f"tmp{i}")
+    assert rule._plan.order == [1, 0]
+    assert rule.fingerprint() == fingerprint
+
+
+def test_append_after_optimize():
+    rule = CompositeRule([GlobRule(["*.py"])]).optimize()
+    rule.append(CompositeRule([HiddenFileRule()]))
+    assert rule.matches(".a.py") is False
+    assert len(rule._plan.order) == 2
+
+
+def test_explain(capsys):
+    rule = CompositeRule([GitignoreRule(["*.log"]), HiddenFileRule()])
+    rule.explain()
+    assert "not optimized" in capsys.readouterr().out
+
+    rule.optimize(sample_every=1)
+    rule.matches(".a")
+    rule.explain()
+    out = capsys.readouterr().out
+    assert "1 sampled" in out
+    assert "GitignoreRule patterns=['*.log']" in out
+    assert out.index("HiddenFileRule") < out.index("GitignoreRule")